@@ -2,33 +2,26 @@
 """
 Backend Structure Generator for PG/Hostel Management System
 Generates complete folder structure and boilerplate files based on architecture
+
+Every file is first recorded into a plan, the plan is diffed against disk,
+and only then are new files written (in parallel, via atomic rename).
+
+    python3 generate.py                   # create missing files
+    python3 generate.py --dry-run --diff  # show what would change, write nothing
+    python3 generate.py --force           # also overwrite files that differ
 """
 
-import os
+import argparse
 import sys
+from pathlib import Path
 
-def create_directory(path):
-    """Create directory if it doesn't exist"""
-    if not os.path.exists(path):
-        os.makedirs(path)
-        print(f"✓ Created directory: {path}")
-    else:
-        print(f"⚠ Directory already exists: {path}")
-
-def create_file(path, content):
-    """Create file with content"""
-    if os.path.exists(path):
-        print(f"⚠ File already exists (skipping): {path}")
-        return
-    
-    with open(path, 'w') as f:
-        f.write(content)
-    print(f"✓ Created file: {path}")
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
 
-def generate_structure():
-    """Generate complete backend structure"""
-    
-    print("\n🚀 Starting Backend Structure Generation...\n")
+from codegen.emit import Plan, default_workers, diff_plan, emit, unified_diff  # noqa: E402
+
+def build_plan():
+    """Plan the complete backend structure (nothing is written here)"""
+    plan = Plan()
     
     # Define directory structure
     directories = [
@@ -46,14 +39,13 @@ def generate_structure():
     ]
     
     # Create directories
-    print("📁 Creating Directories...")
     for directory in directories:
-        create_directory(directory)
+        plan.directory(directory)
     
-    print("\n📄 Creating Configuration Files...\n")
+    # 📄 Configuration Files
     
     # .env.example
-    create_file('.env.example', """PORT=5000
+    plan.file('.env.example', """PORT=5000
 NODE_ENV=development
 MONGO_URI=mongodb://localhost:27017/pg_management
 JWT_SECRET=your_jwt_secret_key_change_in_production
@@ -65,7 +57,7 @@ REDIS_URL=redis://localhost:6379
 """)
     
     # .gitignore
-    create_file('.gitignore', """# Dependencies
+    plan.file('.gitignore', """# Dependencies
 node_modules/
 package-lock.json
 yarn.lock
@@ -103,7 +95,7 @@ uploads/
 """)
     
     # package.json
-    create_file('package.json', """{
+    plan.file('package.json', """{
   "name": "pg-hostel-management-backend",
   "version": "1.0.0",
   "description": "Backend API for PG/Hostel Management System",
@@ -143,7 +135,7 @@ uploads/
 """)
     
     # README.md
-    create_file('README.md', """# PG/Hostel Management System - Backend
+    plan.file('README.md', """# PG/Hostel Management System - Backend
 
 ## Tech Stack
 - **Runtime**: Node.js (v18+)
@@ -226,10 +218,10 @@ src/
 ```
 """)
     
-    print("\n📦 Creating Config Files...\n")
+    # 📦 Config Files
     
     # src/config/database.js
-    create_file('src/config/database.js', """const mongoose = require('mongoose');
+    plan.file('src/config/database.js', """const mongoose = require('mongoose');
 
 const connectDB = async () => {
   try {
@@ -249,7 +241,7 @@ module.exports = connectDB;
 """)
     
     # src/config/logger.js
-    create_file('src/config/logger.js', """const winston = require('winston');
+    plan.file('src/config/logger.js', """const winston = require('winston');
 const DailyRotateFile = require('winston-daily-rotate-file');
 
 const logger = winston.createLogger({
@@ -288,7 +280,7 @@ module.exports = logger;
 """)
     
     # src/config/cloudinary.js
-    create_file('src/config/cloudinary.js', """const cloudinary = require('cloudinary').v2;
+    plan.file('src/config/cloudinary.js', """const cloudinary = require('cloudinary').v2;
 
 cloudinary.config({
   cloud_name: process.env.CLOUDINARY_CLOUD_NAME,
@@ -299,10 +291,10 @@ cloudinary.config({
 module.exports = cloudinary;
 """)
     
-    print("\n🎨 Creating Models...\n")
+    # 🎨 Models
     
     # src/models/User.js
-    create_file('src/models/User.js', """const mongoose = require('mongoose');
+    plan.file('src/models/User.js', """const mongoose = require('mongoose');
 const bcrypt = require('bcryptjs');
 const jwt = require('jsonwebtoken');
 
@@ -365,7 +357,7 @@ module.exports = mongoose.model('User', userSchema);
 """)
     
     # src/models/Room.js
-    create_file('src/models/Room.js', """const mongoose = require('mongoose');
+    plan.file('src/models/Room.js', """const mongoose = require('mongoose');
 
 const roomSchema = new mongoose.Schema({
   room_no: {
@@ -421,7 +413,7 @@ module.exports = mongoose.model('Room', roomSchema);
 """)
     
     # src/models/Tenant.js
-    create_file('src/models/Tenant.js', """const mongoose = require('mongoose');
+    plan.file('src/models/Tenant.js', """const mongoose = require('mongoose');
 
 const tenantSchema = new mongoose.Schema({
   name: {
@@ -483,7 +475,7 @@ module.exports = mongoose.model('Tenant', tenantSchema);
 """)
     
     # src/models/Fee.js
-    create_file('src/models/Fee.js', """const mongoose = require('mongoose');
+    plan.file('src/models/Fee.js', """const mongoose = require('mongoose');
 
 const feeSchema = new mongoose.Schema({
   tenant_id: {
@@ -547,7 +539,7 @@ module.exports = mongoose.model('Fee', feeSchema);
 """)
     
     # src/models/Bill.js
-    create_file('src/models/Bill.js', """const mongoose = require('mongoose');
+    plan.file('src/models/Bill.js', """const mongoose = require('mongoose');
 
 const billSchema = new mongoose.Schema({
   type: {
@@ -583,10 +575,10 @@ billSchema.index({ month: 1, type: 1 });
 module.exports = mongoose.model('Bill', billSchema);
 """)
     
-    print("\n🛡️ Creating Middlewares...\n")
+    # 🛡️ Middlewares
     
     # src/middlewares/auth.js
-    create_file('src/middlewares/auth.js', """const jwt = require('jsonwebtoken');
+    plan.file('src/middlewares/auth.js', """const jwt = require('jsonwebtoken');
 const User = require('../models/User');
 const { asyncHandler } = require('./errorHandler');
 
@@ -638,7 +630,7 @@ exports.authorize = (...roles) => {
 """)
     
     # src/middlewares/errorHandler.js
-    create_file('src/middlewares/errorHandler.js', """const logger = require('../config/logger');
+    plan.file('src/middlewares/errorHandler.js', """const logger = require('../config/logger');
 
 // Async handler to wrap async route handlers
 exports.asyncHandler = (fn) => (req, res, next) =>
@@ -687,7 +679,7 @@ exports.notFound = (req, res, next) => {
 """)
     
     # src/middlewares/validator.js
-    create_file('src/middlewares/validator.js', """exports.validate = (schema) => {
+    plan.file('src/middlewares/validator.js', """exports.validate = (schema) => {
   return (req, res, next) => {
     const { error } = schema.validate(req.body, { abortEarly: false });
     
@@ -705,10 +697,10 @@ exports.notFound = (req, res, next) => {
 };
 """)
     
-    print("\n✅ Creating Validations...\n")
+    # ✅ Validations
     
     # src/validations/authValidation.js
-    create_file('src/validations/authValidation.js', """const Joi = require('joi');
+    plan.file('src/validations/authValidation.js', """const Joi = require('joi');
 
 exports.registerSchema = Joi.object({
   name: Joi.string().required().trim().messages({
@@ -741,7 +733,7 @@ exports.loginSchema = Joi.object({
 """)
     
     # src/validations/roomValidation.js
-    create_file('src/validations/roomValidation.js', """const Joi = require('joi');
+    plan.file('src/validations/roomValidation.js', """const Joi = require('joi');
 
 exports.createRoomSchema = Joi.object({
   room_no: Joi.string().required().trim().messages({
@@ -772,7 +764,7 @@ exports.updateRoomSchema = Joi.object({
 """)
     
     # src/validations/tenantValidation.js
-    create_file('src/validations/tenantValidation.js', """const Joi = require('joi');
+    plan.file('src/validations/tenantValidation.js', """const Joi = require('joi');
 
 exports.createTenantSchema = Joi.object({
   name: Joi.string().required().trim().messages({
@@ -804,7 +796,7 @@ exports.updateTenantSchema = Joi.object({
 """)
     
     # src/validations/feeValidation.js
-    create_file('src/validations/feeValidation.js', """const Joi = require('joi');
+    plan.file('src/validations/feeValidation.js', """const Joi = require('joi');
 
 exports.createFeeSchema = Joi.object({
   tenant_id: Joi.string().required().messages({
@@ -828,7 +820,7 @@ exports.updateFeeSchema = Joi.object({
 """)
     
     # src/validations/billValidation.js
-    create_file('src/validations/billValidation.js', """const Joi = require('joi');
+    plan.file('src/validations/billValidation.js', """const Joi = require('joi');
 
 exports.createBillSchema = Joi.object({
   type: Joi.string().valid('electricity', 'water', 'maintenance').required().messages({
@@ -846,10 +838,10 @@ exports.createBillSchema = Joi.object({
 });
 """)
     
-    print("\n🎮 Creating Controllers...\n")
+    # 🎮 Controllers
     
     # src/controllers/authController.js
-    create_file('src/controllers/authController.js', """const User = require('../models/User');
+    plan.file('src/controllers/authController.js', """const User = require('../models/User');
 const { asyncHandler } = require('../middlewares/errorHandler');
 
 // @desc    Register user
@@ -938,7 +930,7 @@ exports.getMe = asyncHandler(async (req, res) => {
 """)
     
     # src/controllers/roomController.js
-    create_file('src/controllers/roomController.js', """const Room = require('../models/Room');
+    plan.file('src/controllers/roomController.js', """const Room = require('../models/Room');
 const { asyncHandler } = require('../middlewares/errorHandler');
 
 // @desc    Get all rooms
@@ -1035,7 +1027,7 @@ exports.deleteRoom = asyncHandler(async (req, res) => {
 """)
     
     # src/controllers/tenantController.js
-    create_file('src/controllers/tenantController.js', """const Tenant = require('../models/Tenant');
+    plan.file('src/controllers/tenantController.js', """const Tenant = require('../models/Tenant');
 const Room = require('../models/Room');
 const { asyncHandler } = require('../middlewares/errorHandler');
 
@@ -1203,7 +1195,7 @@ exports.deleteTenant = asyncHandler(async (req, res) => {
 """)
     
     # src/controllers/feeController.js
-    create_file('src/controllers/feeController.js', """const Fee = require('../models/Fee');
+    plan.file('src/controllers/feeController.js', """const Fee = require('../models/Fee');
 const Tenant = require('../models/Tenant');
 const { asyncHandler } = require('../middlewares/errorHandler');
 
@@ -1329,7 +1321,7 @@ exports.deleteFee = asyncHandler(async (req, res) => {
 """)
     
     # src/controllers/billController.js
-    create_file('src/controllers/billController.js', """const Bill = require('../models/Bill');
+    plan.file('src/controllers/billController.js', """const Bill = require('../models/Bill');
 const { asyncHandler } = require('../middlewares/errorHandler');
 
 // @desc    Get all bills
@@ -1434,10 +1426,10 @@ exports.deleteBill = asyncHandler(async (req, res) => {
 });
 """)
     
-    print("\n🛣️ Creating Routes...\n")
+    # 🛣️ Routes
     
     # src/routes/authRoutes.js
-    create_file('src/routes/authRoutes.js', """const express = require('express');
+    plan.file('src/routes/authRoutes.js', """const express = require('express');
 const router = express.Router();
 const { register, login, getMe } = require('../controllers/authController');
 const { protect } = require('../middlewares/auth');
@@ -1452,7 +1444,7 @@ module.exports = router;
 """)
     
     # src/routes/roomRoutes.js
-    create_file('src/routes/roomRoutes.js', """const express = require('express');
+    plan.file('src/routes/roomRoutes.js', """const express = require('express');
 const router = express.Router();
 const {
   getRooms,
@@ -1480,7 +1472,7 @@ module.exports = router;
 """)
     
     # src/routes/tenantRoutes.js
-    create_file('src/routes/tenantRoutes.js', """const express = require('express');
+    plan.file('src/routes/tenantRoutes.js', """const express = require('express');
 const router = express.Router();
 const {
   getTenants,
@@ -1508,7 +1500,7 @@ module.exports = router;
 """)
     
     # src/routes/feeRoutes.js
-    create_file('src/routes/feeRoutes.js', """const express = require('express');
+    plan.file('src/routes/feeRoutes.js', """const express = require('express');
 const router = express.Router();
 const {
   getFees,
@@ -1536,7 +1528,7 @@ module.exports = router;
 """)
     
     # src/routes/billRoutes.js
-    create_file('src/routes/billRoutes.js', """const express = require('express');
+    plan.file('src/routes/billRoutes.js', """const express = require('express');
 const router = express.Router();
 const {
   getBills,
@@ -1563,10 +1555,10 @@ router.route('/:id')
 module.exports = router;
 """)
     
-    print("\n🔧 Creating Utilities...\n")
+    # 🔧 Utilities
     
     # src/utils/dateHelper.js
-    create_file('src/utils/dateHelper.js', """/**
+    plan.file('src/utils/dateHelper.js', """/**
  * Get current month in YYYY-MM format
  */
 exports.getCurrentMonth = () => {
@@ -1602,7 +1594,7 @@ exports.isPastDate = (date) => {
 """)
     
     # src/utils/calculator.js
-    create_file('src/utils/calculator.js', """/**
+    plan.file('src/utils/calculator.js', """/**
  * Calculate total rent for a month
  */
 exports.calculateMonthlyRent = (rooms) => {
@@ -1632,10 +1624,10 @@ exports.calculateOccupancyRate = (occupiedCount, totalCapacity) => {
 };
 """)
     
-    print("\n🚀 Creating Main Application Files...\n")
+    # 🚀 Main Application Files
     
     # src/app.js
-    create_file('src/app.js', """const express = require('express');
+    plan.file('src/app.js', """const express = require('express');
 const morgan = require('morgan');
 const helmet = require('helmet');
 const cors = require('cors');
@@ -1704,7 +1696,7 @@ module.exports = app;
 """)
     
     # src/server.js
-    create_file('src/server.js', """require('dotenv').config();
+    plan.file('src/server.js', """require('dotenv').config();
 const app = require('./app');
 const connectDB = require('./config/database');
 const logger = require('./config/logger');
@@ -1737,6 +1729,9 @@ process.on('SIGTERM', () => {
 });
 """)
     
+    return plan
+
+def print_next_steps():
     print("\n✅ Backend structure generated successfully!")
     print("\n📋 Next Steps:")
     print("1. Copy .env.example to .env and update values")
@@ -1745,9 +1740,58 @@ process.on('SIGTERM', () => {
     print("4. Test API endpoints using the /health endpoint first")
     print("\n🎉 Happy coding!")
 
+def generate_structure(root=".", dry_run=False, show_diff=False, force=False, workers=None):
+    """Generate complete backend structure"""
+    
+    print("\n🚀 Starting Backend Structure Generation...\n")
+    
+    root = Path(root)
+    plan = build_plan()
+    changes = diff_plan(plan, root, workers)
+    
+    new = [c for c in changes if c.state == "new"]
+    changed = [c for c in changes if c.state == "changed"]
+    unchanged = len(changes) - len(new) - len(changed)
+    # Existing files are never clobbered unless asked to.
+    todo = new + changed if force else new
+    
+    missing_dirs = [d for d in plan.dirs if not (root / d).is_dir()]
+    for d in missing_dirs:
+        print(f"{'+ Would create' if dry_run else '✓ Created'} directory: {d}")
+    for c in changes:
+        if c.state == "new":
+            print(f"{'+ Would create' if dry_run else '✓ Created'} file: {c.path}")
+        elif c.state == "changed" and force:
+            print(f"{'~ Would overwrite' if dry_run else '✓ Overwrote'} file: {c.path}")
+        elif c.state == "changed":
+            print(f"⚠ File differs from template (skipping, use --force): {c.path}")
+        if show_diff and c.state != "unchanged":
+            sys.stdout.write(unified_diff(c))
+    
+    if not dry_run:
+        emit(plan, todo, root, workers)
+    
+    verb = "would write" if dry_run else "written"
+    kept = 0 if force else len(changed)
+    print(f"\n{len(todo)} {verb}, {kept} differ (kept), "
+          f"{unchanged} up to date, {len(missing_dirs)} new directories")
+    return plan
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the backend folder structure and boilerplate.")
+    parser.add_argument("--out", default=".", help="target directory (default: current directory)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be written, write nothing")
+    parser.add_argument("--diff", action="store_true", help="print a unified diff for every new or differing file")
+    parser.add_argument("--force", action="store_true", help="overwrite existing files that differ from the templates")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="parallel writers")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        generate_structure()
+        generate_structure(args.out, args.dry_run, args.diff, args.force, args.workers)
+        if not args.dry_run:
+            print_next_steps()
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,103 @@
+// auditBillOverlaps.js
+// Find bills that overlap another bill of the same occupancy.
+//
+//   npm run audit:bills
+//   node scripts/auditBillOverlaps.js --json overlaps.json
+//
+// The Bill pre('save') check only looks at the latest bill starting before a
+// new period, which is enough as long as no two bills of an occupancy overlap.
+// This audit verifies that for the whole collection in a single pass: bills
+// are streamed in { occupancyId, period_start } order straight off the
+// { occupancyId, period_start, period_end } index, and each one is compared
+// with the latest-ending earlier bill of its occupancy. Memory stays constant.
+//
+// Exits 1 when overlaps are found. Uses MONGO_URI from .env.
+//
+// Options:
+//   --json FILE      write every overlap as JSON
+//   --limit N        stop printing after N overlaps (default 50; all are counted)
+
+import fs from "fs";
+import dotenv from "dotenv";
+import mongoose from "mongoose";
+import Bill from "../src/models/Bill.js";
+
+dotenv.config();
+
+const parseArgs = (argv) => {
+  const args = { json: null, limit: 50 };
+  for (let i = 0; i < argv.length; i++) {
+    const a = argv[i];
+    if (a === "--json") args.json = argv[++i];
+    else if (a === "--limit") args.limit = Number(argv[++i]);
+    else throw new Error(`unknown option ${a}`);
+  }
+  return args;
+};
+
+const fmt = (d) => d.toISOString().slice(0, 10);
+const describe = (bill) => `${bill._id} ${fmt(bill.period_start)}..${fmt(bill.period_end)}`;
+
+// One pass over the ledger. `latest` is the earlier bill of the current
+// occupancy with the greatest period_end: a bill starting before that end
+// overlaps it.
+const auditOverlaps = async (onOverlap) => {
+  const cursor = Bill.find(
+    { occupancyId: { $ne: null } },
+    { occupancyId: 1, tenantId: 1, period_start: 1, period_end: 1, amount: 1, status: 1 }
+  )
+    .sort({ occupancyId: 1, period_start: 1 })
+    .hint({ occupancyId: 1, period_start: 1, period_end: 1 })
+    .lean()
+    .cursor({ batchSize: 1000 });
+
+  let scanned = 0;
+  let overlaps = 0;
+  let occupancy = null;
+  let latest = null;
+  for await (const bill of cursor) {
+    scanned += 1;
+    const key = String(bill.occupancyId);
+    if (key !== occupancy) {
+      occupancy = key;
+      latest = bill;
+      continue;
+    }
+    if (bill.period_start < latest.period_end) {
+      overlaps += 1;
+      onOverlap({ occupancyId: bill.occupancyId, bill, overlaps: latest });
+    }
+    if (bill.period_end > latest.period_end) latest = bill;
+  }
+  return { scanned, overlaps };
+};
+
+const main = async () => {
+  const args = parseArgs(process.argv.slice(2));
+  await mongoose.connect(process.env.MONGO_URI);
+  const found = [];
+  let printed = 0;
+  try {
+    const started = Date.now();
+    const { scanned, overlaps } = await auditOverlaps((overlap) => {
+      if (args.json) found.push(overlap);
+      if (printed < args.limit) {
+        printed += 1;
+        console.log(`✘ occupancy ${overlap.occupancyId}: ${describe(overlap.bill)} overlaps ${describe(overlap.overlaps)}`);
+      }
+    });
+    if (overlaps > printed) console.log(`… ${overlaps - printed} more`);
+    if (args.json) fs.writeFileSync(args.json, JSON.stringify(found, null, 2));
+    console.log(`bills: ${scanned} scanned, ${overlaps} overlapping (${Date.now() - started} ms)`);
+    return overlaps ? 1 : 0;
+  } finally {
+    await mongoose.disconnect();
+  }
+};
+
+main()
+  .then((code) => process.exit(code))
+  .catch((err) => {
+    console.error(err);
+    process.exit(2);
+  });
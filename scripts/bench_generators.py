@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# bench_generators.py
+# Scale benchmark for the Python generators (controllerGen, genRoutes, generate.py).
+#
+#   python3 scripts/bench_generators.py                      # 10, 100, 1000 resources
+#   python3 scripts/bench_generators.py --sizes 10,100 --repeat 5
+#   python3 scripts/bench_generators.py --out after.json --compare before.json
+#
+# controllerGen and genRoutes are driven by synthetic resources.json specs
+# with N CRUD resources (every filter kind, nested routes, validations).
+# generate.py has a fixed template set, so it is measured once per run.
+#
+# Each case is timed in three phases, into a throwaway directory:
+#   render  build every file in memory (templates only, no I/O)
+#   write   sync into an empty directory (cold: every file is new)
+#   noop    sync again (warm: manifest says nothing changed)
+# Timings are the best of --repeat runs. Peak memory comes from a separate
+# tracemalloc pass so its overhead does not skew the timings.
+#
+# Results go to a JSON file keyed by git commit; --compare prints the ratio
+# against an earlier results file.
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from codegen.emit import diff_plan, emit  # noqa: E402
+from codegen.manifest import sync  # noqa: E402
+from codegen.registry import load_generator  # noqa: E402
+from codegen.spec import parse_spec  # noqa: E402
+
+SPEC_GENERATORS = {
+    "controllerGen": ROOT / "src" / "controllers" / "controllerGen.py",
+    "genRoutes": ROOT / "src" / "routes" / "genRoutes.py",
+}
+SCAFFOLD = ROOT / "generate.py"
+PHASES = ("render", "write", "noop")
+
+
+# ---------- synthetic specs
+
+def synthetic_resource(i: int, n: int) -> dict:
+    nxt = (i + 1) % n
+    return {
+        "name": f"items{i}",
+        "model": f"Item{i}",
+        "controller": f"item{i}Controller",
+        "crud": True,
+        "models": [f"Item{nxt}"],
+        # Explicit allowlist: the synthetic models have no src/models/*.js to read fields from.
+        "fields": ["_id", "parentId", "status", "floor", "active", "email", "name", "code",
+                   "start_date", "end_date", "createdAt", "updatedAt"],
+        "validation": {"create": f"item{i}Validation.createItem{i}Schema",
+                       "update": f"item{i}Validation.updateItem{i}Schema"},
+        "list": {"filters": [
+            {"param": "parentId"},
+            {"param": "status"},
+            {"param": "floor", "type": "number"},
+            {"param": "active", "type": "bool"},
+            {"param": "email", "type": "lowercase"},
+            {"param": "q", "kind": "search", "fields": ["name", "email", "code"]},
+            {"param": "open", "kind": "open", "field": "end_date"},
+            {"kind": "overlap", "start": "start_date", "end": "end_date", "openEnd": True},
+            {"param": "since", "kind": "range", "field": "createdAt"},
+        ]},
+        # Nested routes into the neighbouring resource exercise cross-controller imports.
+        "routes": [
+            {"method": "get", "path": f"/:id/items{nxt}", "handler": f"getItems{nxt}",
+             "controller": f"item{nxt}Controller"},
+            {"method": "post", "path": f"/:id/items{nxt}", "handler": f"createItem{nxt}",
+             "controller": f"item{nxt}Controller", "validate": f"item{nxt}Validation.createItem{nxt}Schema"},
+        ],
+    }
+
+
+def synthetic_spec(n: int):
+    raw = {"version": 1, "resources": [synthetic_resource(i, n) for i in range(n)]}
+    return parse_spec(raw, f"synthetic-{n}")
+
+
+def write_validations(spec, directory: Path):
+    """Stub validation modules exporting every schema the spec's routes use
+    (genRoutes refuses to import a schema that does not exist)."""
+    schemas = {}
+    for res in spec.resources:
+        for ref in list(res.validation.values()) + [r.validate for r in res.routes if r.validate]:
+            schemas.setdefault(ref.module, set()).add(ref.schema)
+    for module, names in schemas.items():
+        body = "".join(f"export const {name} = null;\n" for name in sorted(names))
+        (directory / f"{module}.js").write_text(body, encoding="utf-8")
+
+
+# ---------- measurement
+
+@contextlib.contextmanager
+def quiet():
+    """Generators report every file they write."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def validations_in(directory: Path):
+    """Point genRoutes at `directory` for its validation modules, then back."""
+    module = load_generator(SPEC_GENERATORS["genRoutes"])
+    saved = module.VALIDATIONS
+    module.VALIDATIONS = directory
+    try:
+        yield
+    finally:
+        module.VALIDATIONS = saved
+
+
+def spec_case(generator: str, spec):
+    """(render, write) callables for one spec-driven generator."""
+    module = load_generator(SPEC_GENERATORS[generator])
+    reg = module.build_registry(spec)
+
+    def render():
+        return reg.render_many(reg.names())
+
+    def write(files, out: Path):
+        sync(out, files, reg.generator, reg.version)
+
+    return render, write
+
+
+def scaffold_case():
+    module = load_generator(SCAFFOLD)
+
+    def render():
+        return module.build_plan()
+
+    def write(plan, out: Path):
+        emit(plan, [c for c in diff_plan(plan, out) if c.state != "unchanged"], out)
+
+    return render, write
+
+
+def size_of(rendered):
+    files = rendered.files if hasattr(rendered, "files") else rendered
+    return len(files), sum(len(c.encode("utf-8")) for c in files.values())
+
+
+def run_once(render, write):
+    """Seconds per phase for one render + cold write + warm write."""
+    times = {}
+    with tempfile.TemporaryDirectory(prefix="bench-gen-") as tmp, quiet():
+        out = Path(tmp)
+        t0 = time.perf_counter()
+        rendered = render()
+        times["render"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        write(rendered, out)
+        times["write"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        write(rendered, out)
+        times["noop"] = time.perf_counter() - t0
+    return times, rendered
+
+
+def peak_memory(render, write):
+    """Peak traced allocation (KiB) during render and during the cold write."""
+    peaks = {}
+    with tempfile.TemporaryDirectory(prefix="bench-gen-") as tmp, quiet():
+        tracemalloc.start()
+        try:
+            rendered = render()
+            peaks["render"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            write(rendered, Path(tmp))
+            peaks["write"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {k: round(v / 1024, 1) for k, v in peaks.items()}
+
+
+def bench(generator: str, resources, render, write, repeat: int) -> dict:
+    best = dict.fromkeys(PHASES, float("inf"))
+    for _ in range(repeat):
+        times, rendered = run_once(render, write)
+        best = {k: min(best[k], times[k]) for k in PHASES}
+    files, size = size_of(rendered)
+    peaks = peak_memory(render, write)
+    return {
+        "generator": generator,
+        "resources": resources,
+        "files": files,
+        "bytes": size,
+        **{f"{k}_ms": round(best[k] * 1000, 3) for k in PHASES},
+        "peak_render_kib": peaks["render"],
+        "peak_write_kib": peaks["write"],
+    }
+
+
+# ---------- results
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_key(row):
+    return (row["generator"], row["resources"])
+
+
+def print_table(rows):
+    print(f"{'generator':<14}{'resources':>10}{'files':>7}{'KiB':>9}"
+          f"{'render ms':>11}{'write ms':>10}{'noop ms':>9}{'peak KiB':>10}")
+    for r in rows:
+        peak = max(r["peak_render_kib"], r["peak_write_kib"])
+        print(f"{r['generator']:<14}{str(r['resources']):>10}{r['files']:>7}{r['bytes'] / 1024:>9.1f}"
+              f"{r['render_ms']:>11.2f}{r['write_ms']:>10.2f}{r['noop_ms']:>9.2f}{peak:>10.1f}")
+
+
+def print_comparison(rows, baseline_path: Path):
+    base = json.loads(baseline_path.read_text(encoding="utf-8"))
+    old = {case_key(r): r for r in base["results"]}
+    print(f"\nvs {baseline_path} ({base.get('commit') or 'unknown commit'}), new/old:")
+    for r in rows:
+        prev = old.get(case_key(r))
+        if not prev:
+            continue
+        ratios = []
+        for k in ("render_ms", "write_ms", "noop_ms", "peak_render_kib", "bytes"):
+            ratios.append(f"{k}={r[k] / prev[k]:.2f}x" if prev[k] else f"{k}=n/a")
+        print(f"  {r['generator']:<14}{str(r['resources']):>6}  " + "  ".join(ratios))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the code generators at scale.")
+    ap.add_argument("--sizes", default="10,100,1000", help="comma-separated resource counts")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    ap.add_argument("--out", default="bench-generators.json", help="results file (JSON)")
+    ap.add_argument("--compare", metavar="JSON", help="earlier results file to compare against")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-gen-") as tmp, validations_in(Path(tmp)):
+        for n in sizes:
+            spec = synthetic_spec(n)
+            write_validations(spec, Path(tmp))
+            for generator in SPEC_GENERATORS:
+                rows.append(bench(generator, n, *spec_case(generator, spec), args.repeat))
+    rows.append(bench("generate.py", "fixed", *scaffold_case(), args.repeat))
+
+    result = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": rows,
+    }
+    Path(args.out).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print_table(rows)
+    print(f"\nresults written to {args.out}")
+    if args.compare:
+        print_comparison(rows, Path(args.compare))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
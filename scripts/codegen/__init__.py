@@ -0,0 +1,3 @@
+# codegen
+# Shared plumbing for the Python generators (controllerGen.py, genRoutes.py).
+# The generators add <repo>/scripts to sys.path and import from here.
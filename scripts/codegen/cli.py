@@ -0,0 +1,70 @@
+# cli.py
+# Command line shared by controllerGen.py, genRoutes.py and scripts/regen.py.
+#
+#   --only billController,bills.js   regenerate just these targets
+#   --check                          write nothing, exit 1 on drift
+#   --force                          rewrite even unchanged files
+#   --list                           print the registered targets
+#   --watch                          stay resident, rebuild on change (see watch.py)
+
+import argparse
+import sys
+
+from .manifest import sync
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description=description)
+    ap.add_argument("--only", metavar="TARGETS",
+                    help="comma-separated file names or stems, e.g. billController,bills.js")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any file is out of date; write nothing")
+    ap.add_argument("--force", action="store_true", help="rewrite every selected file even if unchanged")
+    ap.add_argument("--list", action="store_true", help="list generated files and exit")
+    ap.add_argument("--watch", action="store_true",
+                    help="after generating, watch resources.json and the generator scripts and rebuild on change")
+    return ap
+
+
+def parse_targets(only):
+    if not only:
+        return None
+    return [t.strip() for t in only.split(",") if t.strip()]
+
+
+def run(registries, args) -> int:
+    """Render and sync the selected files of each registry."""
+    if args.list:
+        for reg in registries:
+            for fname in reg.names():
+                print(f"{reg.generator}: {fname}")
+        return 0
+
+    targets = parse_targets(args.only)
+    if targets:
+        unknown = [t for t in targets if not any(reg.matches(t) for reg in registries)]
+        if unknown:
+            print(f"✘ unknown target(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+
+    if args.watch and args.check:
+        print("✘ --watch and --check cannot be combined", file=sys.stderr)
+        return 2
+
+    rc = 0
+    for reg in registries:
+        fnames = reg.select(targets)
+        if not fnames:
+            continue
+        reg.base.mkdir(parents=True, exist_ok=True)
+        files = reg.render_many(fnames)
+        rc |= sync(reg.base, files, reg.generator, reg.version,
+                   check=args.check, force=args.force, prune=targets is None)
+    if args.watch:
+        from .watch import watch
+        return watch(registries, targets, force=args.force)
+    return rc
+
+
+def main(registries, description: str, argv=None) -> int:
+    args = build_parser(description).parse_args(argv)
+    return run(registries, args)
@@ -0,0 +1,80 @@
+# emit.py
+# Plan-then-write file emission for scaffold generators (generate.py).
+#
+# The generator records every directory and file it wants into a Plan
+# instead of writing as it goes. The whole plan is then diffed against disk
+# in one pass, and only new (or, with force, changed) files are written, in
+# parallel, each through write_atomic so an interrupted run never leaves a
+# truncated file behind.
+
+import difflib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .manifest import write_atomic
+
+
+def default_workers() -> int:
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class Plan:
+    """Ordered set of directories and {relative path: content} to emit."""
+
+    def __init__(self):
+        self.dirs = []
+        self.files = {}
+
+    def directory(self, path: str):
+        if path not in self.dirs:
+            self.dirs.append(path)
+
+    def file(self, path: str, content: str):
+        if path in self.files:
+            raise ValueError(f"{path} is planned twice")
+        self.files[path] = content
+
+
+@dataclass(frozen=True)
+class Change:
+    path: str
+    state: str              # "new", "changed" or "unchanged"
+    data: bytes
+    old: bytes = None       # current bytes on disk (changed files only)
+
+
+def _compare(root: Path, path: str, content: str) -> Change:
+    data = content.encode("utf-8")
+    try:
+        old = (root / path).read_bytes()
+    except FileNotFoundError:
+        return Change(path, "new", data)
+    if old == data:
+        return Change(path, "unchanged", data)
+    return Change(path, "changed", data, old)
+
+
+def diff_plan(plan: Plan, root: Path, workers: int = None) -> list:
+    """Compare every planned file with disk; result keeps plan order."""
+    with ThreadPoolExecutor(workers or default_workers()) as pool:
+        return list(pool.map(lambda item: _compare(root, *item), plan.files.items()))
+
+
+def unified_diff(change: Change) -> str:
+    old = change.old.decode("utf-8", "replace").splitlines(keepends=True) if change.old else []
+    new = change.data.decode("utf-8").splitlines(keepends=True)
+    before = "/dev/null" if change.state == "new" else f"a/{change.path}"
+    return "".join(difflib.unified_diff(old, new, before, f"b/{change.path}"))
+
+
+def emit(plan: Plan, changes, root: Path, workers: int = None):
+    """Create the plan's directories, then write `changes` concurrently."""
+    for d in plan.dirs:
+        (root / d).mkdir(parents=True, exist_ok=True)
+    # Parents of planned files that are not listed as directories.
+    for parent in dict.fromkeys((root / c.path).parent for c in changes):
+        parent.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(workers or default_workers()) as pool:
+        list(pool.map(lambda c: write_atomic(root / c.path, c.data), changes))
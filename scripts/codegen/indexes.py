@@ -0,0 +1,432 @@
+# indexes.py
+# Index analysis: list query shapes (resources.json) vs. indexes in src/models/*.js.
+#
+# Every generated list endpoint accepts a set of optional filters and has a
+# fixed sort, with _id appended as a tiebreaker (findPage in helpers.js needs
+# a total order for keyset cursors). For each CRUD resource we derive the
+# query shapes it serves:
+#
+#   - no filter (sort only)
+#   - each equality filter (eq / open) on its own
+#   - each range filter (range / overlap) on its own
+#   - every combo listed under "list.combos"
+#
+# and check them against the indexes declared in the model file. A shape
+# without a supporting index gets an ESR compound index (Equality fields,
+# then the Sort field, then Range fields). Planned indexes are written into
+# a marked block at the end of the model file, so re-running replaces them
+# instead of stacking duplicates; indexes written by hand are never touched.
+#
+# Filters that no index can serve (regex search, unknown or virtual fields)
+# are reported as remaining collection-scan risks.
+#
+# Models are read with a small brace/string/regex-aware scanner, the same
+# "read the file as text" approach scripts/exportSchemas.js takes: it is
+# enough for `new mongoose.Schema({...}, {...})` and `XSchema.index({...})`.
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .manifest import write_atomic
+from .spec import ROOT
+
+MODELS_DIR = ROOT / "src" / "models"
+
+BLOCK_BEGIN = "// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---"
+BLOCK_END = "// --- end planned indexes ---"
+_BLOCK = re.compile(r"\n*" + re.escape(BLOCK_BEGIN) + r".*?" + re.escape(BLOCK_END) + r"\n", re.S)
+
+EQUALITY_KINDS = ("eq", "open")
+RANGE_KINDS = ("range", "overlap")
+
+
+# ---------- tiny JS scanner
+
+_REGEX_PREV = set("(,=:[!&|?{};")
+
+
+def _skip(text: str, i: int) -> int:
+    """If text[i] starts a string, comment or regex literal, return the index after it."""
+    c = text[i]
+    if c in "'\"`":
+        j = i + 1
+        while j < len(text) and text[j] != c:
+            j += 2 if text[j] == "\\" else 1
+        return j + 1
+    if text.startswith("//", i):
+        j = text.find("\n", i)
+        return len(text) if j < 0 else j
+    if text.startswith("/*", i):
+        j = text.find("*/", i + 2)
+        return len(text) if j < 0 else j + 2
+    if c == "/":
+        prev = text[:i].rstrip()[-1:]
+        if prev in _REGEX_PREV:
+            j, in_class = i + 1, False
+            while j < len(text) and (in_class or text[j] != "/"):
+                if text[j] == "\\":
+                    j += 1
+                elif text[j] == "[":
+                    in_class = True
+                elif text[j] == "]":
+                    in_class = False
+                j += 1
+            return j + 1
+    return i
+
+
+def _strip_comments(text: str) -> str:
+    out, j = [], 0
+    while j < len(text):
+        k = _skip(text, j)
+        if k == j:
+            out.append(text[j])
+            j += 1
+            continue
+        if not text.startswith(("//", "/*"), j):
+            out.append(text[j:k])
+        j = k
+    return "".join(out)
+
+
+def _closing(text: str, i: int) -> int:
+    """Index of the bracket closing the one at text[i]."""
+    depth, j = 0, i
+    while j < len(text):
+        k = _skip(text, j)
+        if k != j:
+            j = k
+            continue
+        if text[j] in "{([":
+            depth += 1
+        elif text[j] in "})]":
+            depth -= 1
+            if depth == 0:
+                return j
+        j += 1
+    raise ValueError(f"unbalanced bracket at offset {i}")
+
+
+def _top_level_items(body: str):
+    """Split the inside of an object literal into (key, value source) pairs."""
+    items, depth, start, j = [], 0, 0, 0
+    while j <= len(body):
+        if j == len(body) or (depth == 0 and body[j] == ","):
+            key, sep, value = body[start:j].partition(":")
+            key = key.strip().strip("'\"")
+            if sep and key:
+                items.append((key, value.strip()))
+            start = j + 1
+            j += 1
+            continue
+        k = _skip(body, j)
+        if k != j:
+            j = k
+            continue
+        if body[j] in "{([":
+            depth += 1
+        elif body[j] in "})]":
+            depth -= 1
+        j += 1
+    return items
+
+
+def _objects_after(text: str, i: int, limit: int = 2):
+    """Object literals passed as the first `limit` arguments of the call opened before i."""
+    objs, close = [], _closing(text, i - 1)
+    j = i
+    while len(objs) < limit:
+        j = text.find("{", j, close)
+        if j < 0:
+            break
+        end = _closing(text, j)
+        objs.append(text[j + 1:end])
+        j = end + 1
+    return objs
+
+
+# ---------- models
+
+@dataclass(frozen=True)
+class Index:
+    keys: tuple                 # (("tenantId", 1), ("createdAt", -1))
+    unique: bool = False
+    partial: tuple = ()         # fields named in partialFilterExpression
+    text: bool = False          # text / geo index: useless for regular filters
+
+    @property
+    def fields(self):
+        return tuple(f for f, _ in self.keys)
+
+    def js(self, schema_var: str) -> str:
+        keys = ", ".join(f"{f}: {d}" for f, d in self.keys)
+        return f"{schema_var}.index({{ {keys} }});"
+
+
+@dataclass
+class Model:
+    name: str
+    path: Path
+    schema_var: str
+    fields: tuple               # stored fields, in schema order
+    virtuals: set
+    indexes: list = field(default_factory=list)    # hand-written only
+
+
+def _index_from(keys_src: str, opts_src: str = "") -> Index:
+    keys, text = [], False
+    for name, value in _top_level_items(keys_src):
+        value = value.strip("'\"")
+        try:
+            keys.append((name, int(value)))
+        except ValueError:
+            keys.append((name, value))
+            text = True
+    opts = dict(_top_level_items(opts_src))
+    partial = ()
+    if "partialFilterExpression" in opts:
+        partial = tuple(k for k, _ in _top_level_items(opts["partialFilterExpression"].strip()[1:-1]))
+    return Index(tuple(keys), unique=opts.get("unique") == "true", partial=partial, text=text)
+
+
+def parse_model(path: Path) -> Model:
+    text = _strip_comments(_BLOCK.sub("\n", path.read_text(encoding="utf-8")))
+    m = re.search(r"(\w+)\s*=\s*new\s+mongoose\.Schema\(", text)
+    name = re.search(r"mongoose\.model\(\s*['\"](\w+)['\"]", text)
+    if not m or not name:
+        raise ValueError(f"{path.name}: no mongoose.Schema / mongoose.model found")
+    schema_var = m.group(1)
+    objs = _objects_after(text, m.end())
+    fields, indexes = ["_id"], [Index((("_id", 1),), unique=True)]
+    for key, value in _top_level_items(objs[0]):
+        fields.append(key)
+        if value.startswith("{"):
+            opts = dict(_top_level_items(value[1:-1]))
+            if opts.get("index") == "true" or opts.get("unique") == "true":
+                indexes.append(Index(((key, 1),), unique=opts.get("unique") == "true"))
+    if len(objs) > 1:
+        opts = dict(_top_level_items(objs[1]))
+        if opts.get("timestamps", "false") != "false":
+            fields += ["createdAt", "updatedAt"]
+    for call in re.finditer(rf"\b{schema_var}\.index\(", text):
+        args = _objects_after(text, call.end())
+        if args:
+            indexes.append(_index_from(*args))
+    virtuals = set(re.findall(rf"\b{schema_var}\.virtual\(\s*['\"](\w+)['\"]", text))
+    return Model(name.group(1), path, schema_var, tuple(dict.fromkeys(fields)), virtuals, indexes)
+
+
+def load_models(models_dir: Path = MODELS_DIR):
+    models = {}
+    for path in sorted(models_dir.glob("*.js")):
+        model = parse_model(path)
+        models[model.name] = model
+    return models
+
+
+# ---------- query shapes
+
+@dataclass(frozen=True)
+class Shape:
+    label: str                  # e.g. "?tenantId&status"
+    equality: tuple             # fields, in filter order
+    sort: tuple                 # ((field, dir), ...)
+    ranges: tuple               # fields
+
+    def esr(self) -> tuple:
+        """ESR key order: equality, sort (unless already pinned), then ranges."""
+        keys = [(f, 1) for f in self.equality]
+        keys += [(f, d) for f, d in self.sort if f not in self.equality]
+        seen = {f for f, _ in keys}
+        keys += [(f, 1) for f in self.ranges if f not in seen]
+        return tuple(dict.fromkeys(keys))
+
+
+def _shape(label, filters, sort):
+    equality = tuple(dict.fromkeys(f.field for f in filters if f.kind in EQUALITY_KINDS))
+    ranges = tuple(dict.fromkeys(x for f in filters if f.kind in RANGE_KINDS for x in f.index_fields))
+    return Shape(label, equality, sort, ranges)
+
+
+def list_order(res):
+    """The list sort as findPage() runs it: _id is appended as a tiebreaker."""
+    if any(f == "_id" for f, _ in res.sort):
+        return res.sort
+    return res.sort + (("_id", res.sort[0][1] if res.sort else 1),)
+
+
+def query_shapes(res):
+    """(shapes, search filters) for a CRUD resource's list endpoint."""
+    indexable = [f for f in res.filters if f.kind in EQUALITY_KINDS + RANGE_KINDS]
+    order = list_order(res)
+    shapes = [_shape("(no filter)", [], order)]
+    shapes += [_shape(f"?{f.param}", [f], order) for f in indexable]
+    params = res.filter_params
+    for combo in res.combos:
+        picked = [params[p] for p in combo if params[p].kind != "search"]
+        shapes.append(_shape("?" + "&".join(combo), picked, order))
+    searches = [f for f in res.filters if f.kind == "search"]
+    return shapes, searches
+
+
+def usable(index: Index, shape: Shape) -> bool:
+    # A partial index only answers queries that pin every field of its filter.
+    return not index.text and all(f in shape.equality for f in index.partial)
+
+
+def supports(index: Index, shape: Shape) -> bool:
+    """Equality fields as the prefix, then the sort keys, with every range field indexed."""
+    if not usable(index, shape):
+        return False
+    if index.unique and set(index.fields) <= set(shape.equality):
+        return True     # at most one match: nothing to sort or filter
+    n = len(shape.equality)
+    if set(index.fields[:n]) != set(shape.equality):
+        return False
+    rest = index.keys[n:]
+    sort = [(f, d) for f, d in shape.sort if f not in shape.equality]
+    head = rest[:len(sort)]
+    if [f for f, _ in head] != [f for f, _ in sort]:
+        return False
+    # The index can be walked forwards or backwards, but not both at once.
+    if not (all(d == sd for (_, d), (_, sd) in zip(head, sort))
+            or all(d == -sd for (_, d), (_, sd) in zip(head, sort))):
+        return False
+    return set(shape.ranges) <= {f for f, _ in rest}
+
+
+def risk(indexes, shape: Shape) -> str:
+    """"ok", "partial" (index helps, but sorts in memory or filters after fetch) or "collscan"."""
+    candidates = [ix for ix in indexes if usable(ix, shape)]
+    if any(supports(ix, shape) for ix in candidates):
+        return "ok"
+    leads = set(shape.equality) | set(shape.ranges) | {f for f, _ in shape.sort[:1]}
+    if any(ix.fields[0] in leads for ix in candidates):
+        return "partial"
+    return "collscan" if shape.equality or shape.ranges else "partial"
+
+
+def _covers(a: tuple, b: tuple) -> bool:
+    """True if index keys `a` make `b` redundant (b is a prefix of a)."""
+    return len(a) >= len(b) and a[:len(b)] == b
+
+
+# ---------- plan
+
+@dataclass
+class ModelPlan:
+    model: Model
+    resources: list = field(default_factory=list)
+    planned: list = field(default_factory=list)         # Index
+    shapes: list = field(default_factory=list)          # (resource, shape, risk before, risk after)
+    risks: list = field(default_factory=list)           # remaining (resource, message)
+    redundant: list = field(default_factory=list)       # (hand-written Index, planned Index)
+
+
+def plan_indexes(spec, models):
+    plans = {}
+    for res in spec.resources:
+        if not res.crud or not res.model:
+            continue
+        model = models.get(res.model)
+        if model is None:
+            raise ValueError(f"{res.name}: model {res.model} not found in {MODELS_DIR}")
+        plan = plans.setdefault(res.model, ModelPlan(model))
+        plan.resources.append(res.name)
+
+        shapes, searches = query_shapes(res)
+        for f in searches:
+            plan.risks.append((res.name, f"?{f.param}: case-insensitive regex on "
+                                         f"{', '.join(f.fields)} cannot use an index"))
+        known = model.fields
+        for shape in shapes:
+            missing = [f for f in shape.equality + shape.ranges if f not in known]
+            for f in missing:
+                what = "a virtual" if f in model.virtuals else "not a stored field"
+                plan.risks.append((res.name, f"{shape.label}: {f} is {what}; the filter scans"))
+            if missing:
+                continue
+            before = risk(model.indexes + plan.planned, shape)
+            if before != "ok":
+                keys = shape.esr()
+                existing = [ix.keys for ix in model.indexes + plan.planned]
+                if not any(_covers(k, keys) for k in existing):
+                    plan.planned = [ix for ix in plan.planned if not _covers(keys, ix.keys)]
+                    plan.planned.append(Index(keys))
+            plan.shapes.append((res.name, shape, before))
+
+    for plan in plans.values():
+        # A later, longer index can make an earlier planned one redundant.
+        plan.planned = [ix for ix in plan.planned
+                        if not any(o is not ix and _covers(o.keys, ix.keys) for o in plan.planned)]
+        plan.shapes = [(r, s, before, risk(plan.model.indexes + plan.planned, s))
+                       for r, s, before in plan.shapes]
+        for ix in plan.model.indexes:
+            if ix.unique or ix.partial or ix.text:
+                continue
+            for new in plan.planned:
+                if _covers(new.keys, ix.keys):
+                    plan.redundant.append((ix, new))
+                    break
+    return plans
+
+
+# ---------- model files
+
+def render_block(plan: ModelPlan) -> str:
+    if not plan.planned:
+        return ""
+    lines = [BLOCK_BEGIN]
+    lines += [ix.js(plan.model.schema_var) for ix in plan.planned]
+    lines.append(BLOCK_END)
+    return "\n".join(lines) + "\n"
+
+
+def apply_block(text: str, block: str) -> str:
+    """Replace (or insert before mongoose.model(...)) the planned-index block."""
+    text = _BLOCK.sub("\n", text)
+    if not block:
+        return text
+    m = re.search(r"^.*mongoose\.model\(", text, re.M)
+    head = text[:m.start()].rstrip("\n") + "\n\n"
+    return head + block + "\n" + text[m.start():]
+
+
+def sync_models(plans, check=False, dry_run=False) -> list:
+    """Write the planned blocks; returns the model files that were (or would be) changed."""
+    changed = []
+    for plan in plans.values():
+        path = plan.model.path
+        old = path.read_text(encoding="utf-8")
+        new = apply_block(old, render_block(plan))
+        if new == old:
+            continue
+        changed.append(path)
+        if not (check or dry_run):
+            write_atomic(path, new.encode("utf-8"))
+    return changed
+
+
+def report(plans) -> str:
+    out = []
+    for name, plan in sorted(plans.items()):
+        out.append(f"{name} ({plan.model.path.name}; list: {', '.join(plan.resources)})")
+        for res, shape, before, after in plan.shapes:
+            mark = "✔" if after == "ok" else "⚠"
+            change = f"{before} -> {after}" if before != after else after
+            out.append(f"  {mark} {res} {shape.label}: {change}")
+        for ix in plan.planned:
+            out.append(f"  + {ix.js(plan.model.schema_var)}")
+        for ix, new in plan.redundant:
+            out.append(f"  - {ix.js(plan.model.schema_var)} is a prefix of a planned index "
+                       f"({', '.join(new.fields)}); consider dropping it")
+        for res, msg in plan.risks:
+            out.append(f"  ✘ {res} {msg}")
+    return "\n".join(out)
+
+
+def remaining_risks(plans):
+    scans = [(plan.model.name, res, s.label) for plan in plans.values()
+             for res, s, _, after in plan.shapes if after == "collscan"]
+    return scans + [(plan.model.name, res, msg) for plan in plans.values() for res, msg in plan.risks]
@@ -0,0 +1,135 @@
+# manifest.py
+# Content-hash manifest so generators only touch files whose output changed.
+#
+# Each output directory keeps a `.codegen-manifest.json`:
+#   { "generator": "controllerGen", "version": "1",
+#     "files": { "billController.js": { "sha256": ..., "size": ..., "mtime_ns": ... } } }
+#
+# A file is skipped when the rendered hash matches what is on disk. The
+# recorded size/mtime lets us trust the manifest without re-reading the file;
+# anything else (missing entry, version bump, file touched by hand) falls back
+# to hashing the file on disk. Skipped files keep their mtime, so nodemon does
+# not restart for them.
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = ".codegen-manifest.json"
+
+
+def normalize(content: str) -> str:
+    """Final form of every generated file (same rule the generators always used)."""
+    return content.strip() + "\n"
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write via a temp file + rename so watchers never see a half-written file."""
+    tmp = path.with_name(f".{path.name}.tmp{os.getpid()}")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class Manifest:
+    def __init__(self, base: Path, generator: str, version: str):
+        self.base = base
+        self.path = base / MANIFEST_NAME
+        self.generator = generator
+        self.version = version
+        self.files = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        # A different generator version may render differently: drop the cache
+        # (files are then compared against disk, not blindly rewritten).
+        if raw.get("generator") == self.generator and raw.get("version") == self.version:
+            self.files = raw.get("files", {})
+        else:
+            self.dirty = True
+
+    def status(self, fname: str, data: bytes) -> str:
+        """Return "new", "changed" or "unchanged" for the rendered bytes of fname."""
+        path = self.base / fname
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return "new"
+        want = digest(data)
+        entry = self.files.get(fname)
+        if (entry and entry["sha256"] == want
+                and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns):
+            return "unchanged"
+        if digest(path.read_bytes()) == want:
+            self.record(fname, data)
+            return "unchanged"
+        return "changed"
+
+    def record(self, fname: str, data: bytes):
+        st = (self.base / fname).stat()
+        entry = {"sha256": digest(data), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if self.files.get(fname) != entry:
+            self.files[fname] = entry
+            self.dirty = True
+
+    def prune(self, keep):
+        """Forget files that are no longer generated; returns their names."""
+        stale = sorted(set(self.files) - set(keep))
+        for fname in stale:
+            del self.files[fname]
+            self.dirty = True
+        return stale
+
+    def save(self):
+        if not self.dirty:
+            return
+        body = {"generator": self.generator, "version": self.version,
+                "files": dict(sorted(self.files.items()))}
+        write_atomic(self.path, (json.dumps(body, indent=2) + "\n").encode("utf-8"))
+        self.dirty = False
+
+
+def sync(base: Path, files: dict, generator: str, version: str,
+         check=False, force=False, prune=True) -> int:
+    """Write the rendered `files` ({name: content}) into base.
+
+    With check=True nothing is written; every out-of-date file is listed and
+    the return value is 1 if anything drifted (0 otherwise). Pass prune=False
+    when `files` is only a subset of the generator's output.
+    """
+    manifest = Manifest(base, generator, version)
+    drift, wrote, same = [], [], 0
+    for fname, content in files.items():
+        data = normalize(content).encode("utf-8")
+        state = "changed" if force else manifest.status(fname, data)
+        if state == "unchanged":
+            same += 1
+            continue
+        if check:
+            drift.append((state, fname))
+            continue
+        write_atomic(base / fname, data)
+        manifest.record(fname, data)
+        wrote.append(fname)
+        print(f"✔ wrote {fname}")
+
+    if check:
+        for state, fname in drift:
+            print(f"✘ {state}: {fname}")
+        print(f"{generator}: {len(drift)} out of date, {same} up to date")
+        return 1 if drift else 0
+
+    for fname in manifest.prune(files) if prune else ():
+        print(f"⚠ {fname} is no longer generated (left on disk)")
+    manifest.save()
+    print(f"{generator}: {len(wrote)} written, {same} unchanged")
+    return 0
@@ -0,0 +1,86 @@
+# registry.py
+# Lazy file registry shared by the generators.
+#
+# A generator registers one render callable per output file; nothing is
+# rendered until the file is actually selected, so importing a generator
+# (or regenerating a single file) does not pay for the whole set.
+#
+# A file may also carry a `key`: a fingerprint of the inputs it is rendered
+# from (e.g. repr of its resource). Watch mode re-renders only files whose
+# key changed; files without a key are re-rendered on every change.
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+class Registry:
+    def __init__(self, generator: str, base: Path, version: str, source: Path = None):
+        self.generator = generator
+        self.base = base
+        self.version = version
+        self.source = source        # generator script; watch mode reloads it on change
+        self._renderers = {}
+        self._keys = {}
+
+    def register(self, fname: str):
+        """Decorator: @REGISTRY.register("billController.js")"""
+        def deco(fn):
+            self.add(fname, fn)
+            return fn
+        return deco
+
+    def add(self, fname: str, fn, key: str = None):
+        if fname in self._renderers:
+            raise ValueError(f"{self.generator}: {fname} registered twice")
+        self._renderers[fname] = fn
+        self._keys[fname] = key
+
+    def key(self, fname: str):
+        return self._keys.get(fname)
+
+    def names(self):
+        return list(self._renderers)
+
+    def matches(self, target: str):
+        """Files matching a target: exact file name or name without extension."""
+        return [f for f in self._renderers if target in (f, Path(f).stem)]
+
+    def select(self, targets=None):
+        """File names for the given targets (all files when targets is None)."""
+        if targets is None:
+            return self.names()
+        picked = []
+        for target in targets:
+            for fname in self.matches(target):
+                if fname not in picked:
+                    picked.append(fname)
+        return picked
+
+    def render(self, fname: str) -> str:
+        return self._renderers[fname]()
+
+    def render_many(self, fnames):
+        return {fname: self.render(fname) for fname in fnames}
+
+
+def load_generator(path: Path, reload: bool = False):
+    """Import a generator script (e.g. src/routes/genRoutes.py) by path."""
+    path = Path(path).resolve()
+    name = f"_codegen_{path.stem}"
+    if name in sys.modules and not reload:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    previous = sys.modules.get(name)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        # Keep the last good copy (watch mode survives a broken edit).
+        if previous is None:
+            del sys.modules[name]
+        else:
+            sys.modules[name] = previous
+        raise
+    return module
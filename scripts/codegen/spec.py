@@ -0,0 +1,338 @@
+# spec.py
+# Declarative resource spec (resources.json) -> cached intermediate representation.
+#
+# The same IR drives controllerGen.py (list filters, CRUD exports, model
+# imports) and genRoutes.py (route files, validation imports, mounts), so a
+# handler, filter or schema name is written down exactly once.
+#
+# resources.json layout (see the file at the repo root for the real thing):
+#
+#   { "version": 1,
+#     "resources": [
+#       { "name": "bills",                 # route file bills.js, mounted at /bills
+#         "model": "Bill",                 # primary model; CRUD handlers use it
+#         "controller": "billController",
+#         "crud": true,                    # generate list/read/create/update/delete
+#         "models": ["Transaction", "Bed"],
+#         "validation": { "create": "billValidation.createBillSchema" },
+#         "fields": ["_id", "amount", ...],  # ?fields= allowlist (default: every stored field)
+#         "list": { "filters": [ { "param": "status" }, ... ],
+#                   "sort": "-createdAt",            # default order of the list endpoint
+#                   "combos": [["tenantId", "status"]] },  # filters commonly sent together
+#         "routes": [ { "method": "get", "path": "/:id/summary", "handler": "getBillSummary" } ],
+#         "features": { "export": true } } ] }   # per-resource switches for optional behaviour
+#
+# Filter kinds (all read from req.query):
+#   eq       filter[field] = value          (type: string | number | bool | lowercase)
+#   search   case-insensitive regex on one field, or $or over several
+#   open     ?active=true|false  ->  field null / not null
+#   overlap  ?from=&to=  ->  start < to and end > from (openEnd: end may be null)
+#   range    ?from=&to=  ->  from <= field <= to
+#
+# "sort" is the list endpoint's order; "combos" only tells the index analysis
+# (codegen/indexes.py) which filters are sent together. Both shape the
+# compound indexes it plans.
+#
+# Features:
+#   export      GET <mount>/export?format=ndjson|csv streams every match of the
+#               list filters (no paging) in the list order
+#   idempotent  POST <mount> honours an Idempotency-Key header: a retry gets the
+#               stored response instead of creating a second record
+#               (middlewares/idempotency.js)
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SPEC_PATH = ROOT / "resources.json"
+
+FILTER_KINDS = ("eq", "search", "open", "overlap", "range")
+VALUE_TYPES = ("string", "number", "bool", "lowercase")
+METHODS = ("get", "post", "put", "patch", "delete")
+CRUD_OPS = ("list", "read", "create", "update", "delete")
+FEATURES = ("export", "idempotent")
+
+
+class SpecError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SchemaRef:
+    module: str      # e.g. billValidation  -> ../validations/billValidation.js
+    schema: str      # e.g. createBillSchema
+
+    @classmethod
+    def parse(cls, ref: str, where: str):
+        module, _, schema = ref.partition(".")
+        if not module or not schema:
+            raise SpecError(f"{where}: validation must look like 'module.schemaName', got {ref!r}")
+        return cls(module, schema)
+
+
+@dataclass(frozen=True)
+class Filter:
+    kind: str
+    param: str
+    field: str = None
+    type: str = "string"
+    fields: tuple = ()          # search
+    start: str = None           # overlap
+    end: str = None             # overlap
+    open_end: bool = False      # overlap: end may be null (still open)
+    comment: str = None
+
+    @property
+    def index_fields(self):
+        """Model fields this filter constrains (used by index analysis)."""
+        if self.kind == "overlap":
+            return (self.start, self.end)
+        if self.kind == "search":
+            return self.fields
+        return (self.field,)
+
+
+@dataclass(frozen=True)
+class Route:
+    method: str
+    path: str
+    handler: str
+    controller: str
+    validate: SchemaRef = None
+    protect: bool = False       # per-route protect on unprotected routers
+    comment: str = None
+
+
+@dataclass(frozen=True)
+class Resource:
+    name: str
+    controller: str
+    model: str = None
+    mount: str = None
+    crud: bool = False
+    protect: bool = True
+    helpers: bool = True
+    models: tuple = ()
+    validation: dict = field(default_factory=dict)      # op -> SchemaRef
+    filters: tuple = ()
+    fields: tuple = ()          # ?fields= allowlist; empty = read from the model file
+    sort: tuple = ()            # ((field, 1 | -1), ...)
+    combos: tuple = ()          # (("tenantId", "status"), ...) filter params
+    routes: tuple = ()
+    features: dict = field(default_factory=dict)
+
+    @property
+    def route_file(self):
+        return f"{self.name}.js"
+
+    @property
+    def controller_file(self):
+        return f"{self.controller}.js"
+
+    @property
+    def ops(self):
+        """CRUD handler names, e.g. {"list": "getBills", "read": "getBill", ...}."""
+        if not self.crud:
+            return {}
+        plural = self.name[0].upper() + self.name[1:]
+        return {
+            "list": f"get{plural}",
+            "read": f"get{self.model}",
+            "create": f"create{self.model}",
+            "update": f"update{self.model}",
+            "delete": f"delete{self.model}",
+            **({"export": f"export{plural}"} if self.features.get("export") else {}),
+        }
+
+    @property
+    def filter_params(self):
+        return {f.param: f for f in self.filters}
+
+    @property
+    def all_models(self):
+        return tuple(dict.fromkeys(((self.model,) if self.model else ()) + self.models))
+
+
+@dataclass(frozen=True)
+class Spec:
+    resources: tuple
+    digest: str
+
+    def resource(self, name):
+        for res in self.resources:
+            if name in (res.name, res.controller):
+                return res
+        raise KeyError(name)
+
+    @cached_property
+    def _exports(self):
+        exports = {}
+        for res in self.resources:
+            exports.setdefault(res.controller, []).extend(res.ops.values())
+            for r in res.routes:
+                exports.setdefault(r.controller, []).append(r.handler)
+        return {c: list(dict.fromkeys(names)) for c, names in exports.items()}
+
+    def exports_of(self, controller):
+        """Every handler other files import from `controller`."""
+        return list(self._exports.get(controller, ()))
+
+    def validation_modules(self):
+        mods = []
+        for res in self.resources:
+            mods.extend(ref.module for ref in res.validation.values())
+            mods.extend(r.validate.module for r in res.routes if r.validate)
+        return list(dict.fromkeys(mods))
+
+
+# ---------- parsing
+
+def _parse_filter(raw, where):
+    kind = raw.get("kind", "eq")
+    if kind not in FILTER_KINDS:
+        raise SpecError(f"{where}: unknown filter kind {kind!r}")
+    param = raw.get("param") or ("from" if kind in ("overlap", "range") else None)
+    if not param:
+        raise SpecError(f"{where}: filter needs a 'param'")
+    vtype = raw.get("type", "string")
+    if vtype not in VALUE_TYPES:
+        raise SpecError(f"{where}: unknown value type {vtype!r}")
+    f = Filter(
+        kind=kind,
+        param=param,
+        field=raw.get("field", param if kind in ("eq", "open") else None),
+        type=vtype,
+        fields=tuple(raw.get("fields", ())),
+        start=raw.get("start"),
+        end=raw.get("end"),
+        open_end=bool(raw.get("openEnd", False)),
+        comment=raw.get("comment"),
+    )
+    if kind == "search" and not f.fields:
+        raise SpecError(f"{where}: search filter needs 'fields'")
+    if kind == "overlap" and not (f.start and f.end):
+        raise SpecError(f"{where}: overlap filter needs 'start' and 'end'")
+    if kind == "range" and not f.field:
+        raise SpecError(f"{where}: range filter needs 'field'")
+    return f
+
+
+def _parse_sort(raw, where):
+    """"-createdAt name" (mongoose string form) -> (("createdAt", -1), ("name", 1))."""
+    if not raw:
+        return ()
+    if not isinstance(raw, str):
+        raise SpecError(f"{where}: sort must be a string like '-createdAt'")
+    return tuple((key.lstrip("-"), -1 if key.startswith("-") else 1) for key in raw.split())
+
+
+def _parse_combos(raw, filters, where):
+    params = {f.param for f in filters}
+    combos = []
+    for j, combo in enumerate(raw):
+        unknown = [p for p in combo if p not in params]
+        if unknown:
+            raise SpecError(f"{where}[{j}]: unknown filter param(s) {', '.join(unknown)}")
+        combos.append(tuple(combo))
+    return tuple(combos)
+
+
+def _parse_route(raw, res_controller, where):
+    method = raw.get("method", "get").lower()
+    if method not in METHODS:
+        raise SpecError(f"{where}: unknown method {method!r}")
+    for key in ("path", "handler"):
+        if not raw.get(key):
+            raise SpecError(f"{where}: route needs {key!r}")
+    validate = raw.get("validate")
+    return Route(
+        method=method,
+        path=raw["path"],
+        handler=raw["handler"],
+        controller=raw.get("controller", res_controller),
+        validate=SchemaRef.parse(validate, where) if validate else None,
+        protect=bool(raw.get("protect", False)),
+        comment=raw.get("comment"),
+    )
+
+
+def _parse_resource(raw, i):
+    name = raw.get("name")
+    where = f"resources[{i}]" + (f" ({name})" if name else "")
+    if not name or not raw.get("controller"):
+        raise SpecError(f"{where}: 'name' and 'controller' are required")
+    crud = bool(raw.get("crud", False))
+    if crud and not raw.get("model"):
+        raise SpecError(f"{where}: crud resources need a 'model'")
+    validation = {}
+    for op, ref in raw.get("validation", {}).items():
+        if op not in CRUD_OPS:
+            raise SpecError(f"{where}: validation for unknown op {op!r}")
+        validation[op] = SchemaRef.parse(ref, where)
+    features = dict(raw.get("features", {}))
+    for feature in features:
+        if feature not in FEATURES:
+            raise SpecError(f"{where}: unknown feature {feature!r}")
+    for feature in ("export", "idempotent"):
+        if features.get(feature) and not crud:
+            raise SpecError(f"{where}: the {feature} feature needs a crud resource")
+    listing = raw.get("list", {})
+    filters = tuple(_parse_filter(f, f"{where}.list.filters[{j}]")
+                    for j, f in enumerate(listing.get("filters", ())))
+    return Resource(
+        name=name,
+        controller=raw["controller"],
+        model=raw.get("model"),
+        mount=raw.get("mount", f"/{name}"),
+        crud=crud,
+        protect=bool(raw.get("protect", True)),
+        helpers=bool(raw.get("helpers", True)),
+        models=tuple(raw.get("models", ())),
+        validation=validation,
+        filters=filters,
+        fields=tuple(raw.get("fields", ())),
+        sort=_parse_sort(listing.get("sort"), f"{where}.list.sort"),
+        combos=_parse_combos(listing.get("combos", ()), filters, f"{where}.list.combos"),
+        routes=tuple(_parse_route(r, raw["controller"], f"{where}.routes[{j}]")
+                     for j, r in enumerate(raw.get("routes", ()))),
+        features=features,
+    )
+
+
+def parse_spec(raw: dict, digest: str = "") -> Spec:
+    resources = tuple(_parse_resource(r, i) for i, r in enumerate(raw.get("resources", ())))
+    seen, controllers = set(), set()
+    for res in resources:
+        if res.name in seen:
+            raise SpecError(f"duplicate resource {res.name!r}")
+        if res.controller in controllers:
+            raise SpecError(f"{res.name}: controller {res.controller!r} is already generated by another resource")
+        seen.add(res.name)
+        controllers.add(res.controller)
+    # Every controller a route imports from must be one we generate.
+    for res in resources:
+        for r in res.routes:
+            if r.controller not in controllers:
+                raise SpecError(f"{res.name}: route {r.path} imports {r.handler} from "
+                                f"{r.controller}.js, which no resource generates")
+    return Spec(resources=resources, digest=digest)
+
+
+_CACHE = {}
+
+
+def load_spec(path: Path = SPEC_PATH) -> Spec:
+    """Parse resources.json once per distinct content (keyed by sha256)."""
+    data = Path(path).read_bytes()
+    key = hashlib.sha256(data).hexdigest()
+    spec = _CACHE.get(key)
+    if spec is None:
+        try:
+            raw = json.loads(data)
+        except ValueError as e:
+            raise SpecError(f"{path}: {e}") from None
+        spec = _CACHE[key] = parse_spec(raw, key)
+    return spec
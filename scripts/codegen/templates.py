@@ -0,0 +1,59 @@
+# templates.py
+# Generator templates, compiled once and cached by source hash.
+#
+# Placeholders are {{name}}; everything else, including JS braces, is literal,
+# so templates need none of the {{ }} escaping str.format requires. Compiling
+# dedents the source once and splits it into literal chunks and slots;
+# rendering is a single join.
+#
+#   LIST = template("""
+#       export const {{name}} = asyncHandler(async (req, res) => {
+#         ...
+#       });
+#   """)
+#   LIST.render(name="getBills")
+
+import hashlib
+import re
+from textwrap import dedent
+
+_SLOT = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class Template:
+    __slots__ = ("digest", "parts", "names")
+
+    def __init__(self, source: str, digest: str):
+        self.digest = digest
+        # [literal, name, literal, name, ..., literal]
+        self.parts = _SLOT.split(dedent(source))
+        self.names = frozenset(self.parts[1::2])
+
+    def render(self, **params) -> str:
+        missing = self.names - params.keys()
+        if missing:
+            raise TemplateError(f"template {self.digest[:12]} needs {', '.join(sorted(missing))}")
+        parts = self.parts[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = str(params[parts[i]])
+        return "".join(parts)
+
+
+_CACHE = {}
+
+
+def template(source: str) -> Template:
+    """Compiled template for `source`; identical sources share one compile."""
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    tpl = _CACHE.get(key)
+    if tpl is None:
+        tpl = _CACHE[key] = Template(source, key)
+    return tpl
+
+
+def render(source: str, **params) -> str:
+    return template(source).render(**params)
@@ -0,0 +1,204 @@
+# watch.py
+# `--watch`: keep the generators resident and rebuild on change.
+#
+# Watched: resources.json, each generator script, and src/models/*.js (the
+# ?fields= allowlists come from the models). Events come from inotify
+# (via ctypes, no extra dependency); where inotify is unavailable we fall back
+# to polling mtimes. A burst of events (editor save = write + rename + chmod)
+# is debounced into a single rebuild.
+#
+# Rebuilds are incremental:
+#   resources.json changed  -> new registry from the cached spec; only files
+#                              whose registry key (input fingerprint) changed
+#                              are rendered and synced
+#   a model changed         -> same path: controllers are keyed by their
+#                              model file's digest, so only those re-render
+#   generator script changed -> the script is reloaded and all its files are
+#                              re-rendered
+# Compiled templates live in codegen.templates' cache, which survives reloads,
+# so unchanged templates are not recompiled. Unchanged outputs are never
+# rewritten (manifest), so nodemon only restarts for files that really changed.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from .manifest import sync
+from .registry import load_generator
+from .spec import SPEC_PATH, load_spec
+
+MODELS_DIR = SPEC_PATH.parent / "src" / "models"
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")      # wd, mask, cookie, len
+
+
+def _js_files(dirs):
+    return {f.resolve() for d in dirs if d.is_dir() for f in d.glob("*.js")}
+
+
+class Inotify:
+    """Directory watches (editors save by rename, so files alone are not enough).
+    `dirs` are watched for any *.js in them, including files created later."""
+
+    def __init__(self, files, dirs=()):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.files = {Path(f).resolve() for f in files}
+        self.js_dirs = {Path(d).resolve() for d in dirs}
+        self.dirs = {}
+        for d in {f.parent for f in self.files} | self.js_dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+            self.dirs[wd] = d
+
+    def poll(self, timeout):
+        """Watched files touched within `timeout` seconds (None = block)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        hits, i = set(), 0
+        while i < len(data):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(data, i)
+            name = data[i + _EVENT.size:i + _EVENT.size + length].rstrip(b"\0")
+            i += _EVENT.size + length
+            path = self.dirs.get(wd, Path()) / os.fsdecode(name)
+            if path in self.files or (path.parent in self.js_dirs and path.suffix == ".js"):
+                hits.add(path)
+        return hits
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Poller:
+    """Fallback for platforms without inotify."""
+
+    def __init__(self, files, dirs=(), interval=0.25):
+        self.explicit = {Path(f).resolve() for f in files}
+        self.js_dirs = [Path(d).resolve() for d in dirs]
+        self.interval = interval
+        self.seen = {f: self._stamp(f) for f in self.files}
+
+    @property
+    def files(self):
+        return self.explicit | _js_files(self.js_dirs)
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            st = path.stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def poll(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            hits = set()
+            for f in self.files | set(self.seen):
+                stamp = self._stamp(f)
+                if stamp != self.seen.get(f):
+                    self.seen[f] = stamp
+                    hits.add(f)
+            if hits or (deadline is not None and time.monotonic() >= deadline):
+                return hits
+            time.sleep(self.interval if deadline is None else
+                       max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+def open_watcher(files, dirs=()):
+    try:
+        return Inotify(files, dirs)
+    except (OSError, AttributeError):
+        return Poller(files, dirs)
+
+
+def wait_for_changes(watcher, debounce: float):
+    """Block until something changes, then until it has been quiet for `debounce` s."""
+    changed = set()
+    while not changed:      # events for other files in a watched directory are ignored
+        changed = watcher.poll(None)
+    while True:
+        more = watcher.poll(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+class Watched:
+    """One generator kept warm: its module, current registry and file keys."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.source = Path(registry.source).resolve()
+        self.keys = {f: registry.key(f) for f in registry.names()}
+
+    def rebuild(self, reload: bool):
+        """Fresh registry; returns the file names that need re-rendering."""
+        module = load_generator(self.source, reload=reload)
+        reg = module.build_registry(load_spec())
+        keys = {f: reg.key(f) for f in reg.names()}
+        if reload:
+            affected = list(keys)
+        else:
+            affected = [f for f, k in keys.items()
+                        if k is None or f not in self.keys or self.keys[f] != k]
+        removed = sorted(set(self.keys) - set(keys))
+        self.registry, self.keys = reg, keys
+        return affected, removed
+
+
+def watch(registries, targets=None, debounce=0.2, force=False) -> int:
+    """Run until interrupted. `targets` limits rebuilds like --only does."""
+    watched = [Watched(reg) for reg in registries if reg.source]
+    files = [SPEC_PATH] + [w.source for w in watched]
+    watcher = open_watcher(files, [MODELS_DIR])
+    kind = "inotify" if isinstance(watcher, Inotify) else "polling"
+    names = ", ".join([Path(f).name for f in files] + ["models/*.js"])
+    print(f"👀 watching {names} ({kind}, {int(debounce * 1000)} ms debounce) — Ctrl+C to stop")
+    try:
+        while True:
+            changed = wait_for_changes(watcher, debounce)
+            started = time.perf_counter()
+            print(f"\n↻ {', '.join(sorted(p.name for p in changed))} changed")
+            for w in watched:
+                try:
+                    affected, removed = w.rebuild(reload=w.source in changed)
+                except Exception as e:  # keep watching through a broken edit
+                    print(f"✘ {w.registry.generator}: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                selected = set(w.registry.select(targets))
+                affected = [f for f in affected if f in selected]
+                for fname in removed:
+                    print(f"⚠ {fname} is no longer generated (left on disk)")
+                if not affected:
+                    continue
+                files = w.registry.render_many(affected)
+                sync(w.registry.base, files, w.registry.generator, w.registry.version,
+                     force=force, prune=False)
+            print(f"done in {(time.perf_counter() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\nstopped watching")
+        return 0
+    finally:
+        watcher.close()
@@ -0,0 +1,302 @@
+// explainPlans.js
+// Explain-plan check for the generated list endpoints.
+//
+//   npm run verify:indexes
+//   node scripts/explainPlans.js --all --max-ratio 3 --json explain.json
+//
+// Starts a throwaway MongoDB (mongodb-memory-server), seeds it, builds the
+// indexes declared in src/models, then calls the real list handlers
+// (getBills, getOccupancies, getTransactions, getTenants, getRooms, getBeds)
+// with every filter combination resources.json declares for them. Each find()
+// a handler issues is captured and re-run with explain("executionStats").
+//
+// A query fails when its winning plan contains a COLLSCAN, or when it examines
+// more than --max-ratio documents per document returned. Filters that no index
+// can serve (regex search, virtual / non-stored fields; see
+// `python3 scripts/indexes.py`) are reported as known risks and only fail
+// with --strict.
+//
+// Options:
+//   --all            every subset of each endpoint's filters, not just the
+//                    planned shapes (no filter, each filter, list.combos)
+//   --max-ratio N    docs examined per doc returned (default 5)
+//   --scale N        multiply the seed sizes (default 1)
+//   --strict         known risks fail too
+//   --json FILE      write every result as JSON
+
+import fs from "fs";
+import path from "path";
+import { fileURLToPath, pathToFileURL } from "url";
+import mongoose from "mongoose";
+import { MongoMemoryServer } from "mongodb-memory-server";
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+const root = path.join(__dirname, "..");
+
+const ENDPOINTS = ["getBills", "getOccupancies", "getTransactions", "getTenants", "getRooms", "getBeds"];
+const DAY = 24 * 60 * 60 * 1000;
+
+// ---------- args
+
+const parseArgs = (argv) => {
+  const args = { all: false, maxRatio: 5, scale: 1, strict: false, json: null };
+  for (let i = 0; i < argv.length; i++) {
+    const a = argv[i];
+    if (a === "--all") args.all = true;
+    else if (a === "--strict") args.strict = true;
+    else if (a === "--max-ratio") args.maxRatio = Number(argv[++i]);
+    else if (a === "--scale") args.scale = Number(argv[++i]);
+    else if (a === "--json") args.json = argv[++i];
+    else throw new Error(`unknown option ${a}`);
+  }
+  return args;
+};
+
+// ---------- seed data (deterministic)
+
+let seed = 42;
+const rand = () => {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+};
+const pick = (arr) => arr[Math.floor(rand() * arr.length)];
+const oid = () => new mongoose.Types.ObjectId();
+const monthStart = (y, m) => new Date(Date.UTC(y, m, 1));
+
+const seedData = async (models, scale) => {
+  const { Pg, Room, Bed, Tenant, Occupancy, Bill, Transaction } = models;
+  const now = new Date(Date.UTC(2025, 0, 1));
+  const stamp = (d) => ({ createdAt: d, updatedAt: d });
+
+  const pgs = Array.from({ length: 5 * scale }, (_, i) => ({ _id: oid(), pgName: `PG ${i}`, ...stamp(now) }));
+  const rooms = pgs.flatMap((pg) =>
+    Array.from({ length: 20 }, (_, i) => ({
+      _id: oid(), pgId: pg._id, no: String(100 + i), floor: i % 5, capacity: 3,
+      status: rand() < 0.1 ? "maintenance" : "active", ...stamp(now)
+    })));
+  const beds = rooms.flatMap((room) =>
+    Array.from({ length: 3 }, (_, i) => ({ _id: oid(), roomId: room._id, bedNo: `B${i + 1}`, defaultCost: 5000 + 500 * i, ...stamp(now) })));
+  const tenants = Array.from({ length: beds.length * 3 }, (_, i) => ({
+    _id: oid(), name: `Tenant ${i}`, mobile: String(9000000000 + i), email: `tenant${i}@example.com`,
+    active: rand() < 0.7, ...stamp(now)
+  }));
+
+  // Up to three back-to-back stays per bed; only the last one may still be open.
+  const occupancies = [];
+  let t = 0;
+  for (const bed of beds) {
+    let start = new Date(now.getTime() - Math.floor(rand() * 720) * DAY);
+    for (let stay = 0; stay < 3 && start < now; stay++) {
+      const end = new Date(start.getTime() + (60 + Math.floor(rand() * 240)) * DAY);
+      const open = end >= now;
+      occupancies.push({
+        _id: oid(), bedId: bed._id, tenantId: tenants[t++ % tenants.length]._id,
+        start_date: start, end_date: open ? null : end, status: open ? "active" : "moved_out", ...stamp(start)
+      });
+      start = end;
+    }
+  }
+
+  const bedCost = new Map(beds.map((b) => [String(b._id), b.defaultCost]));
+  const bills = [];
+  const transactions = [];
+  for (const occ of occupancies) {
+    const last = occ.end_date || now;
+    for (let m = monthStart(occ.start_date.getUTCFullYear(), occ.start_date.getUTCMonth()); m < last;) {
+      const next = monthStart(m.getUTCFullYear(), m.getUTCMonth() + 1);
+      const status = pick(["pending", "partial", "paid", "paid"]);
+      const bill = {
+        _id: oid(), bedId: occ.bedId, tenantId: occ.tenantId, occupancyId: occ._id,
+        period_start: m, period_end: next, amount: bedCost.get(String(occ.bedId)), status, ...stamp(next)
+      };
+      bills.push(bill);
+      if (status !== "pending") {
+        const paidAt = new Date(next.getTime() + Math.floor(rand() * 10) * DAY);
+        transactions.push({
+          _id: oid(), billId: bill._id, method: pick(["cash", "upi", "upi", "bank", "card"]),
+          amount: status === "paid" ? bill.amount : Math.round(bill.amount / 2), dateTime: paidAt, ...stamp(paidAt)
+        });
+      }
+      m = next;
+    }
+  }
+
+  // Raw inserts: no validation hooks, explicit timestamps.
+  const batches = [[Pg, pgs], [Room, rooms], [Bed, beds], [Tenant, tenants],
+    [Occupancy, occupancies], [Bill, bills], [Transaction, transactions]];
+  for (const [Model, docs] of batches) {
+    if (docs.length) await Model.collection.insertMany(docs, { ordered: false });
+  }
+  await Promise.all(Object.values(models).map((Model) => Model.syncIndexes()));
+  return Object.fromEntries(batches.map(([Model, docs]) => [Model.modelName, docs.length]));
+};
+
+// ---------- query shapes from resources.json
+
+const importFrom = (...parts) => import(pathToFileURL(path.join(root, ...parts)).href);
+
+const capitalize = (s) => s[0].toUpperCase() + s.slice(1);
+
+const loadEndpoints = () => {
+  const spec = JSON.parse(fs.readFileSync(path.join(root, "resources.json"), "utf8"));
+  return spec.resources
+    .filter((r) => r.crud && ENDPOINTS.includes(`get${capitalize(r.name)}`))
+    .map((r) => ({
+      handler: `get${capitalize(r.name)}`,
+      controller: r.controller,
+      model: r.model,
+      filters: (r.list?.filters || []).map((f) => {
+        const kind = f.kind || "eq";
+        const param = f.param || (kind === "overlap" || kind === "range" ? "from" : null);
+        return { ...f, kind, param, field: f.field || (kind === "eq" || kind === "open" ? param : null) };
+      }),
+      combos: r.list?.combos || []
+    }));
+};
+
+const subsets = (items) =>
+  items.reduce((acc, item) => acc.concat(acc.map((s) => [...s, item])), [[]]);
+
+const shapesOf = (endpoint, all) => {
+  if (all) return subsets(endpoint.filters);
+  const byParam = Object.fromEntries(endpoint.filters.map((f) => [f.param, f]));
+  const shapes = [[], ...endpoint.filters.map((f) => [f]), ...endpoint.combos.map((c) => c.map((p) => byParam[p]))];
+  const seen = new Set();
+  return shapes.filter((s) => {
+    const key = s.map((f) => f.param).join("&");
+    return seen.has(key) ? false : seen.add(key);
+  });
+};
+
+// Query-string values taken from a real seeded document so filters match something.
+const queryFor = async (Model, filters) => {
+  const total = await Model.estimatedDocumentCount();
+  const sample = await Model.findOne().sort({ _id: 1 }).skip(Math.floor(rand() * total)).lean();
+  const query = {};
+  for (const f of filters) {
+    if (f.kind === "search") query[f.param] = String(sample?.[f.fields[0]] ?? "x").slice(0, 4);
+    else if (f.kind === "open") query[f.param] = "true";
+    else if (f.kind === "overlap" || f.kind === "range") {
+      const anchor = new Date(sample?.[f.start || f.field] ?? Date.now());
+      query.from = anchor.toISOString();
+      query.to = new Date(anchor.getTime() + 30 * DAY).toISOString();
+    } else if (f.type === "bool") query[f.param] = "true";
+    else query[f.param] = sample?.[f.field] !== undefined ? String(sample[f.field]) : "x";
+  }
+  return query;
+};
+
+const knownRisk = (Model, filters) =>
+  filters
+    .filter((f) => f.kind === "search" || (f.field && !Model.schema.path(f.field)))
+    .map((f) => (f.kind === "search" ? `?${f.param} is a regex search` : `?${f.param}: ${f.field} is not stored`));
+
+// ---------- capture + explain
+
+let capturing = null;
+const exec = mongoose.Query.prototype.exec;
+mongoose.Query.prototype.exec = function (...args) {
+  if (capturing && this.op === "find") {
+    capturing.push({ model: this.model, filter: this.getFilter(), options: { ...this.getOptions() } });
+  }
+  return exec.apply(this, args);
+};
+
+const stagesOf = (plan, out = []) => {
+  if (!plan) return out;
+  const node = plan.queryPlan || plan;
+  out.push(node.indexName ? `${node.stage}(${node.indexName})` : node.stage);
+  if (node.inputStage) stagesOf(node.inputStage, out);
+  (node.inputStages || []).forEach((s) => stagesOf(s, out));
+  return out;
+};
+
+const explainFind = async ({ model, filter, options }) => {
+  const raw = await model.find(filter, null, options).explain("executionStats");
+  const result = Array.isArray(raw) ? raw[0] : raw;
+  const stats = result.executionStats;
+  const stages = stagesOf(result.queryPlanner.winningPlan);
+  return {
+    stages,
+    returned: stats.nReturned,
+    docsExamined: stats.totalDocsExamined,
+    keysExamined: stats.totalKeysExamined,
+    collscan: stages.some((s) => s.startsWith("COLLSCAN")),
+    inMemorySort: stages.includes("SORT")
+  };
+};
+
+const callHandler = async (handler, query) => {
+  const req = { query, params: {}, body: {} };
+  const res = { status() { return this; }, json(body) { this.body = body; return this; } };
+  let error = null;
+  await handler(req, res, (err) => { error = err; });
+  if (error) throw error;
+};
+
+// ---------- main
+
+const main = async () => {
+  const args = parseArgs(process.argv.slice(2));
+  const mongod = await MongoMemoryServer.create();
+  let failed = 0;
+  try {
+    await mongoose.connect(mongod.getUri());
+    const names = ["Pg", "Room", "Bed", "Tenant", "Occupancy", "Bill", "Transaction"];
+    const models = {};
+    for (const name of names) {
+      models[name] = (await importFrom("src/models", `${name}.js`)).default;
+    }
+    const counts = await seedData(models, args.scale);
+    console.log("Seeded:", Object.entries(counts).map(([k, v]) => `${k}=${v}`).join(", "));
+
+    const results = [];
+    for (const endpoint of loadEndpoints()) {
+      const controller = await importFrom("src/controllers", `${endpoint.controller}.js`);
+      const Model = models[endpoint.model];
+      for (const filters of shapesOf(endpoint, args.all)) {
+        const query = await queryFor(Model, filters);
+        capturing = [];
+        await callHandler(controller[endpoint.handler], query);
+        const finds = capturing;
+        capturing = null;
+        const risks = knownRisk(Model, filters);
+        for (const find of finds) {
+          const stats = await explainFind(find);
+          const ratio = stats.docsExamined / Math.max(stats.returned, 1);
+          const problems = [];
+          // An unfiltered, unsorted page is a COLLSCAN by nature (and stops at the limit).
+          const scoped = Object.keys(find.filter).length > 0 || find.options.sort;
+          if (stats.collscan && scoped) problems.push("COLLSCAN");
+          if (ratio > args.maxRatio) problems.push(`examined/returned ${ratio.toFixed(1)} > ${args.maxRatio}`);
+          const known = problems.length > 0 && risks.length > 0;
+          const status = !problems.length ? "ok" : known && !args.strict ? "known" : "FAIL";
+          if (status === "FAIL") failed++;
+          const shape = filters.length ? "?" + filters.map((f) => f.param).join("&") : "(no filter)";
+          results.push({ handler: endpoint.handler, shape, query, ...stats, ratio, status, problems, risks });
+          const mark = { ok: "✔", known: "⚠", FAIL: "✘" }[status];
+          console.log(
+            `${mark} ${endpoint.handler} ${shape}: ${stats.stages.join(" <- ")} ` +
+            `returned=${stats.returned} docs=${stats.docsExamined} keys=${stats.keysExamined}` +
+            (stats.inMemorySort ? " (in-memory sort)" : "") +
+            (problems.length ? ` — ${problems.join(", ")}` : "") +
+            (status === "known" ? ` [known: ${risks.join("; ")}]` : "")
+          );
+        }
+      }
+    }
+
+    if (args.json) fs.writeFileSync(args.json, JSON.stringify({ maxRatio: args.maxRatio, counts, results }, null, 2) + "\n");
+    console.log(`\n${results.length} queries explained, ${failed} failed`);
+  } finally {
+    await mongoose.disconnect();
+    await mongod.stop();
+  }
+  process.exit(failed ? 1 : 0);
+};
+
+main().catch((err) => {
+  console.error("❌ explain check failed:", err);
+  process.exit(2);
+});
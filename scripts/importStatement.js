@@ -0,0 +1,77 @@
+// importStatement.js
+// Import a bank / UPI statement CSV as transactions.
+//
+//   npm run import:statement -- statement.csv --method upi --month 2024-05
+//   node scripts/importStatement.js statement.csv --dry-run --json report.json
+//
+// Same import as POST /transactions/import: the file is streamed, each credit
+// is matched to an open bill by tenant mobile, amount (the bill's balance)
+// and period, and matched rows are inserted in batches. Rows already imported
+// (same bank reference) are skipped. Uses MONGO_URI from .env.
+//
+// Options:
+//   --method M       transaction method (default bank)
+//   --month YYYY-MM  only match bills overlapping this month
+//   --from / --to    only match bills overlapping [from, to) (ISO dates)
+//   --dry-run        match and report, write nothing
+//   --json FILE      write the full report as JSON
+//   --limit N        unmatched / ambiguous rows to print (default 50)
+
+import fs from "fs";
+import dotenv from "dotenv";
+import mongoose from "mongoose";
+import { importStatement } from "../src/services/statementImportService.js";
+
+dotenv.config();
+
+const parseArgs = (argv) => {
+  const args = { file: null, options: { method: "bank", dryRun: false }, json: null, limit: 50 };
+  for (let i = 0; i < argv.length; i++) {
+    const a = argv[i];
+    if (a === "--method") args.options.method = argv[++i];
+    else if (a === "--month") args.options.month = argv[++i];
+    else if (a === "--from") args.options.period_start = new Date(argv[++i]);
+    else if (a === "--to") args.options.period_end = new Date(argv[++i]);
+    else if (a === "--dry-run") args.options.dryRun = true;
+    else if (a === "--json") args.json = argv[++i];
+    else if (a === "--limit") args.limit = Number(argv[++i]);
+    else if (!a.startsWith("--") && !args.file) args.file = a;
+    else throw new Error(`unknown option ${a}`);
+  }
+  if (!args.file) throw new Error("usage: importStatement.js FILE [options]");
+  if (!args.options.period_start !== !args.options.period_end) throw new Error("--from and --to go together");
+  return args;
+};
+
+const fmt = (d) => (d ? d.toISOString().slice(0, 10) : "?");
+
+const main = async () => {
+  const args = parseArgs(process.argv.slice(2));
+  await mongoose.connect(process.env.MONGO_URI);
+  try {
+    const started = Date.now();
+    const report = await importStatement(fs.createReadStream(args.file), args.options);
+    const rows = [...report.ambiguous.map((r) => ({ ...r, kind: "?" })), ...report.unmatched.map((r) => ({ ...r, kind: "✘" }))]
+      .sort((a, b) => a.line - b.line)
+      .slice(0, args.limit);
+    for (const r of rows) {
+      console.log(`${r.kind} line ${r.line}: ${fmt(r.date)} ${r.amount} ${r.mobile || "-"} ${r.reference || ""} — ${r.reason}`);
+    }
+    if (args.json) fs.writeFileSync(args.json, JSON.stringify(report, null, 2));
+    console.log(
+      `rows: ${report.rows}, ${report.matched} matched${args.options.dryRun ? " (dry run)" : `, ${report.inserted} inserted`}, ` +
+        `${report.duplicates} already imported, ${report.unmatchedCount} unmatched, ${report.ambiguousCount} ambiguous, ` +
+        `${report.skipped} debits skipped (${Date.now() - started} ms)`
+    );
+    return report.unmatchedCount || report.ambiguousCount ? 1 : 0;
+  } finally {
+    await mongoose.disconnect();
+  }
+};
+
+main()
+  .then((code) => process.exit(code))
+  .catch((err) => {
+    console.error(err);
+    process.exit(2);
+  });
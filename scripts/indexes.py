@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# indexes.py
+# Plan compound indexes for the generated list endpoints and write them into
+# src/models/*.js (see scripts/codegen/indexes.py for the rules).
+#
+#   python3 scripts/indexes.py              # update model files + print the report
+#   python3 scripts/indexes.py --dry-run    # report only
+#   python3 scripts/indexes.py --check      # CI: exit 1 if a model file is out of date
+#   python3 scripts/indexes.py --strict     # also exit 1 on remaining collection-scan risks
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from codegen.indexes import load_models, plan_indexes, remaining_risks, report, sync_models  # noqa: E402
+from codegen.spec import load_spec  # noqa: E402
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Plan ESR indexes for list filters and sorts.")
+    ap.add_argument("--dry-run", action="store_true", help="print the report, write nothing")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any model file would change")
+    ap.add_argument("--strict", action="store_true", help="exit 1 if collection-scan risks remain")
+    args = ap.parse_args(argv)
+
+    plans = plan_indexes(load_spec(), load_models())
+    print(report(plans))
+    print()
+
+    changed = sync_models(plans, check=args.check, dry_run=args.dry_run)
+    rel = [str(p.relative_to(ROOT)) for p in changed]
+    if args.check:
+        for path in rel:
+            print(f"✘ out of date: {path}")
+    elif args.dry_run:
+        for path in rel:
+            print(f"~ would update {path}")
+    else:
+        for path in rel:
+            print(f"✔ wrote {path}")
+
+    risks = remaining_risks(plans)
+    print(f"indexes: {sum(len(p.planned) for p in plans.values())} planned, "
+          f"{len(changed)} model file(s) {'out of date' if args.check else 'changed'}, "
+          f"{len(risks)} collection-scan risk(s) left")
+    if args.check and changed:
+        return 1
+    if args.strict and risks:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
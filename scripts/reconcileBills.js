@@ -0,0 +1,67 @@
+// reconcileBills.js
+// Rebuild Bill.paid / balance / status from transactions.
+//
+//   npm run reconcile:bills
+//   node scripts/reconcileBills.js --dry-run
+//   node scripts/reconcileBills.js --month 2024-05 --pg <pgId>
+//
+// The transaction controller keeps these fields current with one atomic
+// update per write; this is the bulk repair for anything that slipped past
+// it (a crash between the two writes, edits made directly in the database)
+// and the backfill for bills created before the fields existed. Only bills
+// whose values differ are written. The server runs the same job for the
+// last two months on a schedule; without a scope this rebuilds every bill.
+// Uses MONGO_URI from .env.
+//
+// Options:
+//   --dry-run        report what would change, write nothing
+//   --month YYYY-MM  only bills overlapping this month
+//   --from / --to    only bills overlapping [from, to) (ISO dates)
+//   --pg ID          only bills of this PG
+
+import dotenv from "dotenv";
+import mongoose from "mongoose";
+import { reconcileBills } from "../src/services/paymentService.js";
+
+dotenv.config();
+
+const parseArgs = (argv) => {
+  const args = { dryRun: false };
+  for (let i = 0; i < argv.length; i++) {
+    const a = argv[i];
+    if (a === "--dry-run") args.dryRun = true;
+    else if (a === "--month") args.month = argv[++i];
+    else if (a === "--from") args.period_start = new Date(argv[++i]);
+    else if (a === "--to") args.period_end = new Date(argv[++i]);
+    else if (a === "--pg") args.pgId = argv[++i];
+    else throw new Error(`unknown option ${a}`);
+  }
+  if (!args.period_start !== !args.period_end) throw new Error("--from and --to go together");
+  return args;
+};
+
+const main = async () => {
+  const args = parseArgs(process.argv.slice(2));
+  await mongoose.connect(process.env.MONGO_URI);
+  try {
+    const started = Date.now();
+    const { scanned, changed, drift } = await reconcileBills(args);
+    for (const [transition, count] of Object.entries(drift.transitions)) {
+      console.log(`  ${transition}: ${count}`);
+    }
+    console.log(
+      `bills: ${scanned} scanned, ${changed} ${args.dryRun ? "would change" : "updated"}, ` +
+        `${drift.paid} paid drift (${drift.amount} total), ${drift.status} status drift (${Date.now() - started} ms)`
+    );
+    return 0;
+  } finally {
+    await mongoose.disconnect();
+  }
+};
+
+main()
+  .then((code) => process.exit(code))
+  .catch((err) => {
+    console.error(err);
+    process.exit(2);
+  });
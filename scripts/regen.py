@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# regen.py
+# One entry point for both generators (controllers + routes).
+#
+#   python3 scripts/regen.py                                # everything
+#   python3 scripts/regen.py --only billController,bills.js
+#   python3 scripts/regen.py --check                        # CI drift check
+#   python3 scripts/regen.py --watch                        # rebuild on every save
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from codegen import cli  # noqa: E402
+from codegen.registry import load_generator  # noqa: E402
+
+GENERATORS = [
+    ROOT / "src" / "controllers" / "controllerGen.py",
+    ROOT / "src" / "routes" / "genRoutes.py",
+]
+
+
+def registries():
+    return [load_generator(path).REGISTRY for path in GENERATORS]
+
+
+def main(argv=None):
+    return cli.main(registries(), "Regenerate controllers and routes.", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
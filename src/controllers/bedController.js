@@ -1,29 +1,30 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage } from "./helpers.js";
 import Bed from "../models/Bed.js";
 import Occupancy from "../models/Occupancy.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "roomId", "bedNo", "notes", "defaultCost", "createdAt", "updatedAt"];
+
 export const getBeds = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.roomId) filter.roomId = req.query.roomId;
   if (req.query.pgId) filter.pgId = req.query.pgId; // only if denormalized; else ignore
   if (req.query.isOccupied !== undefined) filter.isOccupied = req.query.isOccupied === "true";
-  const [items, total] = await Promise.all([
-    Bed.find(filter).skip(skip).limit(limit).lean(),
-    Bed.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Bed, filter, req, { fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getBed = asyncHandler(async (req, res) => {
-  const item = await Bed.findById(req.params.id).lean();
+  const item = await Bed.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
 export const createBed = asyncHandler(async (req, res) => {
-  const bed = await Bed.create(req.body);
-  return created(res, bed);
+  const item = await Bed.create(req.body);
+  return created(res, item);
 });
 
 export const updateBed = asyncHandler(async (req, res) => {
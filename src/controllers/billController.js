@@ -1,12 +1,17 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
-import Bill from "../models/Bill.js";
-import Transaction from "../models/Transaction.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage, streamExport } from "./helpers.js";
+import Bill, { settleStage } from "../models/Bill.js";
 import Bed from "../models/Bed.js";
+import { insertChunk, prorate, repriceBills } from "../services/billingService.js";
+import { reconcileBills } from "../services/paymentService.js";
+import { syncArrears } from "../services/arrearsService.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
-// GET /bills
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "bedId", "tenantId", "occupancyId", "billingRunId", "period_start", "period_end", "amount", "paid", "balance", "status", "remarks", "createdAt", "updatedAt"];
+
 export const getBills = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.tenantId) filter.tenantId = req.query.tenantId;
   if (req.query.bedId) filter.bedId = req.query.bedId;
@@ -15,61 +20,66 @@ export const getBills = asyncHandler(async (req, res) => {
     filter.period_start = { $lt: new Date(req.query.to) };
     filter.period_end = { $gt: new Date(req.query.from) };
   }
-  const [items, total] = await Promise.all([
-    Bill.find(filter).skip(skip).limit(limit).lean(),
-    Bill.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Bill, filter, req, { sort: { createdAt: -1 }, fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getBill = asyncHandler(async (req, res) => {
-  const item = await Bill.findById(req.params.id).lean();
+  const item = await Bill.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
+// Streams every match of the list filters: ?format=ndjson|csv
+export const exportBills = asyncHandler(async (req, res) => {
+  const filter = {};
+  if (req.query.tenantId) filter.tenantId = req.query.tenantId;
+  if (req.query.bedId) filter.bedId = req.query.bedId;
+  if (req.query.status) filter.status = req.query.status;
+  if (req.query.from && req.query.to) {
+    filter.period_start = { $lt: new Date(req.query.to) };
+    filter.period_end = { $gt: new Date(req.query.from) };
+  }
+  await streamExport(Bill, filter, req, res, { sort: { createdAt: -1 }, fields: FIELDS, name: "bills" });
+});
+
+// paid / balance / status are maintained from transactions
+// (Bill.applyPayment), never written by clients. Every bill write
+// also refreshes the bill's row in the arrears report (syncArrears).
+const DERIVED = ["paid", "balance", "status"];
+
 export const createBill = asyncHandler(async (req, res) => {
-  const bill = await Bill.create(req.body);
-  return created(res, bill);
+  const item = await Bill.create(req.body);
+  await syncArrears([item._id]);
+  return created(res, item);
 });
 
+// PATCH /bills/:id  an amount change re-derives balance and status in the same update.
+// In a pipeline $set, strings like "$amount" are expressions, so client
+// values go in as $literal.
 export const updateBill = asyncHandler(async (req, res) => {
-  const bill = await Bill.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-  return ok(res, bill);
+  const changes = Object.fromEntries(Object.entries(req.body).filter(([key]) => !DERIVED.includes(key)));
+  const literal = (values) => Object.fromEntries(Object.entries(values).map(([key, value]) => [key, { $literal: value }]));
+  const update = "amount" in changes ? [{ $set: literal(Bill.castObject(changes)) }, settleStage] : changes;
+  const item = await Bill.findByIdAndUpdate(req.params.id, update, { new: true }).lean();
+  if (item) await syncArrears([item._id]);
+  return ok(res, item);
 });
 
 export const deleteBill = asyncHandler(async (req, res) => {
-  await Bill.findByIdAndDelete(req.params.id);
+  const item = await Bill.findByIdAndDelete(req.params.id).lean();
+  if (item) await syncArrears([item._id]);
   return noContent(res);
 });
 
-// Helpers
-const computePaidForBill = async (billId) => {
-  const agg = await Transaction.aggregate([
-    { $match: { billId } },
-    { $group: { _id: "$billId", paid: { $sum: "$amount" } } }
-  ]);
-  return agg[0]?.paid || 0;
-};
-
-const deriveStatus = (amount, paid) => {
-  if (paid <= 0) return "pending";
-  if (paid < amount) return "partial";
-  return "paid";
-};
-
-// GET /bills/:id/summary
+// GET /bills/:id/summary  (stored totals: one indexed read)
 export const getBillSummary = asyncHandler(async (req, res) => {
   const bill = await Bill.findById(req.params.id).lean();
   if (!bill) return res.status(404).json({ success: false, message: "Bill not found" });
-  const paid = await computePaidForBill(bill._id);
-  const balance = Number((bill.amount - paid).toFixed(2));
-  return ok(res, {
-    ...bill,
-    summary: { amount: bill.amount, paid, balance, status: deriveStatus(bill.amount, paid) }
-  });
+  const { amount, paid = 0, balance = amount - paid, status } = bill;
+  return ok(res, { ...bill, summary: { amount, paid, balance, status } });
 });
 
-// POST /bills/:id/recalculate  (basic proration using bed.defaultCost)
+// POST /bills/:id/recalculate  (proration using bed.defaultCost, per calendar month)
 export const recalculateBill = asyncHandler(async (req, res) => {
   const bill = await Bill.findById(req.params.id).lean();
   if (!bill) return res.status(404).json({ success: false, message: "Bill not found" });
@@ -77,29 +87,65 @@ export const recalculateBill = asyncHandler(async (req, res) => {
   const bed = await Bed.findById(bill.bedId).lean();
   const cost = bed?.defaultCost || bill.amount;
 
-  const start = new Date(bill.period_start);
-  const end = new Date(bill.period_end);
-  const msDay = 24*60*60*1000;
-  const days = Math.max(1, Math.ceil((end - start) / msDay));
-  const monthStart = new Date(start.getFullYear(), start.getMonth(), 1);
-  const nextMonth = new Date(start.getFullYear(), start.getMonth()+1, 1);
-  const daysInMonth = Math.round((nextMonth - monthStart) / msDay);
-
-  const newAmount = Number(((cost / daysInMonth) * days).toFixed(2));
-  const updated = await Bill.findByIdAndUpdate(req.params.id, { $set: { amount: newAmount } }, { new: true }).lean();
+  const { amount: newAmount } = prorate(cost, new Date(bill.period_start), new Date(bill.period_end));
+  const updated = await Bill.findByIdAndUpdate(req.params.id, [{ $set: { amount: newAmount } }, settleStage], { new: true }).lean();
+  await syncArrears([bill._id]);
   return ok(res, updated);
 });
 
-// POST /bills/:id/mark-paid  (usually you won’t need this if deriving from transactions)
+// POST /bills/recalculate  { month | period_start/period_end, pgId, bedIds, defaultCost, includePaid, dryRun }
+// Re-prices every bill in scope from current bed costs in one request
+// (see repriceBills in services/billingService.js).
+export const recalculateBills = asyncHandler(async (req, res) => {
+  const stats = await repriceBills(req.body);
+  return ok(res, stats);
+});
+
+// POST /bills/reconcile  { month | period_start/period_end, pgId, dryRun }
+// paid / balance / status of every bill in scope rebuilt from transactions
+// in one pass (also runs on a schedule, see services/paymentService.js).
+export const reconcileBillPayments = asyncHandler(async (req, res) => {
+  const stats = await reconcileBills(req.body);
+  return ok(res, stats);
+});
+
+// POST /bills/:id/mark-paid  (usually you won’t need this: paid/status follow transactions)
+// Re-derives this bill's totals from its transactions.
 export const markBillPaid = asyncHandler(async (req, res) => {
-  const bill = await Bill.findById(req.params.id).lean();
+  const bill = await Bill.findById(req.params.id, { _id: 1 }).lean();
   if (!bill) return res.status(404).json({ success: false, message: "Bill not found" });
-  const paid = await computePaidForBill(bill._id);
-  const status = deriveStatus(bill.amount, paid);
-  const updated = await Bill.findByIdAndUpdate(req.params.id, { $set: { status } }, { new: true }).lean();
+  await reconcileBills({ billIds: [bill._id] });
+  const updated = await Bill.findById(bill._id).lean();
   return ok(res, updated);
 });
 
+// POST /bills/bulk  { bills: [...] }
+// The hooks' occupancy and overlap checks run once for the whole batch
+// (Bill.validateBatch), then valid bills are inserted unordered. Invalid
+// ones are reported by index; the rest are still created.
+export const createBills = asyncHandler(async (req, res) => {
+  const docs = req.body.bills.map((raw) => new Bill(raw));
+  const errors = docs.map((doc) => doc.validateSync()?.message ?? null);
+  const checked = docs.flatMap((doc, i) => (errors[i] ? [] : [i]));
+  const batchErrors = await Bill.validateBatch(checked.map((i) => docs[i]));
+  batchErrors.forEach((message, j) => {
+    if (message) errors[checked[j]] = message;
+  });
+
+  const now = new Date();
+  const rows = docs
+    .filter((_, i) => !errors[i])
+    .map((doc) => ({ ...doc.toObject(), paid: 0, balance: doc.amount, status: "pending", createdAt: now, updatedAt: now }));
+  const result = await insertChunk(rows);
+  return created(res, {
+    created: result.created,
+    duplicates: result.duplicates,
+    failed: result.failed,
+    invalid: errors.flatMap((message, index) => (message ? [{ index, message }] : [])),
+    errors: result.errors
+  });
+});
+
 // Tenant helpers
 export const getTenantBills = asyncHandler(async (req, res) => {
   const items = await Bill.find({ tenantId: req.params.id }).lean();
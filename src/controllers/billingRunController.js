@@ -1,15 +1,30 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";// This is a stub; wire to your billing service logic.
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok } from "./helpers.js";
+import BillingRun from "../models/BillingRun.js";
+import { previewBilling } from "../services/billingService.js";
+import { startBillingRun, withProgress } from "../services/billingRunService.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// POST /billing/runs  { month: "YYYY-MM" } or { period_start, period_end }, optional pgId
+// Bills every occupancy active in the period. The run is stored and
+// executed in the background (see services/billingRunService.js); poll
+// GET /billing/runs/:id for progress.
 export const createBillingRun = asyncHandler(async (req, res) => {
-  // TODO: generate bills based on occupancies & period in req.body
-  return created(res, { runId: "stub", createdBills: [] });
+  const run = await startBillingRun(req.body);
+  res.location(`${req.baseUrl}/${run._id}`);
+  return res.status(202).json({ success: true, data: withProgress(run) });
 });
 
+// POST /billing/runs/preview  same body as a run; nothing is written
 export const previewBillingRun = asyncHandler(async (req, res) => {
-  return ok(res, { preview: true, wouldCreate: [] });
+  const preview = await previewBilling(req.body);
+  return ok(res, { preview: true, ...preview });
 });
 
+// GET /billing/runs/:id  status, checkpoint and live counters
 export const getBillingRun = asyncHandler(async (req, res) => {
-  return ok(res, { id: req.params.id, status: "done", stats: {} });
+  const run = await BillingRun.findById(req.params.id).lean();
+  if (!run) return res.status(404).json({ success: false, message: "Billing run not found" });
+  return ok(res, withProgress(run));
 });
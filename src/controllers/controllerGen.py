@@ -1,45 +1,389 @@
 # controllerGen.py
 # Generates ESM controller files for your MERN backend.
 # Place this file in /controllers and run:  python3 controllerGen.py
-
+# (add --watch to keep it running and rebuild whenever resources.json changes)
+#
+# CRUD handlers, list filters and model imports come from resources.json
+# (see scripts/codegen/spec.py). Hand-written handlers live in the EXTRAS
+# templates below, keyed by controller name.
+
+import hashlib
+import re
+import sys
+from functools import cache
 from pathlib import Path
-from textwrap import dedent
+from textwrap import indent
 
 BASE = Path(__file__).parent.resolve()
+MODELS = BASE.parent / "models"
+sys.path.insert(0, str(BASE.parents[1] / "scripts"))
 
-def write(path: Path, content: str):
-    path.write_text(content.strip() + "\n", encoding="utf-8")
-    print(f"✔ wrote {path.relative_to(BASE)}")
-
-HDR = "// Auto-generated by controllerGen.py — feel free to edit.\n"
-
-def mk_common_list_helpers():
-    return dedent("""
-        // Common helpers
-        const parsePaging = (req) => {
-          const page = Math.max(parseInt(req.query.page || "1", 10), 1);
-          const limit = Math.min(Math.max(parseInt(req.query.limit || "20", 10), 1), 100);
-          const skip = (page - 1) * limit;
-          return { page, limit, skip };
-        };
-
-        const ok = (res, data, meta) => {
-          const body = { success: true, data };
-          if (meta) body.meta = meta;
-          return res.status(200).json(body);
-        };
+from codegen import cli  # noqa: E402
+from codegen.indexes import parse_model  # noqa: E402
+from codegen.registry import Registry  # noqa: E402
+from codegen.spec import SpecError, load_spec  # noqa: E402
+from codegen.templates import template  # noqa: E402
 
-        const created = (res, data) => res.status(201).json({ success: true, data });
-        const noContent = (res) => res.status(204).json({ success: true });
-    """)
+# Bump when a template change should invalidate every manifest entry.
+GENERATOR_VERSION = "6"
 
-# ---------- INDIVIDUAL CONTROLLERS ----------
+HDR = "// Auto-generated by controllerGen.py — feel free to edit.\n"
 
-def auth_controller():
-    return HDR + dedent("""
-        import User from "../models/User.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
+# Shared by every controller; emitted once as helpers.js and imported.
+HELPERS = template(r"""
+    import { Transform } from "stream";
+    import { pipeline } from "stream/promises";
+
+    // Common helpers
+    export const parsePaging = (req) => {
+      const page = Math.max(parseInt(req.query.page || "1", 10), 1);
+      const limit = Math.min(Math.max(parseInt(req.query.limit || "20", 10), 1), 100);
+      const skip = (page - 1) * limit;
+      return { page, limit, skip };
+    };
+
+    export const ok = (res, data, meta) => {
+      const body = { success: true, data };
+      if (meta) body.meta = meta;
+      return res.status(200).json(body);
+    };
+
+    export const created = (res, data) => res.status(201).json({ success: true, data });
+    export const noContent = (res) => res.status(204).json({ success: true });
+
+    export const badRequest = (message) => Object.assign(new Error(message), { statusCode: 400 });
+
+    // Sparse fieldsets: ?fields=name,mobile -> { name: 1, mobile: 1, _id: 0 }.
+    // Names must be in the controller's allowlist. _id is only returned when
+    // asked for, so a projection of indexed fields can be answered from the
+    // index alone (covered read).
+    export const parseFields = (req, allowed) => {
+      if (!req.query.fields) return undefined;
+      const names = [...new Set(String(req.query.fields).split(",").map((s) => s.trim()).filter(Boolean))];
+      const unknown = names.filter((name) => !allowed.includes(name));
+      if (unknown.length) throw badRequest(`Unknown field(s) ${unknown.join(", ")}; allowed: ${allowed.join(", ")}`);
+      const projection = Object.fromEntries(names.map((name) => [name, 1]));
+      if (!projection._id) projection._id = 0;
+      return projection;
+    };
+
+    // Keyset pagination
+    // The cursor is the sort key values (always ending in _id) of the last row
+    // of a page, base64url-encoded JSON. Mongoose casts them back to Date /
+    // ObjectId through the schema, so the cursor stays opaque to clients.
+    const withTiebreak = (sort = {}) => ("_id" in sort ? sort : { ...sort, _id: Object.values(sort)[0] || 1 });
+
+    const encodeCursor = (doc, order) =>
+      Buffer.from(JSON.stringify(Object.keys(order).map((key) => doc[key] ?? null))).toString("base64url");
+
+    // Only scalars are accepted back: the values go straight into the range
+    // query, and an object would carry operators past express-mongo-sanitize,
+    // which never sees inside the base64.
+    const decodeCursor = (token, order) => {
+      let values;
+      try {
+        values = JSON.parse(Buffer.from(String(token), "base64url").toString("utf8"));
+      } catch {
+        values = null;
+      }
+      const scalar = (value) => value === null || ["string", "number", "boolean"].includes(typeof value);
+      if (!Array.isArray(values) || values.length !== Object.keys(order).length || !values.every(scalar)) {
+        throw badRequest("Invalid cursor");
+      }
+      return values;
+    };
+
+    // Rows strictly after the cursor in `order`:
+    // (k1 > v1) or (k1 = v1 and k2 > v2) or ...   ($lt for descending keys)
+    const afterCursor = (order, values) => {
+      const keys = Object.keys(order);
+      return {
+        $or: keys.map((key, i) => {
+          const clause = Object.fromEntries(keys.slice(0, i).map((k, j) => [k, values[j]]));
+          clause[key] = { [order[key] < 0 ? "$lt" : "$gt"]: values[i] };
+          return clause;
+        })
+      };
+    };
+
+    // Totals
+    //   exact     countDocuments(filter), in parallel with the page query
+    //   estimate  estimatedDocumentCount() (collection metadata) when unfiltered;
+    //             otherwise an exact count cached per filter for COUNT_TTL_MS
+    //   none      no count; hasNext comes from fetching limit + 1 rows
+    const COUNT_MODES = ["none", "estimate", "exact"];
+    const COUNT_TTL_MS = 30 * 1000;
+    const COUNT_CACHE_MAX = 1000;
+    const countCache = new Map();   // "Model:filter" -> { total, expires }, oldest first
+
+    const cachedCount = async (Model, filter) => {
+      const key = `${Model.modelName}:${JSON.stringify(filter)}`;
+      const now = Date.now();
+      const hit = countCache.get(key);
+      if (hit && hit.expires > now) return hit.total;
+      const total = await Model.countDocuments(filter);
+      countCache.delete(key);
+      if (countCache.size >= COUNT_CACHE_MAX) countCache.delete(countCache.keys().next().value);
+      countCache.set(key, { total, expires: now + COUNT_TTL_MS });
+      return total;
+    };
+
+    const countDocs = (Model, filter, mode) => {
+      if (mode === "none") return undefined;
+      if (mode === "exact") return Model.countDocuments(filter);
+      return Object.keys(filter).length ? cachedCount(Model, filter) : Model.estimatedDocumentCount();
+    };
+
+    // One page of Model.find(filter) in `sort` order.
+    //   ?after=<cursor>  keyset mode: range query on the sort index, no skip
+    //   ?page=N          offset mode (kept for existing clients)
+    //   ?count=none|estimate|exact   defaults: exact with ?page, none with ?after
+    //   ?fields=a,b      projection (see parseFields); the sort keys are always
+    //                    included because the cursor is built from them
+    // Both modes return meta.nextCursor, so a client can switch to cursors at any page.
+    export const findPage = async (Model, filter, req, { sort, fields } = {}) => {
+      const { page, limit, skip } = parsePaging(req);
+      const keyset = req.query.after !== undefined;
+      const count = req.query.count || (keyset ? "none" : "exact");
+      if (!COUNT_MODES.includes(count)) throw badRequest(`count must be one of ${COUNT_MODES.join(", ")}`);
+      const order = withTiebreak(sort);
+
+      let query = filter;
+      if (keyset && req.query.after) query = { $and: [filter, afterCursor(order, decodeCursor(req.query.after, order))] };
+      const projection = fields && parseFields(req, fields);
+      if (projection) Object.keys(order).forEach((key) => { projection[key] = 1; });
+      const find = Model.find(query, projection).sort(order);
+      if (!keyset) find.skip(skip);
+      const [items, total] = await Promise.all([find.limit(limit + 1).lean(), countDocs(Model, filter, count)]);
+
+      const hasNext = items.length > limit;
+      if (hasNext) items.pop();
+      const meta = keyset ? { limit } : { page, limit };
+      if (total !== undefined) meta.total = total;
+      if (count === "estimate") meta.estimated = true;
+      meta.hasNext = hasNext;
+      meta.nextCursor = hasNext ? encodeCursor(items[items.length - 1], order) : null;
+      return { items, meta };
+    };
+
+    // Streaming export
+    // The cursor is piped through a transform into the response, so the stream
+    // pauses while the client is slow and memory stays flat at one cursor batch
+    // whatever the size of the export.
+    const EXPORT_FORMATS = {
+      ndjson: { type: "application/x-ndjson; charset=utf-8", ext: "ndjson" },
+      csv: { type: "text/csv; charset=utf-8", ext: "csv" }
+    };
+    const EXPORT_BATCH = 1000;
+
+    const csvCell = (value) => {
+      if (value === null || value === undefined) return "";
+      let text;
+      if (value instanceof Date) text = value.toISOString();
+      else if (typeof value === "object" && !value._bsontype) text = JSON.stringify(value);
+      else text = String(value);
+      // Cells starting with = + - @ are formulas to a spreadsheet
+      if (typeof value === "string" && /^[=+\-@\t\r]/.test(text)) text = `'${text}`;
+      return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+    };
+    const csvRow = (values) => values.map(csvCell).join(",") + "\r\n";
+
+    const exportTransform = (format, columns) => {
+      let header = format === "csv";
+      return new Transform({
+        writableObjectMode: true,
+        transform(doc, _encoding, done) {
+          let chunk = format === "csv" ? csvRow(columns.map((key) => doc[key])) : JSON.stringify(doc) + "\n";
+          if (header) {
+            chunk = csvRow(columns) + chunk;
+            header = false;
+          }
+          done(null, chunk);
+        },
+        flush(done) {
+          done(null, header ? csvRow(columns) : undefined);
+        }
+      });
+    };
+
+    // Every match of Model.find(filter) in `sort` order, no paging.
+    //   ?format=ndjson|csv   (default ndjson)
+    //   ?fields=a,b          projection and CSV columns (default: every allowed field)
+    export const streamExport = async (Model, filter, req, res, { sort, fields, name } = {}) => {
+      const format = req.query.format || "ndjson";
+      const spec = EXPORT_FORMATS[format];
+      if (!spec) throw badRequest(`format must be one of ${Object.keys(EXPORT_FORMATS).join(", ")}`);
+      const projection = fields && parseFields(req, fields);
+      const columns = projection ? Object.keys(projection).filter((key) => projection[key]) : fields || [];
+      const cursor = Model.find(filter, projection).sort(withTiebreak(sort)).lean().cursor({ batchSize: EXPORT_BATCH });
+
+      const stamp = new Date().toISOString().slice(0, 10);
+      res.status(200);
+      res.set("Content-Type", spec.type);
+      res.set("Content-Disposition", `attachment; filename="${name || Model.collection.name}-${stamp}.${spec.ext}"`);
+      try {
+        await pipeline(cursor, exportTransform(format, columns), res);
+      } catch (err) {
+        // Before the first row the error handler can still answer with JSON;
+        // after it the response can only be cut short.
+        if (!res.headersSent) throw err;
+        if (err.code !== "ERR_STREAM_PREMATURE_CLOSE") res.destroy(err);
+      }
+    };
+""")
+
+HELPER_NAMES = ("parsePaging", "ok", "created", "noContent", "badRequest", "parseFields", "findPage",
+                "streamExport")
+HELPER_CALL = re.compile(r"\b(" + "|".join(HELPER_NAMES) + r")\(")
+NAMED_IMPORT = re.compile(r'import \{ (?P<names>[^}]+) \} from "\.\./models/(?P<model>\w+)\.js";$')
+
+# ---------- SPEC-DRIVEN PARTS ----------
+
+def mk_imports(res, body, extra=()):
+    lines = []
+    used = set(HELPER_CALL.findall(body)) if res.helpers else ()
+    if used:
+        names = ", ".join(n for n in HELPER_NAMES if n in used)
+        lines.append(f'import {{ {names} }} from "./helpers.js";')
+    # named imports from a model file join its default import
+    named, rest = {}, []
+    for line in extra:
+        m = NAMED_IMPORT.match(line)
+        if m and m["model"] in res.all_models:
+            named[m["model"]] = m["names"]
+        else:
+            rest.append(line)
+    for m in res.all_models:
+        names = f", {{ {named[m]} }}" if m in named else ""
+        lines.append(f'import {m}{names} from "../models/{m}.js";')
+    lines += rest
+    lines.append('import { asyncHandler } from "../middlewares/errorHandler.js";')
+    return "\n" + "\n".join(lines) + "\n"
+
+def mk_filter(f):
+    q = f"req.query.{f.param}"
+    note = f" // {f.comment}" if f.comment else ""
+    if f.kind == "eq":
+        if f.type == "bool":
+            return f'if ({q} !== undefined) filter.{f.field} = {q} === "true";{note}'
+        value = {"number": f"Number({q})", "lowercase": f"{q}.toLowerCase()"}.get(f.type, q)
+        return f"if ({q}) filter.{f.field} = {value};{note}"
+    if f.kind == "search":
+        rx = f'{{ $regex: {q}, $options: "i" }}'
+        if len(f.fields) == 1:
+            return f"if ({q}) filter.{f.fields[0]} = {rx};{note}"
+        ors = ",\n".join(f"    {{ {name}: {rx} }}" for name in f.fields)
+        return f"if ({q}) {{{note}\n  filter.$or = [\n{ors}\n  ];\n}}"
+    if f.kind == "open":
+        return (f"if ({q} !== undefined) {{{note}\n"
+                f'  filter.{f.field} = {q} === "true" ? null : {{ $ne: null }};\n}}')
+    if f.kind == "overlap":
+        end = (f"  filter.$or = [{{ {f.end}: null }}, {{ {f.end}: {{ $gt: new Date({q}) }} }}];"
+               if f.open_end else f"  filter.{f.end} = {{ $gt: new Date({q}) }};")
+        return (f"if ({q} && req.query.to) {{{note}\n"
+                f"  filter.{f.start} = {{ $lt: new Date(req.query.to) }};\n{end}\n}}")
+    if f.kind == "range":
+        return (f"if ({q} && req.query.to) {{{note}\n"
+                f"  filter.{f.field} = {{ $gte: new Date({q}), $lte: new Date(req.query.to) }};\n}}")
+    raise SpecError(f"unsupported filter kind {f.kind!r}")
+
+def mk_page_options(res, *extra):
+    """findPage() / streamExport() options: the list order (_id is appended
+    by the helper) and the ?fields= allowlist, plus any `extra` entries."""
+    opts = []
+    if res.sort:
+        opts.append("sort: { " + ", ".join(f"{f}: {d}" for f, d in res.sort) + " }")
+    opts.append("fields: FIELDS")
+    return "{ " + ", ".join(opts + list(extra)) + " }"
+
+def field_allowlist(res):
+    """?fields= allowlist: resources.json "fields", else every stored field of the model."""
+    if res.fields:
+        return res.fields
+    path = MODELS / f"{res.model}.js"
+    if not path.exists():
+        raise SpecError(f"{res.name}: models/{res.model}.js does not exist; "
+                        f'write the model first or list "fields" in resources.json')
+    return parse_model(path).fields
+
+def allowlist_key(res):
+    """What field_allowlist() depends on, without parsing the model: the
+    explicit "fields", else the model file's bytes (None while it is missing)."""
+    if not res.crud or res.fields:
+        return res.fields
+    path = MODELS / f"{res.model}.js"
+    return hashlib.sha1(path.read_bytes()).hexdigest() if path.exists() else None
+
+def mk_fields(res):
+    names = ", ".join(f'"{n}"' for n in field_allowlist(res))
+    return f"\n// Fields a client may pick with ?fields=\nconst FIELDS = [{names}];\n"
+
+CRUD_TEMPLATES = {
+    "list": template("""
+        export const {{name}} = asyncHandler(async (req, res) => {
+          const filter = {};
+        {{filters}}  const { items, meta } = await findPage({{M}}, filter, req, {{options}});
+          return ok(res, items, meta);
+        });
+    """),
+    "read": template("""
+        export const {{name}} = asyncHandler(async (req, res) => {
+          const item = await {{M}}.findById(req.params.id, parseFields(req, FIELDS)).lean();
+          return ok(res, item);
+        });
+    """),
+    "create": template("""
+        export const {{name}} = asyncHandler(async (req, res) => {
+          const item = await {{M}}.create(req.body);
+          return created(res, item);
+        });
+    """),
+    "update": template("""
+        export const {{name}} = asyncHandler(async (req, res) => {
+          const item = await {{M}}.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
+          return ok(res, item);
+        });
+    """),
+    "delete": template("""
+        export const {{name}} = asyncHandler(async (req, res) => {
+          await {{M}}.findByIdAndDelete(req.params.id);
+          return noContent(res);
+        });
+    """),
+    "export": template("""
+        // Streams every match of the list filters: ?format=ndjson|csv
+        export const {{name}} = asyncHandler(async (req, res) => {
+          const filter = {};
+        {{filters}}  await streamExport({{M}}, filter, req, res, {{export_options}});
+        });
+    """),
+}
 
+def mk_crud(res, skip=()):
+    """CRUD handlers for res; ops named in `skip` are hand-written in EXTRAS."""
+    filters = "".join(indent(mk_filter(f), "  ") + "\n" for f in res.filters)
+    options = mk_page_options(res)
+    export_options = mk_page_options(res, f'name: "{res.name}"')
+    return mk_fields(res) + "".join(
+        CRUD_TEMPLATES[op].render(name=name, M=res.model, filters=filters, options=options,
+                                  export_options=export_options)
+        for op, name in res.ops.items() if name not in skip)
+
+# ---------- HAND-WRITTEN HANDLERS (per controller) ----------
+# A CRUD handler defined here replaces the generated one of the same name.
+
+EXTRAS = {}
+
+def extras(controller):
+    """Register fn() -> Template; it is compiled on first use only."""
+    def deco(fn):
+        EXTRAS[controller] = cache(fn)
+        return fn
+    return deco
+
+@extras("authController")
+def auth_extras():
+    return template("""
         const setAuthCookie = (res, token) => {
           res.cookie("accessToken", token, {
             httpOnly: true,
@@ -93,44 +437,9 @@ def auth_controller():
         });
     """)
 
-def pg_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Pg from "../models/Pg.js";
-        import Room from "../models/Room.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        // CRUD
-        export const getPgs = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const q = req.query.q?.trim();
-          const filter = q ? { pgName: { $regex: q, $options: "i" } } : {};
-          const [items, total] = await Promise.all([
-            Pg.find(filter).skip(skip).limit(limit).lean(),
-            Pg.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getPg = asyncHandler(async (req, res) => {
-          const item = await Pg.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
-        export const createPg = asyncHandler(async (req, res) => {
-          const item = await Pg.create(req.body);
-          return created(res, item);
-        });
-
-        export const updatePg = asyncHandler(async (req, res) => {
-          const item = await Pg.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, item);
-        });
-
-        export const deletePg = asyncHandler(async (req, res) => {
-          await Pg.findByIdAndDelete(req.params.id);
-          return noContent(res);
-        });
-
+@extras("pgController")
+def pg_extras():
+    return template("""
         // Nested: rooms under PG
         export const getRoomsByPg = asyncHandler(async (req, res) => {
           const items = await Room.find({ pgId: req.params.pgId }).lean();
@@ -144,45 +453,9 @@ def pg_controller():
         });
     """)
 
-def room_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Room from "../models/Room.js";
-        import Bed from "../models/Bed.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        export const getRooms = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.pgId) filter.pgId = req.query.pgId;
-          if (req.query.status) filter.status = req.query.status;
-          if (req.query.floor) filter.floor = Number(req.query.floor);
-          const [items, total] = await Promise.all([
-            Room.find(filter).skip(skip).limit(limit).lean(),
-            Room.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getRoom = asyncHandler(async (req, res) => {
-          const item = await Room.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
-        export const createRoom = asyncHandler(async (req, res) => {
-          const room = await Room.create(req.body);
-          return created(res, room);
-        });
-
-        export const updateRoom = asyncHandler(async (req, res) => {
-          const item = await Room.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, item);
-        });
-
-        export const deleteRoom = asyncHandler(async (req, res) => {
-          await Room.findByIdAndDelete(req.params.id);
-          return noContent(res);
-        });
-
+@extras("roomController")
+def room_extras():
+    return template("""
         // Nested beds under room
         export const getBedsByRoom = asyncHandler(async (req, res) => {
           const items = await Bed.find({ roomId: req.params.id }).lean();
@@ -195,45 +468,9 @@ def room_controller():
         });
     """)
 
-def bed_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Bed from "../models/Bed.js";
-        import Occupancy from "../models/Occupancy.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        export const getBeds = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.roomId) filter.roomId = req.query.roomId;
-          if (req.query.pgId) filter.pgId = req.query.pgId; // only if denormalized; else ignore
-          if (req.query.isOccupied !== undefined) filter.isOccupied = req.query.isOccupied === "true";
-          const [items, total] = await Promise.all([
-            Bed.find(filter).skip(skip).limit(limit).lean(),
-            Bed.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getBed = asyncHandler(async (req, res) => {
-          const item = await Bed.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
-        export const createBed = asyncHandler(async (req, res) => {
-          const bed = await Bed.create(req.body);
-          return created(res, bed);
-        });
-
-        export const updateBed = asyncHandler(async (req, res) => {
-          const item = await Bed.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, item);
-        });
-
-        export const deleteBed = asyncHandler(async (req, res) => {
-          await Bed.findByIdAndDelete(req.params.id);
-          return noContent(res);
-        });
-
+@extras("bedController")
+def bed_extras():
+    return template("""
         // Availability helper
         export const getBedAvailability = asyncHandler(async (req, res) => {
           const { from, to } = req.query;
@@ -249,82 +486,9 @@ def bed_controller():
         });
     """)
 
-def tenant_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Tenant from "../models/Tenant.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        export const getTenants = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.active !== undefined) filter.active = req.query.active === "true";
-          if (req.query.email) filter.email = req.query.email.toLowerCase();
-          if (req.query.mobile) filter.mobile = req.query.mobile;
-          if (req.query.q) {
-            filter.$or = [
-              { name: { $regex: req.query.q, $options: "i" } },
-              { email: { $regex: req.query.q, $options: "i" } },
-              { mobile: { $regex: req.query.q, $options: "i" } }
-            ];
-          }
-          const [items, total] = await Promise.all([
-            Tenant.find(filter).skip(skip).limit(limit).lean(),
-            Tenant.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getTenant = asyncHandler(async (req, res) => {
-          const item = await Tenant.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
-        export const createTenant = asyncHandler(async (req, res) => {
-          const t = await Tenant.create(req.body);
-          return created(res, t);
-        });
-
-        export const updateTenant = asyncHandler(async (req, res) => {
-          const t = await Tenant.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, t);
-        });
-
-        export const deleteTenant = asyncHandler(async (req, res) => {
-          await Tenant.findByIdAndDelete(req.params.id);
-          return noContent(res);
-        });
-    """)
-
-def occupancy_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Occupancy from "../models/Occupancy.js";
-        import Bed from "../models/Bed.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        export const getOccupancies = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.tenantId) filter.tenantId = req.query.tenantId;
-          if (req.query.bedId) filter.bedId = req.query.bedId;
-          if (req.query.active !== undefined) {
-            filter.end_date = req.query.active === "true" ? null : { $ne: null };
-          }
-          if (req.query.from && req.query.to) {
-            filter.start_date = { $lt: new Date(req.query.to) };
-            filter.$or = [{ end_date: null }, { end_date: { $gt: new Date(req.query.from) } }];
-          }
-          const [items, total] = await Promise.all([
-            Occupancy.find(filter).skip(skip).limit(limit).lean(),
-            Occupancy.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getOccupancy = asyncHandler(async (req, res) => {
-          const item = await Occupancy.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
+@extras("occupancyController")
+def occupancy_extras():
+    return template("""
         export const createOccupancy = asyncHandler(async (req, res) => {
           // Optional: enforce one active occupancy per bed
           if (!req.body.end_date) {
@@ -337,16 +501,6 @@ def occupancy_controller():
           return created(res, occ);
         });
 
-        export const updateOccupancy = asyncHandler(async (req, res) => {
-          const occ = await Occupancy.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, occ);
-        });
-
-        export const deleteOccupancy = asyncHandler(async (req, res) => {
-          await Occupancy.findByIdAndDelete(req.params.id);
-          return noContent(res);
-        });
-
         // Actions
         export const closeOccupancy = asyncHandler(async (req, res) => {
           const { end_date } = req.body;
@@ -378,81 +532,60 @@ def occupancy_controller():
           await Bed.updateOne({ _id: toBedId }, { $set: { isOccupied: true } });
           return ok(res, { from: closed, to: reopened });
         });
-    """)
-
-def bill_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Bill from "../models/Bill.js";
-        import Transaction from "../models/Transaction.js";
-        import Bed from "../models/Bed.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
 
-        // GET /bills
-        export const getBills = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.tenantId) filter.tenantId = req.query.tenantId;
-          if (req.query.bedId) filter.bedId = req.query.bedId;
-          if (req.query.status) filter.status = req.query.status;
-          if (req.query.from && req.query.to) {
-            filter.period_start = { $lt: new Date(req.query.to) };
-            filter.period_end = { $gt: new Date(req.query.from) };
-          }
-          const [items, total] = await Promise.all([
-            Bill.find(filter).skip(skip).limit(limit).lean(),
-            Bill.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+        // Tenant helper
+        export const getTenantOccupancies = asyncHandler(async (req, res) => {
+          const items = await Occupancy.find({ tenantId: req.params.id }).sort({ start_date: -1 }).lean();
+          return ok(res, items);
         });
+    """)
 
-        export const getBill = asyncHandler(async (req, res) => {
-          const item = await Bill.findById(req.params.id).lean();
-          return ok(res, item);
-        });
+@extras("billController")
+def bill_extras():
+    return template("""
+        import { settleStage } from "../models/Bill.js";
+        import { insertChunk, prorate, repriceBills } from "../services/billingService.js";
+        import { reconcileBills } from "../services/paymentService.js";
+        import { syncArrears } from "../services/arrearsService.js";
+
+        // paid / balance / status are maintained from transactions
+        // (Bill.applyPayment), never written by clients. Every bill write
+        // also refreshes the bill's row in the arrears report (syncArrears).
+        const DERIVED = ["paid", "balance", "status"];
 
         export const createBill = asyncHandler(async (req, res) => {
-          const bill = await Bill.create(req.body);
-          return created(res, bill);
+          const item = await Bill.create(req.body);
+          await syncArrears([item._id]);
+          return created(res, item);
         });
 
+        // PATCH /bills/:id  an amount change re-derives balance and status in the same update.
+        // In a pipeline $set, strings like "$amount" are expressions, so client
+        // values go in as $literal.
         export const updateBill = asyncHandler(async (req, res) => {
-          const bill = await Bill.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, bill);
+          const changes = Object.fromEntries(Object.entries(req.body).filter(([key]) => !DERIVED.includes(key)));
+          const literal = (values) => Object.fromEntries(Object.entries(values).map(([key, value]) => [key, { $literal: value }]));
+          const update = "amount" in changes ? [{ $set: literal(Bill.castObject(changes)) }, settleStage] : changes;
+          const item = await Bill.findByIdAndUpdate(req.params.id, update, { new: true }).lean();
+          if (item) await syncArrears([item._id]);
+          return ok(res, item);
         });
 
         export const deleteBill = asyncHandler(async (req, res) => {
-          await Bill.findByIdAndDelete(req.params.id);
+          const item = await Bill.findByIdAndDelete(req.params.id).lean();
+          if (item) await syncArrears([item._id]);
           return noContent(res);
         });
 
-        // Helpers
-        const computePaidForBill = async (billId) => {
-          const agg = await Transaction.aggregate([
-            { $match: { billId } },
-            { $group: { _id: "$billId", paid: { $sum: "$amount" } } }
-          ]);
-          return agg[0]?.paid || 0;
-        };
-
-        const deriveStatus = (amount, paid) => {
-          if (paid <= 0) return "pending";
-          if (paid < amount) return "partial";
-          return "paid";
-        };
-
-        // GET /bills/:id/summary
+        // GET /bills/:id/summary  (stored totals: one indexed read)
         export const getBillSummary = asyncHandler(async (req, res) => {
           const bill = await Bill.findById(req.params.id).lean();
           if (!bill) return res.status(404).json({ success: false, message: "Bill not found" });
-          const paid = await computePaidForBill(bill._id);
-          const balance = Number((bill.amount - paid).toFixed(2));
-          return ok(res, {
-            ...bill,
-            summary: { amount: bill.amount, paid, balance, status: deriveStatus(bill.amount, paid) }
-          });
+          const { amount, paid = 0, balance = amount - paid, status } = bill;
+          return ok(res, { ...bill, summary: { amount, paid, balance, status } });
         });
 
-        // POST /bills/:id/recalculate  (basic proration using bed.defaultCost)
+        // POST /bills/:id/recalculate  (proration using bed.defaultCost, per calendar month)
         export const recalculateBill = asyncHandler(async (req, res) => {
           const bill = await Bill.findById(req.params.id).lean();
           if (!bill) return res.status(404).json({ success: false, message: "Bill not found" });
@@ -460,29 +593,65 @@ def bill_controller():
           const bed = await Bed.findById(bill.bedId).lean();
           const cost = bed?.defaultCost || bill.amount;
 
-          const start = new Date(bill.period_start);
-          const end = new Date(bill.period_end);
-          const msDay = 24*60*60*1000;
-          const days = Math.max(1, Math.ceil((end - start) / msDay));
-          const monthStart = new Date(start.getFullYear(), start.getMonth(), 1);
-          const nextMonth = new Date(start.getFullYear(), start.getMonth()+1, 1);
-          const daysInMonth = Math.round((nextMonth - monthStart) / msDay);
-
-          const newAmount = Number(((cost / daysInMonth) * days).toFixed(2));
-          const updated = await Bill.findByIdAndUpdate(req.params.id, { $set: { amount: newAmount } }, { new: true }).lean();
+          const { amount: newAmount } = prorate(cost, new Date(bill.period_start), new Date(bill.period_end));
+          const updated = await Bill.findByIdAndUpdate(req.params.id, [{ $set: { amount: newAmount } }, settleStage], { new: true }).lean();
+          await syncArrears([bill._id]);
           return ok(res, updated);
         });
 
-        // POST /bills/:id/mark-paid  (usually you won’t need this if deriving from transactions)
+        // POST /bills/recalculate  { month | period_start/period_end, pgId, bedIds, defaultCost, includePaid, dryRun }
+        // Re-prices every bill in scope from current bed costs in one request
+        // (see repriceBills in services/billingService.js).
+        export const recalculateBills = asyncHandler(async (req, res) => {
+          const stats = await repriceBills(req.body);
+          return ok(res, stats);
+        });
+
+        // POST /bills/reconcile  { month | period_start/period_end, pgId, dryRun }
+        // paid / balance / status of every bill in scope rebuilt from transactions
+        // in one pass (also runs on a schedule, see services/paymentService.js).
+        export const reconcileBillPayments = asyncHandler(async (req, res) => {
+          const stats = await reconcileBills(req.body);
+          return ok(res, stats);
+        });
+
+        // POST /bills/:id/mark-paid  (usually you won’t need this: paid/status follow transactions)
+        // Re-derives this bill's totals from its transactions.
         export const markBillPaid = asyncHandler(async (req, res) => {
-          const bill = await Bill.findById(req.params.id).lean();
+          const bill = await Bill.findById(req.params.id, { _id: 1 }).lean();
           if (!bill) return res.status(404).json({ success: false, message: "Bill not found" });
-          const paid = await computePaidForBill(bill._id);
-          const status = deriveStatus(bill.amount, paid);
-          const updated = await Bill.findByIdAndUpdate(req.params.id, { $set: { status } }, { new: true }).lean();
+          await reconcileBills({ billIds: [bill._id] });
+          const updated = await Bill.findById(bill._id).lean();
           return ok(res, updated);
         });
 
+        // POST /bills/bulk  { bills: [...] }
+        // The hooks' occupancy and overlap checks run once for the whole batch
+        // (Bill.validateBatch), then valid bills are inserted unordered. Invalid
+        // ones are reported by index; the rest are still created.
+        export const createBills = asyncHandler(async (req, res) => {
+          const docs = req.body.bills.map((raw) => new Bill(raw));
+          const errors = docs.map((doc) => doc.validateSync()?.message ?? null);
+          const checked = docs.flatMap((doc, i) => (errors[i] ? [] : [i]));
+          const batchErrors = await Bill.validateBatch(checked.map((i) => docs[i]));
+          batchErrors.forEach((message, j) => {
+            if (message) errors[checked[j]] = message;
+          });
+
+          const now = new Date();
+          const rows = docs
+            .filter((_, i) => !errors[i])
+            .map((doc) => ({ ...doc.toObject(), paid: 0, balance: doc.amount, status: "pending", createdAt: now, updatedAt: now }));
+          const result = await insertChunk(rows);
+          return created(res, {
+            created: result.created,
+            duplicates: result.duplicates,
+            failed: result.failed,
+            invalid: errors.flatMap((message, index) => (message ? [{ index, message }] : [])),
+            errors: result.errors
+          });
+        });
+
         // Tenant helpers
         export const getTenantBills = asyncHandler(async (req, res) => {
           const items = await Bill.find({ tenantId: req.params.id }).lean();
@@ -490,46 +659,53 @@ def bill_controller():
         });
     """)
 
-def transaction_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Transaction from "../models/Transaction.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        export const getTransactions = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.billId) filter.billId = req.query.billId;
-          if (req.query.method) filter.method = req.query.method;
-          if (req.query.from && req.query.to) {
-            filter.dateTime = { $gte: new Date(req.query.from), $lte: new Date(req.query.to) };
-          }
-          const [items, total] = await Promise.all([
-            Transaction.find(filter).skip(skip).limit(limit).lean(),
-            Transaction.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getTransaction = asyncHandler(async (req, res) => {
-          const item = await Transaction.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
+@extras("transactionController")
+def transaction_extras():
+    return template("""
+        import { importStatement } from "../services/statementImportService.js";
+        import { importStatementSchema } from "../validations/transactionValidation.js";
+        import { applyPayment } from "../services/paymentService.js";
+
+        // Every write keeps Bill.paid / balance / status current with one atomic
+        // update of the bill, and its arrears row with it (applyPayment).
+        // scripts/reconcileBills.js repairs anything a failure between the
+        // writes leaves behind.
         export const createTransaction = asyncHandler(async (req, res) => {
-          const txn = await Transaction.create(req.body);
-          return created(res, txn);
+          const item = await Transaction.create(req.body);
+          await applyPayment(item.billId, item.amount);
+          return created(res, item);
         });
 
         export const updateTransaction = asyncHandler(async (req, res) => {
-          const txn = await Transaction.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, txn);
+          const changes = Transaction.castObject(req.body);
+          const before = await Transaction.findByIdAndUpdate(req.params.id, changes, { new: false, runValidators: true }).lean();
+          if (!before) return ok(res, null);
+          const after = { ...before, ...changes };
+          if (String(after.billId) !== String(before.billId)) {
+            await applyPayment(before.billId, -before.amount);
+            await applyPayment(after.billId, after.amount);
+          } else if (after.amount !== before.amount) {
+            await applyPayment(after.billId, after.amount - before.amount);
+          }
+          return ok(res, after);
         });
 
         export const deleteTransaction = asyncHandler(async (req, res) => {
-          await Transaction.findByIdAndDelete(req.params.id);
+          const item = await Transaction.findByIdAndDelete(req.params.id).lean();
+          if (item) await applyPayment(item.billId, -item.amount);
           return noContent(res);
         });
 
+        // POST /transactions/import?method=upi&month=2024-05&dryRun=true
+        // Body: a bank / UPI statement CSV (Content-Type: text/csv), read as a
+        // stream. Matched rows become transactions; the report lists the rest.
+        export const importTransactions = asyncHandler(async (req, res) => {
+          const { value, error } = importStatementSchema.validate(req.query);
+          if (error) throw badRequest(error.message);
+          const report = await importStatement(req, value);
+          return ok(res, report);
+        });
+
         // Tenant helper
         export const getTenantTransactions = asyncHandler(async (req, res) => {
           const items = await Transaction.find({ tenantId: req.params.id }).lean();
@@ -537,52 +713,14 @@ def transaction_controller():
         });
     """)
 
-def document_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Document from "../models/Document.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
-        export const getDocuments = asyncHandler(async (req, res) => {
-          const { page, limit, skip } = parsePaging(req);
-          const filter = {};
-          if (req.query.type) filter.type = req.query.type;
-          if (req.query.q) filter.file_name = { $regex: req.query.q, $options: "i" };
-          const [items, total] = await Promise.all([
-            Document.find(filter).skip(skip).limit(limit).lean(),
-            Document.countDocuments(filter)
-          ]);
-          return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
-        });
-
-        export const getDocument = asyncHandler(async (req, res) => {
-          const item = await Document.findById(req.params.id).lean();
-          return ok(res, item);
-        });
-
-        export const createDocument = asyncHandler(async (req, res) => {
-          const doc = await Document.create(req.body);
-          return created(res, doc);
-        });
-
-        export const updateDocument = asyncHandler(async (req, res) => {
-          const doc = await Document.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-          return ok(res, doc);
-        });
-
-        export const deleteDocument = asyncHandler(async (req, res) => {
-          await Document.findByIdAndDelete(req.params.id);
-          return noContent(res);
-        });
-    """)
-
-def tenant_document_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import TenantDocument from "../models/TenantDocument.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
+@extras("tenantDocumentController")
+def tenant_document_extras():
+    return template("""
+        // GET /tenant-documents?tenantId=  and  GET /tenants/:id/documents
         export const getTenantDocuments = asyncHandler(async (req, res) => {
           const filter = {};
-          if (req.query.tenantId) filter.tenantId = req.query.tenantId;
+          const tenantId = req.params.id || req.query.tenantId;
+          if (tenantId) filter.tenantId = tenantId;
           if (req.query.type) filter.type = req.query.type;
           const items = await TenantDocument.find(filter).lean();
           return ok(res, items);
@@ -600,48 +738,72 @@ def tenant_document_controller():
         });
     """)
 
-def billing_run_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        // This is a stub; wire to your billing service logic.
-        import { asyncHandler } from "../middlewares/errorHandler.js";
+@extras("billingRunController")
+def billing_run_extras():
+    return template("""
+        import { previewBilling } from "../services/billingService.js";
+        import { startBillingRun, withProgress } from "../services/billingRunService.js";
 
+        // POST /billing/runs  { month: "YYYY-MM" } or { period_start, period_end }, optional pgId
+        // Bills every occupancy active in the period. The run is stored and
+        // executed in the background (see services/billingRunService.js); poll
+        // GET /billing/runs/:id for progress.
         export const createBillingRun = asyncHandler(async (req, res) => {
-          // TODO: generate bills based on occupancies & period in req.body
-          return created(res, { runId: "stub", createdBills: [] });
+          const run = await startBillingRun(req.body);
+          res.location(`${req.baseUrl}/${run._id}`);
+          return res.status(202).json({ success: true, data: withProgress(run) });
         });
 
+        // POST /billing/runs/preview  same body as a run; nothing is written
         export const previewBillingRun = asyncHandler(async (req, res) => {
-          return ok(res, { preview: true, wouldCreate: [] });
+          const preview = await previewBilling(req.body);
+          return ok(res, { preview: true, ...preview });
         });
 
+        // GET /billing/runs/:id  status, checkpoint and live counters
         export const getBillingRun = asyncHandler(async (req, res) => {
-          return ok(res, { id: req.params.id, status: "done", stats: {} });
+          const run = await BillingRun.findById(req.params.id).lean();
+          if (!run) return res.status(404).json({ success: false, message: "Billing run not found" });
+          return ok(res, withProgress(run));
         });
     """)
 
-def report_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Bill from "../models/Bill.js";
-        import Transaction from "../models/Transaction.js";
-        import Occupancy from "../models/Occupancy.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
+@extras("reportController")
+def report_extras():
+    return template("""
+        import { GROUP_BY, occupancyRate } from "../services/occupancyRateService.js";
 
+        const DAY_MS = 24 * 60 * 60 * 1000;
+
+        // GET /reports/arrears?pgId=&asOf=YYYY-MM-DD
+        // Open bills that started by asOf, read from the materialized arrears
+        // collection (services/arrearsService.js); _id is the bill's id.
         export const arrearsReport = asyncHandler(async (req, res) => {
           const asOf = req.query.asOf ? new Date(req.query.asOf) : new Date();
-          const bills = await Bill.aggregate([
-            { $match: { period_start: { $lte: asOf } } },
-            { $lookup: { from: "transactions", localField: "_id", foreignField: "billId", as: "txns" } },
-            { $addFields: { paid: { $sum: "$txns.amount" }, balance: { $subtract: ["$amount", { $sum: "$txns.amount" }] } } },
-            { $project: { txns: 0 } },
-            { $match: { balance: { $gt: 0 } } }
-          ]);
-          return ok(res, bills);
+          if (Number.isNaN(asOf.getTime())) throw badRequest("asOf must be a date (YYYY-MM-DD)");
+          const filter = { period_start: { $lte: asOf }, balance: { $gt: 0 } };
+          if (req.query.pgId) filter.pgId = req.query.pgId;
+          const bills = await Arrear.find(filter, { syncedAt: 0 }).sort({ period_start: 1 }).lean();
+          const balance = bills.reduce((sum, bill) => sum + bill.balance, 0);
+          return ok(res, bills, { count: bills.length, balance: Math.round(balance * 100) / 100 });
         });
 
+        // GET /reports/occupancy-rate?pgId=&from=YYYY-MM-DD&to=YYYY-MM-DD&groupBy=day|week|month
+        // Occupied / available bed-days per bucket; `to` is inclusive and
+        // defaults to today, `from` to 30 days earlier (services/occupancyRateService.js).
         export const occupancyRateReport = asyncHandler(async (req, res) => {
-          // Minimal stub; implement proper date-bucketed occupancy % later
-          const total = await Occupancy.countDocuments({});
-          return ok(res, { totalOccupancies: total });
+          const groupBy = req.query.groupBy || "day";
+          if (!GROUP_BY.includes(groupBy)) throw badRequest(`groupBy must be one of ${GROUP_BY.join(", ")}`);
+          const day = (value) => {
+            const date = new Date(value);
+            return Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate());
+          };
+          const to = day(req.query.to || Date.now()) + DAY_MS;
+          const from = req.query.from ? day(req.query.from) : to - 30 * DAY_MS;
+          if (Number.isNaN(from) || Number.isNaN(to)) throw badRequest("from and to must be dates (YYYY-MM-DD)");
+          if (from >= to) throw badRequest("from must not be after to");
+          const report = await occupancyRate({ pgId: req.query.pgId, from, to, groupBy });
+          return ok(res, report);
         });
 
         export const revenueReport = asyncHandler(async (req, res) => {
@@ -655,13 +817,9 @@ def report_controller():
         });
     """)
 
-def dashboard_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Bill from "../models/Bill.js";
-        import Transaction from "../models/Transaction.js";
-        import Occupancy from "../models/Occupancy.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
+@extras("dashboardController")
+def dashboard_extras():
+    return template("""
         export const tenantDashboard = asyncHandler(async (req, res) => {
           const tenantId = req.params.tenantId;
           const [bills, txns, occ] = await Promise.all([
@@ -673,14 +831,9 @@ def dashboard_controller():
         });
     """)
 
-def search_controller():
-    return HDR + mk_common_list_helpers() + dedent("""
-        import Tenant from "../models/Tenant.js";
-        import Room from "../models/Room.js";
-        import Bed from "../models/Bed.js";
-        import Bill from "../models/Bill.js";
-        import { asyncHandler } from "../middlewares/errorHandler.js";
-
+@extras("searchController")
+def search_extras():
+    return template("""
         export const globalSearch = asyncHandler(async (req, res) => {
           const q = (req.query.q || "").trim();
           if (!q) return ok(res, { tenants: [], rooms: [], beds: [], bills: [] });
@@ -695,39 +848,61 @@ def search_controller():
         });
     """)
 
-def index_readme():
-    return dedent("""
-        # Generated controllers
-
-        These stubs expect:
-        - `asyncHandler` in `../middlewares/errorHandler.js`
-        - Mongoose models: Pg, Room, Bed, Tenant, Occupancy, Bill, Transaction, Document, TenantDocument, User
-
-        All responses are `{ success, data, meta? }`. Edit freely to fit your business rules.
-    """)
-
-FILES = {
-    "authController.js": auth_controller(),
-    "pgController.js": pg_controller(),
-    "roomController.js": room_controller(),
-    "bedController.js": bed_controller(),
-    "tenantController.js": tenant_controller(),
-    "occupancyController.js": occupancy_controller(),
-    "billController.js": bill_controller(),
-    "transactionController.js": transaction_controller(),
-    "documentController.js": document_controller(),
-    "tenantDocumentController.js": tenant_document_controller(),
-    "billingRunController.js": billing_run_controller(),
-    "reportController.js": report_controller(),
-    "dashboardController.js": dashboard_controller(),
-    "searchController.js": search_controller(),
-    "CONTROLLERS_README.md": index_readme(),
-}
-
-def main():
-    BASE.mkdir(parents=True, exist_ok=True)
-    for fname, content in FILES.items():
-        write(BASE / fname, content)
+# ---------- ASSEMBLY ----------
+
+def split_imports(extra):
+    """Leading `import ...;` lines of an EXTRAS template (e.g. services) join the import block."""
+    lines = extra.lstrip("\n").split("\n")
+    n = 0
+    while n < len(lines) and lines[n].startswith("import "):
+        n += 1
+    if not n:
+        return [], extra
+    return lines[:n], "\n".join(lines[n:])
+
+def render_controller(spec, res):
+    extra = EXTRAS[res.controller]().render() if res.controller in EXTRAS else ""
+    extra_imports, extra = split_imports(extra)
+    body = ""
+    if res.crud:
+        body = mk_crud(res, skip=[n for n in res.ops.values() if f"export const {n} " in extra])
+    body += extra
+    missing = [h for h in spec.exports_of(res.controller) if f"export const {h} " not in body]
+    if missing:
+        raise SpecError(f"{res.controller_file}: resources.json routes expect {', '.join(missing)}, "
+                        f"but controllerGen.py does not generate them")
+    return HDR + mk_imports(res, body, extra_imports) + body
+
+README = template("""
+    # Generated controllers
+
+    These stubs expect:
+    - `asyncHandler` in `../middlewares/errorHandler.js`
+    - Mongoose models: {{models}}
+    - the shared response/paging helpers in `./helpers.js` (generated too)
+
+    All responses are `{ success, data, meta? }`. Edit freely to fit your business rules.
+""")
+
+def index_readme(spec):
+    models = ", ".join(dict.fromkeys(m for res in spec.resources for m in res.all_models))
+    return README.render(models=models)
+
+def build_registry(spec):
+    """One lazily rendered controller per resource, the shared helpers and the README."""
+    reg = Registry("controllerGen", BASE, GENERATOR_VERSION, source=Path(__file__))
+    reg.add("helpers.js", lambda: HDR + HELPERS.render(), key="helpers")
+    for res in spec.resources:
+        reg.add(res.controller_file, lambda res=res: render_controller(spec, res),
+                key=repr((res, spec.exports_of(res.controller), allowlist_key(res))))
+    reg.add("CONTROLLERS_README.md", lambda: index_readme(spec), key=spec.digest)
+    return reg
+
+# Files are rendered lazily, only when selected (see `--only`).
+REGISTRY = build_registry(load_spec())
+
+def main(argv=None):
+    return cli.main([REGISTRY], "Generate ESM controllers.", argv)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,4 +1,6 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok } from "./helpers.js";
 import Bill from "../models/Bill.js";
 import Transaction from "../models/Transaction.js";
 import Occupancy from "../models/Occupancy.js";
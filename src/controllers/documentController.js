@@ -1,32 +1,33 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage } from "./helpers.js";
 import Document from "../models/Document.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "file_name", "file_path", "type", "uploadedAt", "createdAt", "updatedAt"];
+
 export const getDocuments = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.type) filter.type = req.query.type;
   if (req.query.q) filter.file_name = { $regex: req.query.q, $options: "i" };
-  const [items, total] = await Promise.all([
-    Document.find(filter).skip(skip).limit(limit).lean(),
-    Document.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Document, filter, req, { fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getDocument = asyncHandler(async (req, res) => {
-  const item = await Document.findById(req.params.id).lean();
+  const item = await Document.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
 export const createDocument = asyncHandler(async (req, res) => {
-  const doc = await Document.create(req.body);
-  return created(res, doc);
+  const item = await Document.create(req.body);
+  return created(res, item);
 });
 
 export const updateDocument = asyncHandler(async (req, res) => {
-  const doc = await Document.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-  return ok(res, doc);
+  const item = await Document.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
+  return ok(res, item);
 });
 
 export const deleteDocument = asyncHandler(async (req, res) => {
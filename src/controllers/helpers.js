@@ -1,3 +1,8 @@
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { Transform } from "stream";
+import { pipeline } from "stream/promises";
+
 // Common helpers
 export const parsePaging = (req) => {
   const page = Math.max(parseInt(req.query.page || "1", 10), 1);
@@ -14,3 +19,183 @@ export const ok = (res, data, meta) => {
 
 export const created = (res, data) => res.status(201).json({ success: true, data });
 export const noContent = (res) => res.status(204).json({ success: true });
+
+export const badRequest = (message) => Object.assign(new Error(message), { statusCode: 400 });
+
+// Sparse fieldsets: ?fields=name,mobile -> { name: 1, mobile: 1, _id: 0 }.
+// Names must be in the controller's allowlist. _id is only returned when
+// asked for, so a projection of indexed fields can be answered from the
+// index alone (covered read).
+export const parseFields = (req, allowed) => {
+  if (!req.query.fields) return undefined;
+  const names = [...new Set(String(req.query.fields).split(",").map((s) => s.trim()).filter(Boolean))];
+  const unknown = names.filter((name) => !allowed.includes(name));
+  if (unknown.length) throw badRequest(`Unknown field(s) ${unknown.join(", ")}; allowed: ${allowed.join(", ")}`);
+  const projection = Object.fromEntries(names.map((name) => [name, 1]));
+  if (!projection._id) projection._id = 0;
+  return projection;
+};
+
+// Keyset pagination
+// The cursor is the sort key values (always ending in _id) of the last row
+// of a page, base64url-encoded JSON. Mongoose casts them back to Date /
+// ObjectId through the schema, so the cursor stays opaque to clients.
+const withTiebreak = (sort = {}) => ("_id" in sort ? sort : { ...sort, _id: Object.values(sort)[0] || 1 });
+
+const encodeCursor = (doc, order) =>
+  Buffer.from(JSON.stringify(Object.keys(order).map((key) => doc[key] ?? null))).toString("base64url");
+
+// Only scalars are accepted back: the values go straight into the range
+// query, and an object would carry operators past express-mongo-sanitize,
+// which never sees inside the base64.
+const decodeCursor = (token, order) => {
+  let values;
+  try {
+    values = JSON.parse(Buffer.from(String(token), "base64url").toString("utf8"));
+  } catch {
+    values = null;
+  }
+  const scalar = (value) => value === null || ["string", "number", "boolean"].includes(typeof value);
+  if (!Array.isArray(values) || values.length !== Object.keys(order).length || !values.every(scalar)) {
+    throw badRequest("Invalid cursor");
+  }
+  return values;
+};
+
+// Rows strictly after the cursor in `order`:
+// (k1 > v1) or (k1 = v1 and k2 > v2) or ...   ($lt for descending keys)
+const afterCursor = (order, values) => {
+  const keys = Object.keys(order);
+  return {
+    $or: keys.map((key, i) => {
+      const clause = Object.fromEntries(keys.slice(0, i).map((k, j) => [k, values[j]]));
+      clause[key] = { [order[key] < 0 ? "$lt" : "$gt"]: values[i] };
+      return clause;
+    })
+  };
+};
+
+// Totals
+//   exact     countDocuments(filter), in parallel with the page query
+//   estimate  estimatedDocumentCount() (collection metadata) when unfiltered;
+//             otherwise an exact count cached per filter for COUNT_TTL_MS
+//   none      no count; hasNext comes from fetching limit + 1 rows
+const COUNT_MODES = ["none", "estimate", "exact"];
+const COUNT_TTL_MS = 30 * 1000;
+const COUNT_CACHE_MAX = 1000;
+const countCache = new Map();   // "Model:filter" -> { total, expires }, oldest first
+
+const cachedCount = async (Model, filter) => {
+  const key = `${Model.modelName}:${JSON.stringify(filter)}`;
+  const now = Date.now();
+  const hit = countCache.get(key);
+  if (hit && hit.expires > now) return hit.total;
+  const total = await Model.countDocuments(filter);
+  countCache.delete(key);
+  if (countCache.size >= COUNT_CACHE_MAX) countCache.delete(countCache.keys().next().value);
+  countCache.set(key, { total, expires: now + COUNT_TTL_MS });
+  return total;
+};
+
+const countDocs = (Model, filter, mode) => {
+  if (mode === "none") return undefined;
+  if (mode === "exact") return Model.countDocuments(filter);
+  return Object.keys(filter).length ? cachedCount(Model, filter) : Model.estimatedDocumentCount();
+};
+
+// One page of Model.find(filter) in `sort` order.
+//   ?after=<cursor>  keyset mode: range query on the sort index, no skip
+//   ?page=N          offset mode (kept for existing clients)
+//   ?count=none|estimate|exact   defaults: exact with ?page, none with ?after
+//   ?fields=a,b      projection (see parseFields); the sort keys are always
+//                    included because the cursor is built from them
+// Both modes return meta.nextCursor, so a client can switch to cursors at any page.
+export const findPage = async (Model, filter, req, { sort, fields } = {}) => {
+  const { page, limit, skip } = parsePaging(req);
+  const keyset = req.query.after !== undefined;
+  const count = req.query.count || (keyset ? "none" : "exact");
+  if (!COUNT_MODES.includes(count)) throw badRequest(`count must be one of ${COUNT_MODES.join(", ")}`);
+  const order = withTiebreak(sort);
+
+  let query = filter;
+  if (keyset && req.query.after) query = { $and: [filter, afterCursor(order, decodeCursor(req.query.after, order))] };
+  const projection = fields && parseFields(req, fields);
+  if (projection) Object.keys(order).forEach((key) => { projection[key] = 1; });
+  const find = Model.find(query, projection).sort(order);
+  if (!keyset) find.skip(skip);
+  const [items, total] = await Promise.all([find.limit(limit + 1).lean(), countDocs(Model, filter, count)]);
+
+  const hasNext = items.length > limit;
+  if (hasNext) items.pop();
+  const meta = keyset ? { limit } : { page, limit };
+  if (total !== undefined) meta.total = total;
+  if (count === "estimate") meta.estimated = true;
+  meta.hasNext = hasNext;
+  meta.nextCursor = hasNext ? encodeCursor(items[items.length - 1], order) : null;
+  return { items, meta };
+};
+
+// Streaming export
+// The cursor is piped through a transform into the response, so the stream
+// pauses while the client is slow and memory stays flat at one cursor batch
+// whatever the size of the export.
+const EXPORT_FORMATS = {
+  ndjson: { type: "application/x-ndjson; charset=utf-8", ext: "ndjson" },
+  csv: { type: "text/csv; charset=utf-8", ext: "csv" }
+};
+const EXPORT_BATCH = 1000;
+
+const csvCell = (value) => {
+  if (value === null || value === undefined) return "";
+  let text;
+  if (value instanceof Date) text = value.toISOString();
+  else if (typeof value === "object" && !value._bsontype) text = JSON.stringify(value);
+  else text = String(value);
+  // Cells starting with = + - @ are formulas to a spreadsheet
+  if (typeof value === "string" && /^[=+\-@\t\r]/.test(text)) text = `'${text}`;
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+const csvRow = (values) => values.map(csvCell).join(",") + "\r\n";
+
+const exportTransform = (format, columns) => {
+  let header = format === "csv";
+  return new Transform({
+    writableObjectMode: true,
+    transform(doc, _encoding, done) {
+      let chunk = format === "csv" ? csvRow(columns.map((key) => doc[key])) : JSON.stringify(doc) + "\n";
+      if (header) {
+        chunk = csvRow(columns) + chunk;
+        header = false;
+      }
+      done(null, chunk);
+    },
+    flush(done) {
+      done(null, header ? csvRow(columns) : undefined);
+    }
+  });
+};
+
+// Every match of Model.find(filter) in `sort` order, no paging.
+//   ?format=ndjson|csv   (default ndjson)
+//   ?fields=a,b          projection and CSV columns (default: every allowed field)
+export const streamExport = async (Model, filter, req, res, { sort, fields, name } = {}) => {
+  const format = req.query.format || "ndjson";
+  const spec = EXPORT_FORMATS[format];
+  if (!spec) throw badRequest(`format must be one of ${Object.keys(EXPORT_FORMATS).join(", ")}`);
+  const projection = fields && parseFields(req, fields);
+  const columns = projection ? Object.keys(projection).filter((key) => projection[key]) : fields || [];
+  const cursor = Model.find(filter, projection).sort(withTiebreak(sort)).lean().cursor({ batchSize: EXPORT_BATCH });
+
+  const stamp = new Date().toISOString().slice(0, 10);
+  res.status(200);
+  res.set("Content-Type", spec.type);
+  res.set("Content-Disposition", `attachment; filename="${name || Model.collection.name}-${stamp}.${spec.ext}"`);
+  try {
+    await pipeline(cursor, exportTransform(format, columns), res);
+  } catch (err) {
+    // Before the first row the error handler can still answer with JSON;
+    // after it the response can only be cut short.
+    if (!res.headersSent) throw err;
+    if (err.code !== "ERR_STREAM_PREMATURE_CLOSE") res.destroy(err);
+  }
+};
@@ -1,10 +1,14 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage, streamExport } from "./helpers.js";
 import Occupancy from "../models/Occupancy.js";
 import Bed from "../models/Bed.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "bedId", "tenantId", "start_date", "end_date", "advance", "status", "createdAt", "updatedAt"];
+
 export const getOccupancies = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.tenantId) filter.tenantId = req.query.tenantId;
   if (req.query.bedId) filter.bedId = req.query.bedId;
@@ -15,18 +19,40 @@ export const getOccupancies = asyncHandler(async (req, res) => {
     filter.start_date = { $lt: new Date(req.query.to) };
     filter.$or = [{ end_date: null }, { end_date: { $gt: new Date(req.query.from) } }];
   }
-  const [items, total] = await Promise.all([
-    Occupancy.find(filter).skip(skip).limit(limit).lean(),
-    Occupancy.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Occupancy, filter, req, { sort: { start_date: -1 }, fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getOccupancy = asyncHandler(async (req, res) => {
-  const item = await Occupancy.findById(req.params.id).lean();
+  const item = await Occupancy.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
+export const updateOccupancy = asyncHandler(async (req, res) => {
+  const item = await Occupancy.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
+  return ok(res, item);
+});
+
+export const deleteOccupancy = asyncHandler(async (req, res) => {
+  await Occupancy.findByIdAndDelete(req.params.id);
+  return noContent(res);
+});
+
+// Streams every match of the list filters: ?format=ndjson|csv
+export const exportOccupancies = asyncHandler(async (req, res) => {
+  const filter = {};
+  if (req.query.tenantId) filter.tenantId = req.query.tenantId;
+  if (req.query.bedId) filter.bedId = req.query.bedId;
+  if (req.query.active !== undefined) {
+    filter.end_date = req.query.active === "true" ? null : { $ne: null };
+  }
+  if (req.query.from && req.query.to) {
+    filter.start_date = { $lt: new Date(req.query.to) };
+    filter.$or = [{ end_date: null }, { end_date: { $gt: new Date(req.query.from) } }];
+  }
+  await streamExport(Occupancy, filter, req, res, { sort: { start_date: -1 }, fields: FIELDS, name: "occupancies" });
+});
+
 export const createOccupancy = asyncHandler(async (req, res) => {
   // Optional: enforce one active occupancy per bed
   if (!req.body.end_date) {
@@ -39,16 +65,6 @@ export const createOccupancy = asyncHandler(async (req, res) => {
   return created(res, occ);
 });
 
-export const updateOccupancy = asyncHandler(async (req, res) => {
-  const occ = await Occupancy.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-  return ok(res, occ);
-});
-
-export const deleteOccupancy = asyncHandler(async (req, res) => {
-  await Occupancy.findByIdAndDelete(req.params.id);
-  return noContent(res);
-});
-
 // Actions
 export const closeOccupancy = asyncHandler(async (req, res) => {
   const { end_date } = req.body;
@@ -80,3 +96,9 @@ export const transferOccupancy = asyncHandler(async (req, res) => {
   await Bed.updateOne({ _id: toBedId }, { $set: { isOccupied: true } });
   return ok(res, { from: closed, to: reopened });
 });
+
+// Tenant helper
+export const getTenantOccupancies = asyncHandler(async (req, res) => {
+  const items = await Occupancy.find({ tenantId: req.params.id }).sort({ start_date: -1 }).lean();
+  return ok(res, items);
+});
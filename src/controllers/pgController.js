@@ -1,22 +1,22 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage } from "./helpers.js";
 import Pg from "../models/Pg.js";
 import Room from "../models/Room.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
-// CRUD
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "pgName", "user_id", "address", "location", "contact", "createdAt", "updatedAt"];
+
 export const getPgs = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
-  const q = req.query.q?.trim();
-  const filter = q ? { pgName: { $regex: q, $options: "i" } } : {};
-  const [items, total] = await Promise.all([
-    Pg.find(filter).skip(skip).limit(limit).lean(),
-    Pg.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const filter = {};
+  if (req.query.q) filter.pgName = { $regex: req.query.q, $options: "i" };
+  const { items, meta } = await findPage(Pg, filter, req, { fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getPg = asyncHandler(async (req, res) => {
-  const item = await Pg.findById(req.params.id).lean();
+  const item = await Pg.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
@@ -1,25 +1,42 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
-import Bill from "../models/Bill.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, badRequest } from "./helpers.js";
+import Arrear from "../models/Arrear.js";
 import Transaction from "../models/Transaction.js";
-import Occupancy from "../models/Occupancy.js";
+import { GROUP_BY, occupancyRate } from "../services/occupancyRateService.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// GET /reports/arrears?pgId=&asOf=YYYY-MM-DD
+// Open bills that started by asOf, read from the materialized arrears
+// collection (services/arrearsService.js); _id is the bill's id.
 export const arrearsReport = asyncHandler(async (req, res) => {
   const asOf = req.query.asOf ? new Date(req.query.asOf) : new Date();
-  const bills = await Bill.aggregate([
-    { $match: { period_start: { $lte: asOf } } },
-    { $lookup: { from: "transactions", localField: "_id", foreignField: "billId", as: "txns" } },
-    { $addFields: { paid: { $sum: "$txns.amount" }, balance: { $subtract: ["$amount", { $sum: "$txns.amount" }] } } },
-    { $project: { txns: 0 } },
-    { $match: { balance: { $gt: 0 } } }
-  ]);
-  return ok(res, bills);
+  if (Number.isNaN(asOf.getTime())) throw badRequest("asOf must be a date (YYYY-MM-DD)");
+  const filter = { period_start: { $lte: asOf }, balance: { $gt: 0 } };
+  if (req.query.pgId) filter.pgId = req.query.pgId;
+  const bills = await Arrear.find(filter, { syncedAt: 0 }).sort({ period_start: 1 }).lean();
+  const balance = bills.reduce((sum, bill) => sum + bill.balance, 0);
+  return ok(res, bills, { count: bills.length, balance: Math.round(balance * 100) / 100 });
 });
 
+// GET /reports/occupancy-rate?pgId=&from=YYYY-MM-DD&to=YYYY-MM-DD&groupBy=day|week|month
+// Occupied / available bed-days per bucket; `to` is inclusive and
+// defaults to today, `from` to 30 days earlier (services/occupancyRateService.js).
 export const occupancyRateReport = asyncHandler(async (req, res) => {
-  // Minimal stub; implement proper date-bucketed occupancy % later
-  const total = await Occupancy.countDocuments({});
-  return ok(res, { totalOccupancies: total });
+  const groupBy = req.query.groupBy || "day";
+  if (!GROUP_BY.includes(groupBy)) throw badRequest(`groupBy must be one of ${GROUP_BY.join(", ")}`);
+  const day = (value) => {
+    const date = new Date(value);
+    return Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate());
+  };
+  const to = day(req.query.to || Date.now()) + DAY_MS;
+  const from = req.query.from ? day(req.query.from) : to - 30 * DAY_MS;
+  if (Number.isNaN(from) || Number.isNaN(to)) throw badRequest("from and to must be dates (YYYY-MM-DD)");
+  if (from >= to) throw badRequest("from must not be after to");
+  const report = await occupancyRate({ pgId: req.query.pgId, from, to, groupBy });
+  return ok(res, report);
 });
 
 export const revenueReport = asyncHandler(async (req, res) => {
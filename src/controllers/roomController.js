@@ -1,29 +1,30 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage } from "./helpers.js";
 import Room from "../models/Room.js";
 import Bed from "../models/Bed.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "no", "pgId", "capacity", "floor", "status", "createdAt", "updatedAt"];
+
 export const getRooms = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.pgId) filter.pgId = req.query.pgId;
   if (req.query.status) filter.status = req.query.status;
   if (req.query.floor) filter.floor = Number(req.query.floor);
-  const [items, total] = await Promise.all([
-    Room.find(filter).skip(skip).limit(limit).lean(),
-    Room.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Room, filter, req, { fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getRoom = asyncHandler(async (req, res) => {
-  const item = await Room.findById(req.params.id).lean();
+  const item = await Room.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
 export const createRoom = asyncHandler(async (req, res) => {
-  const room = await Room.create(req.body);
-  return created(res, room);
+  const item = await Room.create(req.body);
+  return created(res, item);
 });
 
 export const updateRoom = asyncHandler(async (req, res) => {
@@ -1,4 +1,6 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok } from "./helpers.js";
 import Tenant from "../models/Tenant.js";
 import Room from "../models/Room.js";
 import Bed from "../models/Bed.js";
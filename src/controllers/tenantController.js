@@ -1,9 +1,13 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, parseFields, findPage, streamExport } from "./helpers.js";
 import Tenant from "../models/Tenant.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "name", "mobile", "email", "home_mobile", "address", "join_date", "advance", "bedId", "active", "createdAt", "updatedAt"];
+
 export const getTenants = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.active !== undefined) filter.active = req.query.active === "true";
   if (req.query.email) filter.email = req.query.email.toLowerCase();
@@ -15,29 +19,42 @@ export const getTenants = asyncHandler(async (req, res) => {
       { mobile: { $regex: req.query.q, $options: "i" } }
     ];
   }
-  const [items, total] = await Promise.all([
-    Tenant.find(filter).skip(skip).limit(limit).lean(),
-    Tenant.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Tenant, filter, req, { fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getTenant = asyncHandler(async (req, res) => {
-  const item = await Tenant.findById(req.params.id).lean();
+  const item = await Tenant.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
 export const createTenant = asyncHandler(async (req, res) => {
-  const t = await Tenant.create(req.body);
-  return created(res, t);
+  const item = await Tenant.create(req.body);
+  return created(res, item);
 });
 
 export const updateTenant = asyncHandler(async (req, res) => {
-  const t = await Tenant.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-  return ok(res, t);
+  const item = await Tenant.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
+  return ok(res, item);
 });
 
 export const deleteTenant = asyncHandler(async (req, res) => {
   await Tenant.findByIdAndDelete(req.params.id);
   return noContent(res);
 });
+
+// Streams every match of the list filters: ?format=ndjson|csv
+export const exportTenants = asyncHandler(async (req, res) => {
+  const filter = {};
+  if (req.query.active !== undefined) filter.active = req.query.active === "true";
+  if (req.query.email) filter.email = req.query.email.toLowerCase();
+  if (req.query.mobile) filter.mobile = req.query.mobile;
+  if (req.query.q) {
+    filter.$or = [
+      { name: { $regex: req.query.q, $options: "i" } },
+      { email: { $regex: req.query.q, $options: "i" } },
+      { mobile: { $regex: req.query.q, $options: "i" } }
+    ];
+  }
+  await streamExport(Tenant, filter, req, res, { fields: FIELDS, name: "tenants" });
+});
@@ -1,10 +1,14 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent } from "./helpers.js";
 import TenantDocument from "../models/TenantDocument.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// GET /tenant-documents?tenantId=  and  GET /tenants/:id/documents
 export const getTenantDocuments = asyncHandler(async (req, res) => {
   const filter = {};
-  if (req.query.tenantId) filter.tenantId = req.query.tenantId;
+  const tenantId = req.params.id || req.query.tenantId;
+  if (tenantId) filter.tenantId = tenantId;
   if (req.query.type) filter.type = req.query.type;
   const items = await TenantDocument.find(filter).lean();
   return ok(res, items);
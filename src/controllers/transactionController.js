@@ -1,42 +1,82 @@
-import { parsePaging, ok, created, noContent } from "./helpers.js";
+// Auto-generated by controllerGen.py — feel free to edit.
+
+import { ok, created, noContent, badRequest, parseFields, findPage, streamExport } from "./helpers.js";
 import Transaction from "../models/Transaction.js";
+import { importStatement } from "../services/statementImportService.js";
+import { importStatementSchema } from "../validations/transactionValidation.js";
+import { applyPayment } from "../services/paymentService.js";
 import { asyncHandler } from "../middlewares/errorHandler.js";
 
+// Fields a client may pick with ?fields=
+const FIELDS = ["_id", "billId", "method", "screenshot", "notes", "reference", "dateTime", "amount", "createdAt", "updatedAt"];
+
 export const getTransactions = asyncHandler(async (req, res) => {
-  const { page, limit, skip } = parsePaging(req);
   const filter = {};
   if (req.query.billId) filter.billId = req.query.billId;
   if (req.query.method) filter.method = req.query.method;
   if (req.query.from && req.query.to) {
     filter.dateTime = { $gte: new Date(req.query.from), $lte: new Date(req.query.to) };
   }
-  const [items, total] = await Promise.all([
-    Transaction.find(filter).skip(skip).limit(limit).lean(),
-    Transaction.countDocuments(filter)
-  ]);
-  return ok(res, items, { page, limit, total, hasNext: skip + items.length < total });
+  const { items, meta } = await findPage(Transaction, filter, req, { sort: { dateTime: -1 }, fields: FIELDS });
+  return ok(res, items, meta);
 });
 
 export const getTransaction = asyncHandler(async (req, res) => {
-  const item = await Transaction.findById(req.params.id).lean();
+  const item = await Transaction.findById(req.params.id, parseFields(req, FIELDS)).lean();
   return ok(res, item);
 });
 
+// Streams every match of the list filters: ?format=ndjson|csv
+export const exportTransactions = asyncHandler(async (req, res) => {
+  const filter = {};
+  if (req.query.billId) filter.billId = req.query.billId;
+  if (req.query.method) filter.method = req.query.method;
+  if (req.query.from && req.query.to) {
+    filter.dateTime = { $gte: new Date(req.query.from), $lte: new Date(req.query.to) };
+  }
+  await streamExport(Transaction, filter, req, res, { sort: { dateTime: -1 }, fields: FIELDS, name: "transactions" });
+});
+
+// Every write keeps Bill.paid / balance / status current with one atomic
+// update of the bill, and its arrears row with it (applyPayment).
+// scripts/reconcileBills.js repairs anything a failure between the
+// writes leaves behind.
 export const createTransaction = asyncHandler(async (req, res) => {
-  const txn = await Transaction.create(req.body);
-  return created(res, txn);
+  const item = await Transaction.create(req.body);
+  await applyPayment(item.billId, item.amount);
+  return created(res, item);
 });
 
 export const updateTransaction = asyncHandler(async (req, res) => {
-  const txn = await Transaction.findByIdAndUpdate(req.params.id, req.body, { new: true }).lean();
-  return ok(res, txn);
+  const changes = Transaction.castObject(req.body);
+  const before = await Transaction.findByIdAndUpdate(req.params.id, changes, { new: false, runValidators: true }).lean();
+  if (!before) return ok(res, null);
+  const after = { ...before, ...changes };
+  if (String(after.billId) !== String(before.billId)) {
+    await applyPayment(before.billId, -before.amount);
+    await applyPayment(after.billId, after.amount);
+  } else if (after.amount !== before.amount) {
+    await applyPayment(after.billId, after.amount - before.amount);
+  }
+  return ok(res, after);
 });
 
 export const deleteTransaction = asyncHandler(async (req, res) => {
-  await Transaction.findByIdAndDelete(req.params.id);
+  const item = await Transaction.findByIdAndDelete(req.params.id).lean();
+  if (item) await applyPayment(item.billId, -item.amount);
   return noContent(res);
 });
 
+// POST /transactions/import?method=upi&month=2024-05&dryRun=true
+// Body: a bank / UPI statement CSV (Content-Type: text/csv), read as a
+// stream. Matched rows become transactions; the report lists the rest.
+export const importTransactions = asyncHandler(async (req, res) => {
+  const { value, error } = importStatementSchema.validate(req.query);
+  if (error) throw badRequest(error.message);
+  const report = await importStatement(req, value);
+  return ok(res, report);
+});
+
 // Tenant helper
 export const getTenantTransactions = asyncHandler(async (req, res) => {
   const items = await Transaction.find({ tenantId: req.params.id }).lean();
@@ -0,0 +1,142 @@
+import crypto from "crypto";
+import IdempotencyKey, { KEY_TTL_SECONDS } from "../models/IdempotencyKey.js";
+import logger from "../config/logger.js";
+import { asyncHandler } from "./errorHandler.js";
+
+// Idempotency-Key support for create endpoints.
+//
+// The first request with a key claims it (an insert on the unique _id), runs,
+// and stores its response; a retry with the same key gets that response back
+// with an Idempotent-Replayed header instead of creating a second record.
+// Finished responses are also kept in a small in-process LRU, so most
+// retries cost no database round trip at all.
+//
+//   same key, still running     409 (Retry-After: 1)
+//   same key, different body    422
+//   5xx response                key released, the retry runs again
+//
+// The key is settled when the handler responds, not when the connection
+// closes: a client that gives up mid-request leaves the key pending, so its
+// retry gets 409 until the first run finishes and then the stored response.
+// A pending key whose request died with its process is taken over after
+// PENDING_MS. Each claim carries an owner token and settling is conditioned
+// on it, so a request that stalled past PENDING_MS and lost its key cannot
+// overwrite the result of the request that took it over.
+
+const MAX_KEY_LENGTH = 255;
+const PENDING_MS = 60 * 1000;
+const CACHE_SIZE = 1000;
+
+// id -> finished record with the time its document expires; Map keeps
+// insertion order, so the first key is the least recently used one.
+const recent = new Map();
+
+const expiryOf = (doc) => new Date(doc.createdAt).getTime() + KEY_TTL_SECONDS * 1000;
+
+const remember = (id, record) => {
+  recent.delete(id);
+  recent.set(id, record);
+  if (recent.size > CACHE_SIZE) recent.delete(recent.keys().next().value);
+};
+
+// Replays stop with the document: past its TTL the key is new again.
+const cached = (id) => {
+  const record = recent.get(id);
+  if (!record) return undefined;
+  if (record.expiresAt <= Date.now()) {
+    recent.delete(id);
+    return undefined;
+  }
+  remember(id, record);
+  return record;
+};
+
+const fingerprintOf = (body) =>
+  crypto.createHash("sha256").update(JSON.stringify(body ?? {})).digest("hex");
+
+// { owner, expiresAt } when this request now owns the key, else { record }
+const claim = async (id, fingerprint) => {
+  const owner = crypto.randomUUID();
+  try {
+    const doc = await IdempotencyKey.create({ _id: id, fingerprint, owner });
+    return { owner, expiresAt: expiryOf(doc) };
+  } catch (err) {
+    if (err.code !== 11000) throw err;
+  }
+  const takenOver = await IdempotencyKey.findOneAndUpdate(
+    { _id: id, state: "pending", updatedAt: { $lt: new Date(Date.now() - PENDING_MS) } },
+    { $set: { fingerprint, owner } }
+  ).lean();
+  if (takenOver) return { owner, expiresAt: expiryOf(takenOver) };
+  const record = await IdempotencyKey.findById(id).lean();
+  // released (5xx) or expired since the insert failed: claim it afresh
+  return record ? { record } : claim(id, fingerprint);
+};
+
+// Store the handler's response; release the key on a server error. Both only
+// apply while this request still owns the key.
+const settle = async (id, { owner, expiresAt }, fingerprint, statusCode, body) => {
+  const mine = { _id: id, state: "pending", owner };
+  if (statusCode >= 500) {
+    await IdempotencyKey.deleteOne(mine);
+    return;
+  }
+  const record = { fingerprint, state: "done", statusCode, body: JSON.parse(JSON.stringify(body)) };
+  const { matchedCount } = await IdempotencyKey.updateOne(mine, { $set: record, $unset: { owner: 1 } });
+  if (matchedCount) remember(id, { ...record, expiresAt });
+  else logger.warn(`idempotency key ${id}: taken over before the response was stored`);
+};
+
+// router.route("/").post(validate(schema), idempotent("bills"), createBill)
+export const idempotent = (scope) =>
+  asyncHandler(async (req, res, next) => {
+    const key = req.get("Idempotency-Key");
+    if (!key) return next();
+    if (key.length > MAX_KEY_LENGTH) {
+      return res.status(400).json({
+        success: false,
+        message: `Idempotency-Key must be at most ${MAX_KEY_LENGTH} characters`,
+      });
+    }
+
+    const id = `${req.user?._id ?? "-"}:${scope}:${key}`;
+    const fingerprint = fingerprintOf(req.body);
+    let record = cached(id);
+    let claimed = null;
+    if (!record) {
+      const result = await claim(id, fingerprint);
+      if (result.record) record = { ...result.record, expiresAt: expiryOf(result.record) };
+      else claimed = result;
+    }
+
+    if (record) {
+      if (record.fingerprint !== fingerprint) {
+        return res.status(422).json({
+          success: false,
+          message: "Idempotency-Key was already used with a different request",
+        });
+      }
+      if (record.state !== "done") {
+        res.set("Retry-After", "1");
+        return res.status(409).json({
+          success: false,
+          message: "A request with this Idempotency-Key is still being processed",
+        });
+      }
+      remember(id, record);
+      res.set("Idempotent-Replayed", "true");
+      return res.status(record.statusCode).json(record.body);
+    }
+
+    // Every JSON response of the handler (errors included, via errorHandler)
+    // goes through here, whether or not the client is still connected.
+    const json = res.json.bind(res);
+    res.json = (body) => {
+      res.json = json;
+      settle(id, claimed, fingerprint, res.statusCode, body).catch((err) =>
+        logger.error(`idempotency key ${key}: ${err.message}`)
+      );
+      return json(body);
+    };
+    next();
+  });
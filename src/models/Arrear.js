@@ -0,0 +1,36 @@
+import mongoose from 'mongoose';
+
+// Materialized arrears: one row per bill with an open balance, denormalized
+// with the bed's room and PG so GET /reports/arrears is an indexed read.
+// _id is the bill's _id. Maintained by services/arrearsService.js: synced on
+// bill and payment writes, rebuilt with $merge on a schedule. A bill settled
+// since the last rebuild keeps a row with balance 0 until the next one.
+// Never written by clients.
+const ArrearSchema = new mongoose.Schema(
+  {
+    _id: { type: mongoose.Schema.Types.ObjectId, ref: 'Bill' },
+    tenantId: { type: mongoose.Schema.Types.ObjectId, ref: 'Tenant' },
+    occupancyId: { type: mongoose.Schema.Types.ObjectId, ref: 'Occupancy' },
+    bedId: { type: mongoose.Schema.Types.ObjectId, ref: 'Bed' },
+    roomId: { type: mongoose.Schema.Types.ObjectId, ref: 'Room' },
+    pgId: { type: mongoose.Schema.Types.ObjectId, ref: 'Pg' },
+
+    period_start: { type: Date },
+    period_end: { type: Date },
+    amount: { type: Number },
+    paid: { type: Number },
+    balance: { type: Number },
+    status: { type: String },
+
+    // when the row was last written; rows a sync or rebuild did not touch are stale
+    syncedAt: { type: Date },
+  },
+  { versionKey: false, collection: 'arrears' }
+);
+
+// ?pgId=&asOf=  and  ?asOf=
+ArrearSchema.index({ pgId: 1, period_start: 1 });
+ArrearSchema.index({ period_start: 1 });
+ArrearSchema.index({ syncedAt: 1 });
+
+export default mongoose.model('Arrear', ArrearSchema);
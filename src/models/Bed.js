@@ -35,4 +35,8 @@ BedSchema.virtual('isOccupied').get(function () {
 // Useful unique constraint (as you already had)
 BedSchema.index({ roomId: 1, bedNo: 1 }, { unique: true });
 
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+BedSchema.index({ roomId: 1, _id: 1 });
+// --- end planned indexes ---
+
 export default mongoose.model('Bed', BedSchema);
@@ -6,12 +6,18 @@ const BillSchema = new mongoose.Schema(
     tenantId: { type: mongoose.Schema.Types.ObjectId, ref: 'Tenant', required: true },
     // (Optional) add occupancyId later for tighter linkage
     occupancyId: { type: mongoose.Schema.Types.ObjectId, ref: 'Occupancy' },
+    // Set on bills written by a bulk billing run
+    billingRunId: { type: mongoose.Schema.Types.ObjectId, ref: 'BillingRun' },
 
     period_start: { type: Date, required: true },
     period_end: { type: Date, required: true },
 
     amount: { type: Number, required: true, min: 0 },
 
+    // Maintained from transactions (Bill.applyPayment); rebuilt by
+    // scripts/reconcileBills.js. status follows paid vs amount.
+    paid: { type: Number, default: 0 },
+    balance: { type: Number },
     status: { type: String, enum: ['pending', 'partial', 'paid'], default: 'pending' },
     remarks: { type: String, trim: true },
   },
@@ -20,9 +26,53 @@ const BillSchema = new mongoose.Schema(
 
 // One bill per tenant/bed per exact period (tune if you need month-based uniqueness)
 BillSchema.index({ tenantId: 1, bedId: 1, period_start: 1, period_end: 1 }, { unique: true });
-BillSchema.index({ status: 1 });
 BillSchema.index({ period_start: 1, period_end: 1 });
+// Period ledger per occupancy: the overlap check below reads one key of it,
+// and scripts/auditBillOverlaps.js walks it in order
+BillSchema.index({ occupancyId: 1, period_start: 1, period_end: 1 });
+// A resumed billing run looks up the bills it already wrote
+BillSchema.index(
+  { billingRunId: 1, occupancyId: 1 },
+  { partialFilterExpression: { billingRunId: { $exists: true } } }
+);
 
+// balance and status from amount and paid, as an update-pipeline stage so
+// they change in the same atomic write as paid or amount
+export const settleStage = {
+  $set: {
+    balance: { $round: [{ $subtract: ['$amount', { $ifNull: ['$paid', 0] }] }, 2] },
+    status: {
+      $switch: {
+        branches: [
+          { case: { $lte: [{ $ifNull: ['$paid', 0] }, 0] }, then: 'pending' },
+          { case: { $lt: ['$paid', '$amount'] }, then: 'partial' },
+        ],
+        default: 'paid',
+      },
+    },
+  },
+};
+
+export const deriveStatus = (amount, paid) => {
+  if (paid <= 0) return 'pending';
+  if (paid < amount) return 'partial';
+  return 'paid';
+};
+
+// Add `delta` (negative to undo) to a bill's paid total; one atomic update
+BillSchema.statics.applyPayment = function (billId, delta) {
+  return this.updateOne({ _id: billId }, [
+    { $set: { paid: { $round: [{ $add: [{ $ifNull: ['$paid', 0] }, delta] }, 2] } } },
+    settleStage,
+  ]);
+};
+
+BillSchema.pre('validate', function () {
+  if (this.isNew && this.amount != null) {
+    this.balance = Number((this.amount - (this.paid || 0)).toFixed(2));
+    this.status = deriveStatus(this.amount, this.paid || 0);
+  }
+});
 
 // Bill.js
 BillSchema.pre('validate', async function () {
@@ -51,19 +101,126 @@ BillSchema.pre('save', async function () {
   const ps = this.period_start;
   const pe = this.period_end;
 
-  const overlap = await this.constructor.exists({
-    _id: { $ne: this._id },
-    occupancyId: this.occupancyId,
-    // overlap if: start < other_end AND end > other_start
-    period_start: { $lt: pe },
-    period_end: { $gt: ps },
-  });
-
-  if (overlap) {
+  // overlap if: start < other_end AND end > other_start
+  // Bills of an occupancy never overlap each other, so the latest one that
+  // starts before this period ends is the only one that can reach into it:
+  // one index entry of { occupancyId, period_start, period_end }, however
+  // long the occupancy's history. Overlaps already written by paths that
+  // bypass this hook are found by scripts/auditBillOverlaps.js.
+  const latest = await this.constructor
+    .findOne({ _id: { $ne: this._id }, occupancyId: this.occupancyId, period_start: { $lt: pe } }, { period_end: 1 })
+    .sort({ period_start: -1 })
+    .lean();
+
+  if (latest && latest.period_end > ps) {
     throw new Error('Overlapping bill exists for this occupancy and period');
   }
 });
 
+// Batch counterparts of the hooks above, for bulk creation: the same checks
+// for N bills in two queries instead of 2N.
+
+// Existing bills overlapping any of `bills` on the same occupancy, keyed by
+// occupancyId (one query). Bills in `exclude` (ids) or written by
+// `excludeRun` are ignored.
+BillSchema.statics.findOverlapping = async function (bills, { exclude = [], excludeRun } = {}) {
+  const found = new Map();
+  const linked = bills.filter((b) => b.occupancyId);
+  if (!linked.length) return found;
+  const starts = linked.map((b) => new Date(b.period_start));
+  const ends = linked.map((b) => new Date(b.period_end));
+  const existing = await this.find(
+    {
+      occupancyId: { $in: [...new Set(linked.map((b) => String(b.occupancyId)))] },
+      period_start: { $lt: new Date(Math.max(...ends)) },
+      period_end: { $gt: new Date(Math.min(...starts)) },
+      ...(exclude.length ? { _id: { $nin: exclude } } : {}),
+      ...(excludeRun ? { billingRunId: { $ne: excludeRun } } : {}),
+    },
+    { occupancyId: 1, period_start: 1, period_end: 1, amount: 1, status: 1 }
+  ).lean();
+  // The query is bounded by the whole batch; keep only real overlaps
+  const windows = new Map();
+  linked.forEach((b, i) => {
+    const key = String(b.occupancyId);
+    if (!windows.has(key)) windows.set(key, []);
+    windows.get(key).push([starts[i], ends[i]]);
+  });
+  for (const bill of existing) {
+    const key = String(bill.occupancyId);
+    if (!(windows.get(key) || []).some(([ps, pe]) => bill.period_start < pe && bill.period_end > ps)) continue;
+    if (!found.has(key)) found.set(key, []);
+    found.get(key).push(bill);
+  }
+  return found;
+};
+
+// pre('validate') + pre('save') for a whole batch. Returns one entry per bill:
+// null when valid, else the error message the hooks would have thrown. Bills
+// in the batch overlapping each other are reported too (the later one).
+BillSchema.statics.validateBatch = async function (bills) {
+  const errors = bills.map(() => null);
+  const occIds = [...new Set(bills.filter((b) => b.occupancyId).map((b) => String(b.occupancyId)))];
+  const occupancies = new Map(
+    (await this.model('Occupancy').find({ _id: { $in: occIds } }, { start_date: 1, end_date: 1 }).lean())
+      .map((occ) => [String(occ._id), occ])
+  );
+
+  const checked = [];
+  bills.forEach((b, i) => {
+    if (!b.occupancyId) return;
+    const occ = occupancies.get(String(b.occupancyId));
+    if (!occ) {
+      errors[i] = 'Invalid occupancyId';
+      return;
+    }
+    const ps = new Date(b.period_start);
+    const pe = new Date(b.period_end);
+    if (!(ps < pe)) {
+      errors[i] = 'period_start must be before period_end';
+      return;
+    }
+    const occEnd = occ.end_date ? new Date(occ.end_date) : null;
+    if (!(ps >= new Date(occ.start_date) && (occEnd ? pe <= occEnd : true))) {
+      errors[i] = 'Bill period must be within occupancy window';
+      return;
+    }
+    checked.push({ i, key: String(b.occupancyId), ps, pe });
+  });
+
+  const exclude = bills.filter((b) => b._id && b.isNew !== true).map((b) => b._id); // updates
+  const overlapping = await this.findOverlapping(checked.map(({ i }) => bills[i]), { exclude });
+  for (const { i, key, ps, pe } of checked) {
+    if ((overlapping.get(key) || []).some((o) => o.period_start < pe && o.period_end > ps)) {
+      errors[i] = 'Overlapping bill exists for this occupancy and period';
+    }
+  }
 
+  // Within the batch: per occupancy, sorted by start, each period must begin
+  // at or after the end of the previous accepted one.
+  const groups = new Map();
+  for (const c of checked) {
+    if (errors[c.i]) continue;
+    if (!groups.has(c.key)) groups.set(c.key, []);
+    groups.get(c.key).push(c);
+  }
+  for (const group of groups.values()) {
+    group.sort((a, b) => a.ps - b.ps);
+    let latestEnd = null; // end of the last accepted bill
+    for (const c of group) {
+      if (latestEnd && c.ps < latestEnd) errors[c.i] = 'Overlaps another bill in this batch';
+      else latestEnd = c.pe;
+    }
+  }
+  return errors;
+};
+
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+BillSchema.index({ tenantId: 1, createdAt: -1, _id: -1 });
+BillSchema.index({ bedId: 1, createdAt: -1, _id: -1 });
+BillSchema.index({ status: 1, createdAt: -1, _id: -1 });
+BillSchema.index({ createdAt: -1, _id: -1, period_start: 1, period_end: 1 });
+BillSchema.index({ tenantId: 1, status: 1, createdAt: -1, _id: -1 });
+// --- end planned indexes ---
 
 export default mongoose.model('Bill', BillSchema);
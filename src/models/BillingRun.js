@@ -0,0 +1,44 @@
+import mongoose from 'mongoose';
+
+// One bulk billing run (services/billingRunService.js). Occupancies are billed
+// in _id order, chunk by chunk; lastOccupancyId is the checkpoint a restarted
+// process resumes from.
+const BillingRunSchema = new mongoose.Schema(
+  {
+    month: { type: String, trim: true }, // YYYY-MM when the run was asked for by month
+    period_start: { type: Date, required: true },
+    period_end: { type: Date, required: true },
+    pgId: { type: mongoose.Schema.Types.ObjectId, ref: 'Pg', default: null },
+
+    status: { type: String, enum: ['queued', 'running', 'done', 'failed'], default: 'queued' },
+    chunkSize: { type: Number, default: 500, min: 1 },
+
+    // checkpoint
+    lastOccupancyId: { type: mongoose.Schema.Types.ObjectId, default: null },
+    chunksDone: { type: Number, default: 0 },
+
+    // progress
+    total: { type: Number, default: null }, // occupancies to bill, known once planned
+    created: { type: Number, default: 0 },
+    skipped: {
+      duplicate: { type: Number, default: 0 },
+      conflict: { type: Number, default: 0 },
+      zeroAmount: { type: Number, default: 0 },
+    },
+    failed: { type: Number, default: 0 },
+    writeErrors: [{ _id: false, code: Number, message: String }], // first few non-duplicate insert errors
+    lastError: { type: String, default: null },
+
+    // lease: the process working on the run refreshes heartbeatAt per chunk
+    owner: { type: String, default: null },
+    heartbeatAt: { type: Date, default: null },
+    startedAt: { type: Date, default: null },
+    finishedAt: { type: Date, default: null },
+  },
+  { timestamps: true, versionKey: false }
+);
+
+// Unfinished runs, for the resume sweep
+BillingRunSchema.index({ status: 1, heartbeatAt: 1 });
+
+export default mongoose.model('BillingRun', BillingRunSchema);
@@ -10,4 +10,8 @@ const DocumentSchema = new mongoose.Schema(
   { timestamps: true, versionKey: false }
 );
 
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+DocumentSchema.index({ type: 1, _id: 1 });
+// --- end planned indexes ---
+
 export default mongoose.model('Document', DocumentSchema);
@@ -0,0 +1,23 @@
+import mongoose from 'mongoose';
+
+// Stored responses of requests sent with an Idempotency-Key header
+// (middlewares/idempotency.js). A key is "pending" while its first request
+// runs and "done" once the response is stored; MongoDB's TTL monitor removes
+// keys a day after they were first used.
+export const KEY_TTL_SECONDS = 24 * 60 * 60;
+
+const IdempotencyKeySchema = new mongoose.Schema(
+  {
+    _id: { type: String }, // <user>:<resource>:<key>
+    fingerprint: { type: String, required: true }, // sha256 of the request body
+    state: { type: String, enum: ['pending', 'done'], default: 'pending' },
+    owner: { type: String }, // claim token of the request running it, while pending
+    statusCode: { type: Number },
+    body: { type: mongoose.Schema.Types.Mixed },
+  },
+  { timestamps: true, versionKey: false }
+);
+
+IdempotencyKeySchema.index({ createdAt: 1 }, { expireAfterSeconds: KEY_TTL_SECONDS });
+
+export default mongoose.model('IdempotencyKey', IdempotencyKeySchema);
@@ -22,4 +22,11 @@ OccupancySchema.index(
 OccupancySchema.index({ tenantId: 1, start_date: 1 });
 OccupancySchema.index({ bedId: 1, start_date: 1 });
 
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+OccupancySchema.index({ tenantId: 1, start_date: -1, _id: -1 });
+OccupancySchema.index({ bedId: 1, start_date: -1, _id: -1 });
+OccupancySchema.index({ end_date: 1, start_date: -1, _id: -1 });
+OccupancySchema.index({ start_date: -1, _id: -1, end_date: 1 });
+// --- end planned indexes ---
+
 export default mongoose.model('Occupancy', OccupancySchema);
@@ -14,4 +14,10 @@ const RoomSchema = new mongoose.Schema(
 // Room number unique within a PG
 RoomSchema.index({ pgId: 1, no: 1 }, { unique: true });
 
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+RoomSchema.index({ pgId: 1, _id: 1 });
+RoomSchema.index({ status: 1, _id: 1 });
+RoomSchema.index({ floor: 1, _id: 1 });
+// --- end planned indexes ---
+
 export default mongoose.model('Room', RoomSchema);
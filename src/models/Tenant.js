@@ -27,4 +27,9 @@ TenantSchema.index(
 // Search helpers
 TenantSchema.index({ name: 'text', mobile: 'text', email: 'text' });
 
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+TenantSchema.index({ active: 1, _id: 1 });
+TenantSchema.index({ mobile: 1, _id: 1 });
+// --- end planned indexes ---
+
 export default mongoose.model('Tenant', TenantSchema);
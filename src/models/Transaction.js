@@ -6,13 +6,24 @@ const TransactionSchema = new mongoose.Schema(
     method: { type: String, enum: ['cash', 'upi', 'bank', 'card', 'other'], default: 'cash' },
     screenshot: { type: String, trim: true }, // URL/path
     notes: { type: String, trim: true },
+    // Bank / UPI reference (UTR) of imported payments; unique when present
+    reference: { type: String, trim: true },
     dateTime: { type: Date, default: Date.now, required: true },
     amount: { type: Number, required: true, min: 0 },
   },
   { timestamps: true, versionKey: false }
 );
 
-TransactionSchema.index({ billId: 1 });
 TransactionSchema.index({ dateTime: 1 });
+TransactionSchema.index(
+  { reference: 1 },
+  { unique: true, partialFilterExpression: { reference: { $type: 'string' } } }
+);
+
+// --- indexes planned by scripts/indexes.py (from resources.json list queries) ---
+TransactionSchema.index({ dateTime: -1, _id: -1 });
+TransactionSchema.index({ billId: 1, dateTime: -1, _id: -1 });
+TransactionSchema.index({ method: 1, dateTime: -1, _id: -1 });
+// --- end planned indexes ---
 
 export default mongoose.model('Transaction', TransactionSchema);
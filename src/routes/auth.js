@@ -1,9 +1,10 @@
-// Auto-generated by routeGen.py — auth routes
+// Auto-generated by genRoutes.py — auth routes
 // Feel free to edit as needed.
 import express from "express";
-import { register, login, getMe } from "../controllers/authController.js";
 import { protect } from "../middlewares/auth.js";
 import { validate } from "../middlewares/validator.js";
+
+import { register, login, getMe } from "../controllers/authController.js";
 import { registerSchema, loginSchema } from "../validations/authValidation.js";
 
 const router = express.Router();
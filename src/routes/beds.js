@@ -1,21 +1,21 @@
-// Auto-generated by routeGen.py — beds routes
+// Auto-generated by genRoutes.py — beds routes
 // Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
 import { validate } from "../middlewares/validator.js";
 
-import { getBedcontrollers, createBedcontroller, getBedcontroller, updateBedcontroller, deleteBedcontroller } from "../controllers/bedController.js";
-import { getBedAvailability } from "../controllers/availabilityController.js";
+import { getBeds, getBed, createBed, updateBed, deleteBed, getBedAvailability } from "../controllers/bedController.js";
 import { createBedSchema } from "../validations/bedValidation.js";
 
 const router = express.Router();
 // 🔒 Protect all routes below
 router.use(protect);
 
-router.route("/").get(getBedcontrollers)
-  .post(validate(createBedSchema), createBedcontroller);
+router.route("/").get(getBeds)
+  .post(validate(createBedSchema), createBed);
 
-router.route("/:id").get(getBedcontroller).patch(updateBedcontroller).delete(deleteBedcontroller);
+router.route("/:id").get(getBed).patch(updateBed).delete(deleteBed);
 
 router.get("/:id/availability", getBedAvailability);
+
 export default router;
@@ -1,11 +1,14 @@
-// Auto-generated by routeGen.py — billing runs routes
+// Auto-generated by genRoutes.py — billingRuns routes
+// Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
 import { validate } from "../middlewares/validator.js";
+
 import { createBillingRun, previewBillingRun, getBillingRun } from "../controllers/billingRunController.js";
 import { billingRunSchema } from "../validations/billingRunValidation.js";
 
 const router = express.Router();
+// 🔒 Protect all routes below
 router.use(protect);
 
 router.post("/", validate(billingRunSchema), createBillingRun);
@@ -1,23 +1,29 @@
-// Auto-generated by routeGen.py — bills routes
+// Auto-generated by genRoutes.py — bills routes
 // Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
 import { validate } from "../middlewares/validator.js";
+import { idempotent } from "../middlewares/idempotency.js";
 
-import { getBillcontrollers, createBillcontroller, getBillcontroller, updateBillcontroller, deleteBillcontroller } from "../controllers/billController.js";
-import { getBillSummary, recalculateBill, markBillPaid } from "../controllers/billController.js";
-import { createBillSchema } from "../validations/billValidation.js";
+import { getBills, getBill, createBill, updateBill, deleteBill, exportBills, createBills, recalculateBills, reconcileBillPayments, getBillSummary, recalculateBill, markBillPaid } from "../controllers/billController.js";
+import { createBillSchema, bulkBillsSchema, recalculateBillsSchema, reconcileBillsSchema } from "../validations/billValidation.js";
 
 const router = express.Router();
 // 🔒 Protect all routes below
 router.use(protect);
 
-router.route("/").get(getBillcontrollers)
-  .post(validate(createBillSchema), createBillcontroller);
+router.route("/").get(getBills)
+  .post(validate(createBillSchema), idempotent("bills"), createBill);
 
-router.route("/:id").get(getBillcontroller).patch(updateBillcontroller).delete(deleteBillcontroller);
+router.get("/export", exportBills);
 
+router.route("/:id").get(getBill).patch(updateBill).delete(deleteBill);
+
+router.post("/bulk", validate(bulkBillsSchema), createBills);
+router.post("/recalculate", validate(recalculateBillsSchema), recalculateBills);
+router.post("/reconcile", validate(reconcileBillsSchema), reconcileBillPayments);
 router.get("/:id/summary", getBillSummary);
 router.post("/:id/recalculate", recalculateBill);
 router.post("/:id/mark-paid", markBillPaid);
+
 export default router;
@@ -1,9 +1,12 @@
-// Auto-generated by routeGen.py — dashboards routes
+// Auto-generated by genRoutes.py — dashboards routes
+// Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
+
 import { tenantDashboard } from "../controllers/dashboardController.js";
 
 const router = express.Router();
+// 🔒 Protect all routes below
 router.use(protect);
 
 router.get("/tenant/:tenantId", tenantDashboard);
@@ -1,426 +1,185 @@
-# routeGen.py
+# genRoutes.py
 # Generates Express ESM route files for your MERN backend.
-# Place this file inside your /routes directory and run:  python3 routeGen.py
+# Place this file inside your /routes directory and run:  python3 genRoutes.py
+# (add --watch to keep it running and rebuild whenever resources.json changes)
+#
+# Every route file, the index.js mounts and the README are rendered from
+# resources.json (see scripts/codegen/spec.py).
 
+import sys
 from pathlib import Path
-from textwrap import dedent
 
 BASE = Path(__file__).parent.resolve()
+sys.path.insert(0, str(BASE.parents[1] / "scripts"))
 
-# ------------ Helpers
+from codegen import cli  # noqa: E402
+from codegen.registry import Registry  # noqa: E402
+from codegen.spec import SpecError, load_spec  # noqa: E402
+from codegen.templates import template  # noqa: E402
+
+# Bump when a template change should invalidate every manifest entry.
+GENERATOR_VERSION = "2"
 
-def write_file(path: Path, content: str):
-    path.write_text(content.strip() + "\n", encoding="utf-8")
-    print(f"✔ wrote {path.relative_to(BASE)}")
+VALIDATIONS = BASE.parent / "validations"
+
+# ------------ Helpers
 
 def header_comment(name: str) -> str:
-    return f"// Auto-generated by routeGen.py — {name} routes\n// Feel free to edit as needed.\n"
-
-def basic_router_prelude() -> str:
-    return dedent('''\
-        import express from "express";
-        import { protect } from "../middlewares/auth.js";
-        import { validate } from "../middlewares/validator.js";
-    ''')
-
-def make_resource_router(
-    name,
-    controller,                 # e.g. "billController"
-    base_validations=None,      # dict of { op: { importFrom, schemaName } } for create/update
-    protect_all=True,
-    extra_imports=None,         # list of extra imports (strings)
-    inline_routes=None,         # list of raw route lines to insert
-    resource_path=None,         # default: /<namePlural>
-    resource_ops=None           # dict for REST ops (list, create, read, update, delete)
-):
-    if resource_path is None:
-        resource_path = "/"
-
-    if base_validations is None:
-        base_validations = {}
-
-    if resource_ops is None:
-        resource_ops = {
-            "list":   f"get{controller.title().replace('Controller','') + 's'}",
-            "create": f"create{controller.title().replace('Controller','')}",
-            "read":   f"get{controller.title().replace('Controller','')}",
-            "update": f"update{controller.title().replace('Controller','')}",
-            "delete": f"delete{controller.title().replace('Controller','')}",
-        }
-
-    cbase = controller.replace("Controller", "")
-    cap   = cbase[0].upper() + cbase[1:]
-
-    imports = [
-        f'import {{ {", ".join(filter(None, resource_ops.values()))} }} from "../controllers/{controller}.js";'
-    ]
-    if extra_imports:
-        imports.extend(extra_imports)
-
-    # optional validation imports
-    val_lines = []
-    if "create" in base_validations:
-        val = base_validations["create"]
-        val_lines.append(f'import {{ {val["schema"]} }} from "../validations/{val["from"]}.js";')
-    if "update" in base_validations:
-        val = base_validations["update"]
-        val_lines.append(f'import {{ {val["schema"]} }} from "../validations/{val["from"]}.js";')
-
-    prelude = basic_router_prelude() + "\n" + "\n".join(imports + val_lines) + "\n\nconst router = express.Router();\n"
+    return f"// Auto-generated by genRoutes.py — {name} routes\n// Feel free to edit as needed.\n"
+
+def import_line(names, module: str) -> str:
+    return f'import {{ {", ".join(names)} }} from "{module}";'
+
+def grouped_imports(pairs):
+    """[(module, name), ...] -> one import line per module, first-seen order."""
+    groups = {}
+    for module, name in pairs:
+        names = groups.setdefault(module, [])
+        if name not in names:
+            names.append(name)
+    return [import_line(names, module) for module, names in groups.items()]
+
+def check_validations(res):
+    """Every schema a route validates with must be exported by its module;
+    otherwise the generated import fails when the app starts."""
+    refs = list(res.validation.values()) + [r.validate for r in res.routes if r.validate]
+    for ref in dict.fromkeys(refs):
+        path = VALIDATIONS / f"{ref.module}.js"
+        if not path.exists():
+            raise SpecError(f"{res.route_file}: validations/{ref.module}.js does not exist")
+        if f"export const {ref.schema} " not in path.read_text(encoding="utf-8"):
+            raise SpecError(f"{res.route_file}: validations/{ref.module}.js does not export {ref.schema}")
+
+def route_line(r, protect_all: bool) -> str:
+    mw = []
+    if r.protect and not protect_all:
+        mw.append("protect")
+    if r.validate:
+        mw.append(f"validate({r.validate.schema})")
+    line = f'router.{r.method}("{r.path}", {", ".join(mw + [r.handler])});'
+    return f"{line} // {r.comment}" if r.comment else line
+
+def make_router(res) -> str:
+    check_validations(res)
+    ops = res.ops
+    create_schema = res.validation.get("create")
+    update_schema = res.validation.get("update")
+
+    # controller imports: CRUD ops first, then route handlers, grouped per controller
+    handlers = [(res.controller, fn) for fn in ops.values()]
+    handlers += [(r.controller, r.handler) for r in res.routes]
+    refs = [ref for ref in (create_schema, update_schema) if ref]
+    refs += [r.validate for r in res.routes if r.validate]
+
+    uses_protect = res.protect or any(r.protect for r in res.routes)
+    imports = ['import express from "express";']
+    if uses_protect:
+        imports.append('import { protect } from "../middlewares/auth.js";')
+    if refs:
+        imports.append('import { validate } from "../middlewares/validator.js";')
+    if res.features.get("idempotent"):
+        imports.append('import { idempotent } from "../middlewares/idempotency.js";')
+    imports.append("")
+    imports += grouped_imports((f"../controllers/{c}.js", fn) for c, fn in handlers)
+    imports += grouped_imports((f"../validations/{ref.module}.js", ref.schema) for ref in refs)
 
     body = []
-    if protect_all:
+    if res.protect:
         body.append("// 🔒 Protect all routes below\nrouter.use(protect);\n")
-
-    # collection routes
-    create_schema = base_validations.get("create", {}).get("schema")
-    list_fn   = resource_ops.get("list")
-    create_fn = resource_ops.get("create")
-    read_fn   = resource_ops.get("read")
-    update_fn = resource_ops.get("update")
-    delete_fn = resource_ops.get("delete")
-
-    # /  -> list, create
-    coll_route = f'router.route("/").get({list_fn})'
-    if create_fn:
+    else:
+        body.append("")
+
+    if ops:
+        # /  -> list, create
+        coll_route = f'router.route("/").get({ops["list"]})'
+        create = [ops["create"]]
+        if res.features.get("idempotent"):
+            create.insert(0, f'idempotent("{res.name}")')
         if create_schema:
-            coll_route += f'\n  .post(validate({create_schema}), {create_fn});'
-        else:
-            coll_route += f'\n  .post({create_fn});'
-    coll_route += "\n"
-    body.append(coll_route)
-
-    # /:id -> read, update, delete
-    item_route = f'router.route("/:id").get({read_fn}).patch({update_fn}).delete({delete_fn});\n'
-    body.append(item_route)
-
-    # inline extras
-    if inline_routes:
-        body.extend(inline_routes)
-
-    trailer = "\nexport default router;\n"
-    return header_comment(name) + prelude + "\n".join(body) + trailer
-
-# ------------ Files to generate
-
-files = {}
-
-# AUTH (unprotected register/login, protected /me)
-files["auth.js"] = dedent('''\
-    // Auto-generated by routeGen.py — auth routes
-    // Feel free to edit as needed.
-    import express from "express";
-    import { register, login, getMe } from "../controllers/authController.js";
-    import { protect } from "../middlewares/auth.js";
-    import { validate } from "../middlewares/validator.js";
-    import { registerSchema, loginSchema } from "../validations/authValidation.js";
-
-    const router = express.Router();
-
-    router.post("/register", validate(registerSchema), register);
-    router.post("/login", validate(loginSchema), login);
-    router.get("/me", protect, getMe);
-
-    export default router;
-''')
-
-# PGs
-files["pgs.js"] = make_resource_router(
-    name="pgs",
-    controller="pgController",
-    base_validations={"create": {"from": "pgValidation", "schema": "createPgSchema"}},
-    inline_routes=[
-        # Nested: rooms under PG
-        'router.get("/:pgId/rooms", getRoomsByPg);',
-        'router.post("/:pgId/rooms", validate(createRoomSchema), createRoomForPg);'
-    ],
-    extra_imports=[
-        'import { getRoomsByPg, createRoomForPg } from "../controllers/roomController.js";',
-        'import { createRoomSchema } from "../validations/roomValidation.js";'
-    ]
-)
-
-# Rooms
-files["rooms.js"] = make_resource_router(
-    name="rooms",
-    controller="roomController",
-    base_validations={"create": {"from": "roomValidation", "schema": "createRoomSchema"}},
-    inline_routes=[
-        'router.get("/:id/beds", getBedsByRoom);',
-        'router.post("/:id/beds", validate(createBedSchema), createBedForRoom);'
-    ],
-    extra_imports=[
-        'import { getBedsByRoom, createBedForRoom } from "../controllers/bedController.js";',
-        'import { createBedSchema } from "../validations/bedValidation.js";'
-    ]
-)
-
-# Beds
-files["beds.js"] = make_resource_router(
-    name="beds",
-    controller="bedController",
-    base_validations={"create": {"from": "bedValidation", "schema": "createBedSchema"}},
-    inline_routes=[
-        'router.get("/:id/availability", getBedAvailability);'
-    ],
-    extra_imports=[
-        'import { getBedAvailability } from "../controllers/availabilityController.js";'
-    ]
-)
-
-# Tenants
-files["tenants.js"] = make_resource_router(
-    name="tenants",
-    controller="tenantController",
-    base_validations={"create": {"from": "tenantValidation", "schema": "createTenantSchema"}},
-    inline_routes=[
-        'router.get("/:id/occupancies", getTenantOccupancies);',
-        'router.get("/:id/bills", getTenantBills);',
-        'router.get("/:id/transactions", getTenantTransactions);',
-        'router.get("/:id/documents", getTenantDocuments);'
-    ],
-    extra_imports=[
-        'import { getTenantOccupancies } from "../controllers/occupancyController.js";',
-        'import { getTenantBills } from "../controllers/billController.js";',
-        'import { getTenantTransactions } from "../controllers/transactionController.js";',
-        'import { getTenantDocuments } from "../controllers/tenantDocumentController.js";'
-    ]
-)
-
-# Occupancies
-files["occupancies.js"] = make_resource_router(
-    name="occupancies",
-    controller="occupancyController",
-    base_validations={"create": {"from": "occupancyValidation", "schema": "createOccupancySchema"}},
-    inline_routes=[
-        'router.post("/:id/close", closeOccupancy);',
-        'router.post("/:id/transfer", transferOccupancy);'
-    ],
-    extra_imports=[
-        'import { closeOccupancy, transferOccupancy } from "../controllers/occupancyController.js";'
-    ]
-)
-
-# Bills
-files["bills.js"] = make_resource_router(
-    name="bills",
-    controller="billController",
-    base_validations={"create": {"from": "billValidation", "schema": "createBillSchema"}},
-    inline_routes=[
-        'router.get("/:id/summary", getBillSummary);',
-        'router.post("/:id/recalculate", recalculateBill);',
-        'router.post("/:id/mark-paid", markBillPaid);'
-    ],
-    extra_imports=[
-        'import { getBillSummary, recalculateBill, markBillPaid } from "../controllers/billController.js";',
-    ]
-)
-
-# Transactions
-files["transactions.js"] = make_resource_router(
-    name="transactions",
-    controller="transactionController",
-    base_validations={"create": {"from": "transactionValidation", "schema": "createTransactionSchema"}}
-)
-
-# Documents
-files["documents.js"] = make_resource_router(
-    name="documents",
-    controller="documentController",
-    base_validations={"create": {"from": "documentValidation", "schema": "createDocumentSchema"}}
-)
-
-# TenantDocuments (M:N)
-files["tenantDocuments.js"] = dedent('''\
-    // Auto-generated by routeGen.py — tenantDocuments routes
-    // Feel free to edit as needed.
-    import express from "express";
-    import { protect } from "../middlewares/auth.js";
-    import { validate } from "../middlewares/validator.js";
-    import {
-      getTenantDocuments,
-      linkTenantDocument,
-      unlinkTenantDocument
-    } from "../controllers/tenantDocumentController.js";
-    import { linkTenantDocumentSchema } from "../validations/tenantDocumentValidation.js";
-
-    const router = express.Router();
-
-    // 🔒 Protect all routes
-    router.use(protect);
-
-    // list by tenant
-    router.get("/", getTenantDocuments);
-
-    // link/unlink
-    router.post("/", validate(linkTenantDocumentSchema), linkTenantDocument);
-    router.delete("/:tenantId/:docId", unlinkTenantDocument);
+            create.insert(0, f"validate({create_schema.schema})")
+        coll_route += f'\n  .post({", ".join(create)});'
+        body.append(coll_route + "\n")
+
+        # /export -> streamed NDJSON/CSV; must come before /:id
+        if "export" in ops:
+            body.append(f'router.get("/export", {ops["export"]});\n')
+
+        # /:id -> read, update, delete
+        update = (f'validate({update_schema.schema}), {ops["update"]}' if update_schema else ops["update"])
+        body.append(f'router.route("/:id").get({ops["read"]}).patch({update}).delete({ops["delete"]});\n')
+
+    body.extend(route_line(r, res.protect) for r in res.routes)
+
+    prelude = "\n".join(imports) + "\n\nconst router = express.Router();\n"
+    trailer = "\n\nexport default router;\n"
+    return header_comment(res.name) + prelude + "\n".join(body) + trailer
+
+def make_index(spec) -> str:
+    def var(res):
+        return res.controller.replace("Controller", "") + "Routes"
+    imports = [f'import {var(res)} from "./{res.route_file}";' for res in spec.resources]
+    public = [res for res in spec.resources if not res.protect]
+    protected = [res for res in spec.resources if res.protect]
+    lines = ["// Auto-generated by genRoutes.py — routes index", 'import express from "express";', ""]
+    lines += imports
+    lines += ["", "const router = express.Router();", ""]
+    if public:
+        lines.append("// Public-ish")
+        lines += [f'router.use("{res.mount}", {var(res)});' for res in public]
+        lines.append("")
+    lines.append("// Protected groups (each subrouter handles protect)")
+    lines += [f'router.use("{res.mount}", {var(res)});' for res in protected]
+    lines += ["", "export default router;"]
+    return "\n".join(lines) + "\n"
+
+README = template("""
+    # Generated routes
+
+    These files were generated by `genRoutes.py` from `resources.json`. They assume you have the following folders:
+
+    - controllers/
+    {{controllers}}
+    - middlewares/
+    {{middlewares}}
+    - validations/
+    {{validations}}
+
+    Mount from your main server file:
 
-    export default router;
-''')
-
-# Billing runs (batch generation)
-files["billingRuns.js"] = dedent('''\
-    // Auto-generated by routeGen.py — billing runs routes
-    import express from "express";
-    import { protect } from "../middlewares/auth.js";
-    import { validate } from "../middlewares/validator.js";
-    import { createBillingRun, previewBillingRun, getBillingRun } from "../controllers/billingRunController.js";
-    import { billingRunSchema } from "../validations/billingRunValidation.js";
-
-    const router = express.Router();
-    router.use(protect);
-
-    router.post("/", validate(billingRunSchema), createBillingRun);
-    router.post("/preview", validate(billingRunSchema), previewBillingRun);
-    router.get("/:id", getBillingRun);
-
-    export default router;
-''')
-
-# Reports
-files["reports.js"] = dedent('''\
-    // Auto-generated by routeGen.py — reports routes
-    import express from "express";
-    import { protect } from "../middlewares/auth.js";
-    import { arrearsReport, occupancyRateReport, revenueReport } from "../controllers/reportController.js";
-
-    const router = express.Router();
-    router.use(protect);
-
-    router.get("/arrears", arrearsReport);                 // ?pgId=&asOf=YYYY-MM-DD
-    router.get("/occupancy-rate", occupancyRateReport);    // ?pgId=&from=&to=
-    router.get("/revenue", revenueReport);                 // ?pgId=&from=&to=&groupBy=month|pg|room
-
-    export default router;
-''')
-
-# Dashboards
-files["dashboards.js"] = dedent('''\
-    // Auto-generated by routeGen.py — dashboards routes
     import express from "express";
-    import { protect } from "../middlewares/auth.js";
-    import { tenantDashboard } from "../controllers/dashboardController.js";
-
-    const router = express.Router();
-    router.use(protect);
+    import apiRoutes from "./routes/index.js";
 
-    router.get("/tenant/:tenantId", tenantDashboard);
+    const app = express();
+    app.use("/api/v1", apiRoutes);
+""")
 
-    export default router;
-''')
-
-# Search (can be protected or public; we protect)
-files["search.js"] = dedent('''\
-    // Auto-generated by routeGen.py — search routes
-    import express from "express";
-    import { protect } from "../middlewares/auth.js";
-    import { globalSearch } from "../controllers/searchController.js";
+def make_readme(spec) -> str:
+    controllers = "\n".join(f"  - {res.controller_file}" for res in spec.resources)
+    validations = "\n".join(f"  - {module}.js" for module in spec.validation_modules())
+    middlewares = ["auth.js", "validator.js"]
+    if any(res.features.get("idempotent") for res in spec.resources):
+        middlewares.append("idempotency.js")
+    middlewares = "\n".join(f"  - {name}" for name in middlewares)
+    return README.render(controllers=controllers, middlewares=middlewares, validations=validations)
 
-    const router = express.Router();
-    router.use(protect);
-
-    router.get("/", globalSearch); // /search?q=...
-
-    export default router;
-''')
+# ------------ Files to generate
 
-# index.js that mounts everything under /api/v1
-files["index.js"] = dedent('''\
-    // Auto-generated by routeGen.py — routes index
-    import express from "express";
+def build_registry(spec):
+    """One lazily rendered router per resource, plus index.js and the README."""
+    reg = Registry("genRoutes", BASE, GENERATOR_VERSION, source=Path(__file__))
+    for res in spec.resources:
+        reg.add(res.route_file, lambda res=res: make_router(res), key=repr(res))
+    reg.add("index.js", lambda: make_index(spec), key=spec.digest)
+    reg.add("ROUTES_README.md", lambda: make_readme(spec), key=spec.digest)
+    return reg
 
-    import authRoutes from "./auth.js";
-    import pgRoutes from "./pgs.js";
-    import roomRoutes from "./rooms.js";
-    import bedRoutes from "./beds.js";
-    import tenantRoutes from "./tenants.js";
-    import occupancyRoutes from "./occupancies.js";
-    import billRoutes from "./bills.js";
-    import transactionRoutes from "./transactions.js";
-    import documentRoutes from "./documents.js";
-    import tenantDocumentRoutes from "./tenantDocuments.js";
-    import billingRunRoutes from "./billingRuns.js";
-    import reportRoutes from "./reports.js";
-    import dashboardRoutes from "./dashboards.js";
-    import searchRoutes from "./search.js";
-
-    const router = express.Router();
-
-    // Public-ish
-    router.use("/auth", authRoutes);
-
-    // Protected groups (each subrouter handles protect)
-    router.use("/pgs", pgRoutes);
-    router.use("/rooms", roomRoutes);
-    router.use("/beds", bedRoutes);
-    router.use("/tenants", tenantRoutes);
-    router.use("/occupancies", occupancyRoutes);
-    router.use("/bills", billRoutes);
-    router.use("/transactions", transactionRoutes);
-    router.use("/documents", documentRoutes);
-    router.use("/tenant-documents", tenantDocumentRoutes);
-    router.use("/billing/runs", billingRunRoutes);
-    router.use("/reports", reportRoutes);
-    router.use("/dashboards", dashboardRoutes);
-    router.use("/search", searchRoutes);
-
-    export default router;
-''')
+# Files are rendered lazily, only when selected (see `--only`).
+REGISTRY = build_registry(load_spec())
 
 # ------------ Write all files
 
-def main():
-    BASE.mkdir(parents=True, exist_ok=True)
-    for fname, content in files.items():
-        write_file(BASE / fname, content)
-
-    # small README note
-    readme = dedent('''\
-        # Generated routes
-
-        These files were generated by `routeGen.py`. They assume you have the following folders:
-
-        - controllers/
-          - authController.js
-          - pgController.js
-          - roomController.js
-          - bedController.js
-          - tenantController.js
-          - occupancyController.js
-          - billController.js
-          - transactionController.js
-          - documentController.js
-          - tenantDocumentController.js
-          - billingRunController.js
-          - reportController.js
-          - dashboardController.js
-          - searchController.js
-        - middlewares/
-          - auth.js
-          - validator.js
-        - validations/
-          - authValidation.js
-          - pgValidation.js
-          - roomValidation.js
-          - bedValidation.js
-          - tenantValidation.js
-          - occupancyValidation.js
-          - billValidation.js
-          - transactionValidation.js
-          - documentValidation.js
-          - tenantDocumentValidation.js
-          - billingRunValidation.js
-
-        Mount from your main server file:
-
-        import express from "express";
-        import apiRoutes from "./routes/index.js";
-
-        const app = express();
-        app.use("/api/v1", apiRoutes);
-    ''')
-    write_file(BASE / "ROUTES_README.md", readme)
+def main(argv=None):
+    return cli.main([REGISTRY], "Generate Express route files.", argv)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
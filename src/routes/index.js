@@ -1,4 +1,4 @@
-// Auto-generated by routeGen.py — routes index
+// Auto-generated by genRoutes.py — routes index
 import express from "express";
 
 import authRoutes from "./auth.js";
@@ -1,23 +1,23 @@
-// Auto-generated by routeGen.py — pgs routes
+// Auto-generated by genRoutes.py — pgs routes
 // Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
 import { validate } from "../middlewares/validator.js";
 
-import { getPgcontrollers, createPgcontroller, getPgcontroller, updatePgcontroller, deletePgcontroller } from "../controllers/pgController.js";
-import { getRoomsByPg, createRoomForPg } from "../controllers/roomController.js";
-import { createRoomSchema } from "../validations/roomValidation.js";
+import { getPgs, getPg, createPg, updatePg, deletePg, getRoomsByPg, createRoomForPg } from "../controllers/pgController.js";
 import { createPgSchema } from "../validations/pgValidation.js";
+import { createRoomSchema } from "../validations/roomValidation.js";
 
 const router = express.Router();
 // 🔒 Protect all routes below
 router.use(protect);
 
-router.route("/").get(getPgcontrollers)
-  .post(validate(createPgSchema), createPgcontroller);
+router.route("/").get(getPgs)
+  .post(validate(createPgSchema), createPg);
 
-router.route("/:id").get(getPgcontroller).patch(updatePgcontroller).delete(deletePgcontroller);
+router.route("/:id").get(getPg).patch(updatePg).delete(deletePg);
 
 router.get("/:pgId/rooms", getRoomsByPg);
 router.post("/:pgId/rooms", validate(createRoomSchema), createRoomForPg);
+
 export default router;
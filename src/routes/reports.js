@@ -1,13 +1,16 @@
-// Auto-generated by routeGen.py — reports routes
+// Auto-generated by genRoutes.py — reports routes
+// Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
+
 import { arrearsReport, occupancyRateReport, revenueReport } from "../controllers/reportController.js";
 
 const router = express.Router();
+// 🔒 Protect all routes below
 router.use(protect);
 
-router.get("/arrears", arrearsReport);                 // ?pgId=&asOf=YYYY-MM-DD
-router.get("/occupancy-rate", occupancyRateReport);    // ?pgId=&from=&to=
-router.get("/revenue", revenueReport);                 // ?pgId=&from=&to=&groupBy=month|pg|room
+router.get("/arrears", arrearsReport); // ?pgId=&asOf=YYYY-MM-DD
+router.get("/occupancy-rate", occupancyRateReport); // ?pgId=&from=&to=&groupBy=day|week|month
+router.get("/revenue", revenueReport); // ?pgId=&from=&to=&groupBy=month|pg|room
 
 export default router;
@@ -1,9 +1,12 @@
-// Auto-generated by routeGen.py — search routes
+// Auto-generated by genRoutes.py — search routes
+// Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
+
 import { globalSearch } from "../controllers/searchController.js";
 
 const router = express.Router();
+// 🔒 Protect all routes below
 router.use(protect);
 
 router.get("/", globalSearch); // /search?q=...
@@ -1,19 +1,24 @@
-// Auto-generated by routeGen.py — transactions routes
+// Auto-generated by genRoutes.py — transactions routes
 // Feel free to edit as needed.
 import express from "express";
 import { protect } from "../middlewares/auth.js";
 import { validate } from "../middlewares/validator.js";
+import { idempotent } from "../middlewares/idempotency.js";
 
-import { getTransactioncontrollers, createTransactioncontroller, getTransactioncontroller, updateTransactioncontroller, deleteTransactioncontroller } from "../controllers/transactionController.js";
+import { getTransactions, getTransaction, createTransaction, updateTransaction, deleteTransaction, exportTransactions, importTransactions } from "../controllers/transactionController.js";
 import { createTransactionSchema } from "../validations/transactionValidation.js";
 
 const router = express.Router();
 // 🔒 Protect all routes below
 router.use(protect);
 
-router.route("/").get(getTransactioncontrollers)
-  .post(validate(createTransactionSchema), createTransactioncontroller);
+router.route("/").get(getTransactions)
+  .post(validate(createTransactionSchema), idempotent("transactions"), createTransaction);
 
-router.route("/:id").get(getTransactioncontroller).patch(updateTransactioncontroller).delete(deleteTransactioncontroller);
+router.get("/export", exportTransactions);
+
+router.route("/:id").get(getTransaction).patch(updateTransaction).delete(deleteTransaction);
+
+router.post("/import", importTransactions); // body: statement CSV (text/csv)
 
 export default router;
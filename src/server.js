@@ -2,13 +2,22 @@ import dotenv from "dotenv";
 import app from "./app.js";
 import connectDB from "./config/database.js";
 import logger from "./config/logger.js";
+import { startBillingWorker, stopBillingWorker } from "./services/billingRunService.js";
+import { startReconcileSchedule, stopReconcileSchedule } from "./services/paymentService.js";
+import { startArrearsSchedule, stopArrearsSchedule } from "./services/arrearsService.js";
 
 dotenv.config();
 
 const PORT = process.env.PORT || 5000;
 
-// Connect to database
-connectDB();
+// Connect to database, then pick up billing runs left unfinished by a previous process
+// and start the periodic payment reconciliation (RECONCILE_INTERVAL_MINUTES, 0 = off)
+// and arrears rebuild (ARREARS_REBUILD_MINUTES, 0 = off)
+connectDB().then(() => {
+  startBillingWorker();
+  startReconcileSchedule();
+  startArrearsSchedule();
+});
 
 // Start server
 const server = app.listen(PORT, () => {
@@ -30,4 +39,8 @@ process.on("SIGTERM", () => {
   server.close(() => {
     logger.info("HTTP server closed");
   });
+  stopReconcileSchedule();
+  stopArrearsSchedule();
+  // Release running billing runs after their current chunk so the next process resumes them
+  stopBillingWorker().then(() => logger.info("Billing runs released"));
 });
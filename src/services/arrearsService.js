@@ -0,0 +1,90 @@
+// Materialized arrears (models/Arrear.js).
+//
+//   syncArrears      re-derive the rows of some bills after they were written:
+//                    one aggregation over those bills, $merge into arrears
+//   rebuildArrears   the same over every open bill, on a schedule, so rows
+//                    missed by a failed sync or a direct database edit heal
+//
+// Every row is stamped with the syncedAt of the sync that wrote it, and a
+// $merge only replaces a row with a newer stamp: when two syncs of a bill
+// overlap, the one that read it first cannot land its older balance last.
+// For the same reason a sync does not delete the row of a bill it finds
+// settled; it writes it with balance 0 (the report skips those), and the
+// next rebuild drops every row it did not write. Paid amounts come from
+// Bill.paid / balance, kept current by paymentService.js.
+import Arrear from "../models/Arrear.js";
+import Bed from "../models/Bed.js";
+import Bill from "../models/Bill.js";
+import Room from "../models/Room.js";
+import logger from "../config/logger.js";
+
+// keep whichever of the stored row and the incoming one was synced last
+const NEWER_WINS = [{ $replaceWith: { $cond: [{ $gte: ["$$new.syncedAt", "$syncedAt"] }, "$$new", "$$ROOT"] } }];
+
+// Bills matching `match`, with the room and PG of their bed, merged into the
+// arrears collection.
+const mergeArrears = (match, syncedAt) =>
+  Bill.aggregate([
+    { $match: match },
+    { $lookup: { from: Bed.collection.name, localField: "bedId", foreignField: "_id", as: "bed" } },
+    { $lookup: { from: Room.collection.name, localField: "bed.roomId", foreignField: "_id", as: "room" } },
+    {
+      $project: {
+        tenantId: 1,
+        occupancyId: 1,
+        bedId: 1,
+        roomId: { $arrayElemAt: ["$bed.roomId", 0] },
+        pgId: { $arrayElemAt: ["$room.pgId", 0] },
+        period_start: 1,
+        period_end: 1,
+        amount: 1,
+        paid: 1,
+        balance: { $max: ["$balance", 0] },
+        status: 1,
+        syncedAt: { $literal: syncedAt }
+      }
+    },
+    { $merge: { into: Arrear.collection.name, on: "_id", whenMatched: NEWER_WINS, whenNotMatched: "insert" } }
+  ]);
+
+// Bring the arrears rows of `billIds` in line with the bills. Rows the merge
+// did not reach belong to bills that were deleted.
+export const syncArrears = async (billIds) => {
+  const ids = billIds.filter(Boolean);
+  if (!ids.length) return;
+  const syncedAt = new Date();
+  await mergeArrears({ _id: { $in: ids } }, syncedAt);
+  await Arrear.deleteMany({ _id: { $in: ids }, syncedAt: { $lt: syncedAt } });
+};
+
+export const rebuildArrears = async () => {
+  const syncedAt = new Date();
+  await mergeArrears({ balance: { $gt: 0 } }, syncedAt);
+  const { deletedCount } = await Arrear.deleteMany({ syncedAt: { $lt: syncedAt } });
+  return { rows: await Arrear.estimatedDocumentCount(), removed: deletedCount };
+};
+
+// ---------- schedule
+
+let timer = null;
+
+export const startArrearsSchedule = ({ everyMinutes = Number(process.env.ARREARS_REBUILD_MINUTES ?? 360) } = {}) => {
+  if (!everyMinutes) return;
+  const tick = async () => {
+    try {
+      const started = Date.now();
+      const { rows, removed } = await rebuildArrears();
+      logger.info(`arrears rebuilt: ${rows} open bills, ${removed} stale rows removed (${Date.now() - started} ms)`);
+    } catch (err) {
+      logger.error(`arrears rebuild failed: ${err.message}`);
+    }
+  };
+  timer = setInterval(tick, everyMinutes * 60 * 1000);
+  timer.unref();
+  tick();
+};
+
+export const stopArrearsSchedule = () => {
+  clearInterval(timer);
+  timer = null;
+};
@@ -0,0 +1,162 @@
+// Persistent billing runs, executed in the background.
+//
+// POST /billing/runs stores a BillingRun and returns 202; the run is then
+// billed chunk by chunk (billingService.js), each chunk followed by one
+// update that moves the checkpoint (lastOccupancyId) and the counters.
+//
+// A run is leased by the process working on it (owner + heartbeatAt). If that
+// process dies or is redeployed, the sweep in every process picks the run up
+// once the lease expires — or at once after a graceful stop, which releases
+// it — and continues after the checkpoint. The chunk that was cut short may
+// have been partly written; those bills carry the run's id, so they are
+// counted instead of inserted again and no bill is ever duplicated.
+import os from "os";
+import BillingRun from "../models/BillingRun.js";
+import Bill from "../models/Bill.js";
+import logger from "../config/logger.js";
+import { MAX_ERRORS, billable, findConflicts, insertChunk, planBills, resolvePeriod } from "./billingService.js";
+
+const INSTANCE = `${os.hostname()}:${process.pid}`;
+const LEASE_MS = 2 * 60 * 1000;   // a run not heartbeating for this long is taken over
+const SWEEP_MS = 60 * 1000;
+
+const active = new Set();         // run ids executing in this process
+let stopping = false;
+let sweeper = null;
+
+export const startBillingRun = async (params) => {
+  const { start, end } = resolvePeriod(params);
+  const run = await BillingRun.create({
+    month: params.month,
+    period_start: start,
+    period_end: end,
+    pgId: params.pgId || null
+  });
+  setImmediate(() => executeRun(run._id));
+  return run.toObject();
+};
+
+// Lease the run: queued or released runs, our own, or ones whose owner went quiet.
+const claim = (id) =>
+  BillingRun.findOneAndUpdate(
+    {
+      _id: id,
+      status: { $in: ["queued", "running"] },
+      $or: [{ owner: null }, { owner: INSTANCE }, { heartbeatAt: { $lt: new Date(Date.now() - LEASE_MS) } }]
+    },
+    { $set: { status: "running", owner: INSTANCE, heartbeatAt: new Date() } },
+    { new: true }
+  ).lean();
+
+const release = (id) =>
+  BillingRun.updateOne({ _id: id, owner: INSTANCE }, { $set: { owner: null, heartbeatAt: null } });
+
+// Occupancies of `items` this run already billed before it was interrupted.
+const alreadyBilled = async (runId, items) => {
+  const bills = await Bill.find(
+    { billingRunId: runId, occupancyId: { $in: items.map((item) => item.occupancyId) } },
+    { occupancyId: 1 }
+  ).lean();
+  return new Set(bills.map((bill) => String(bill.occupancyId)));
+};
+
+const processRun = async (run) => {
+  const period = { start: run.period_start, end: run.period_end };
+  const resuming = run.startedAt !== null;
+  const items = await planBills(period, { pgId: run.pgId, after: run.lastOccupancyId });
+  if (!resuming) {
+    await BillingRun.updateOne({ _id: run._id }, { $set: { total: items.length, startedAt: new Date() } });
+  }
+
+  for (let i = 0; i < items.length; i += run.chunkSize) {
+    if (stopping) return release(run._id);
+    const chunk = items.slice(i, i + run.chunkSize);
+    const done = i === 0 && resuming ? await alreadyBilled(run._id, chunk) : new Set();
+    const todo = done.size ? chunk.filter((item) => !done.has(String(item.occupancyId))) : chunk;
+    const conflicts = await findConflicts(todo, { excludeRun: run._id });
+    const { docs, skipped } = billable(todo, conflicts, run._id);
+    const result = await insertChunk(docs);
+
+    const saved = await BillingRun.updateOne(
+      { _id: run._id, owner: INSTANCE },
+      {
+        $set: { lastOccupancyId: chunk[chunk.length - 1].occupancyId, heartbeatAt: new Date() },
+        $inc: {
+          chunksDone: 1,
+          created: result.created + done.size,
+          "skipped.duplicate": result.duplicates,
+          "skipped.conflict": skipped.conflict,
+          "skipped.zeroAmount": skipped.zeroAmount,
+          failed: result.failed
+        },
+        $push: { writeErrors: { $each: result.errors, $slice: MAX_ERRORS } }
+      }
+    );
+    if (!saved.matchedCount) {
+      logger.warn(`billing run ${run._id}: lease lost, stopping`);
+      return undefined;
+    }
+  }
+
+  return BillingRun.updateOne(
+    { _id: run._id, owner: INSTANCE },
+    { $set: { status: "done", finishedAt: new Date(), owner: null, heartbeatAt: null } }
+  );
+};
+
+// Runs (or resumes) one billing run; never rejects.
+export const executeRun = async (id) => {
+  const key = String(id);
+  if (stopping || active.has(key)) return;
+  active.add(key);
+  try {
+    const run = await claim(id);
+    if (run) await processRun(run);
+  } catch (err) {
+    logger.error(`billing run ${key} failed: ${err.message}`);
+    await BillingRun.updateOne(
+      { _id: id, owner: INSTANCE },
+      { $set: { status: "failed", lastError: err.message, finishedAt: new Date(), owner: null, heartbeatAt: null } }
+    ).catch(() => {});
+  } finally {
+    active.delete(key);
+  }
+};
+
+// Unfinished runs nobody holds a live lease on.
+export const resumeBillingRuns = async () => {
+  const runs = await BillingRun.find(
+    {
+      status: { $in: ["queued", "running"] },
+      $or: [{ heartbeatAt: null }, { heartbeatAt: { $lt: new Date(Date.now() - LEASE_MS) } }]
+    },
+    { _id: 1 }
+  ).lean();
+  for (const run of runs) await executeRun(run._id);
+};
+
+export const startBillingWorker = () => {
+  stopping = false;
+  const sweep = () =>
+    resumeBillingRuns().catch((err) => logger.error(`billing run sweep failed: ${err.message}`));
+  sweep();
+  sweeper = setInterval(sweep, SWEEP_MS);
+  sweeper.unref();
+};
+
+// Stop after the current chunk of every active run and release their leases,
+// so the next process resumes them without waiting for the lease to expire.
+export const stopBillingWorker = async () => {
+  stopping = true;
+  clearInterval(sweeper);
+  while (active.size) await new Promise((resolve) => setTimeout(resolve, 100));
+};
+
+export const withProgress = (run) => {
+  const skipped = run.skipped.duplicate + run.skipped.conflict + run.skipped.zeroAmount;
+  const processed = run.created + skipped + run.failed;
+  let percent = 0;
+  if (run.status === "done") percent = 100;
+  else if (run.total) percent = Math.min(99, Math.floor((processed / run.total) * 100));
+  return { ...run, progress: { processed, total: run.total, percent } };
+};
@@ -0,0 +1,318 @@
+// Bulk billing: one bill per occupancy for a billing period.
+//
+//   planBills    one aggregation over Occupancy joined with Bed (defaultCost)
+//                and Room (PG scope); proration happens in memory
+//   findConflicts  existing bills overlapping the period, in one $in query
+//   previewBilling  the above without writes, totalled per PG and room
+//   repriceBills  re-price existing bills from current bed costs
+//   insertChunk  unordered insertMany of one chunk; duplicate-key hits on
+//                the unique { tenantId, bedId, period_start, period_end } index
+//                are counted as skipped, so a run can safely be repeated.
+//                New bills are then synced into arrears (arrearsService.js)
+//
+// Periods are half-open [start, end) in UTC; a month "2025-03" is
+// [2025-03-01, 2025-04-01). Bills are written through the collection, so the
+// per-document pre('validate') / pre('save') round trips are replaced by the
+// checks above: every bill lies inside its occupancy by construction, and
+// overlaps with existing bills are found up front.
+//
+// Runs are persisted and executed in the background by billingRunService.js.
+import mongoose from "mongoose";
+import Bill, { settleStage } from "../models/Bill.js";
+import Bed from "../models/Bed.js";
+import Occupancy from "../models/Occupancy.js";
+import Room from "../models/Room.js";
+import { syncArrears } from "./arrearsService.js";
+
+const MS_DAY = 24 * 60 * 60 * 1000;
+export const BILL_CHUNK = 500;
+export const MAX_ERRORS = 20;
+
+const round2 = (n) => Math.round(n * 100) / 100;
+
+export const resolvePeriod = ({ month, period_start, period_end }) => {
+  if (month) {
+    const [year, mon] = month.split("-").map(Number);
+    return { start: new Date(Date.UTC(year, mon - 1, 1)), end: new Date(Date.UTC(year, mon, 1)) };
+  }
+  return { start: new Date(period_start), end: new Date(period_end) };
+};
+
+// Monthly cost spread over [from, to): each calendar month contributes
+// cost * days / daysInThatMonth, so windows crossing a month end are priced
+// by the length of each month they touch.
+export const prorate = (monthlyCost, from, to) => {
+  const parts = [];
+  let total = 0;
+  for (let day = new Date(from); day < to; ) {
+    const monthStart = Date.UTC(day.getUTCFullYear(), day.getUTCMonth(), 1);
+    const next = new Date(Date.UTC(day.getUTCFullYear(), day.getUTCMonth() + 1, 1));
+    const until = to < next ? to : next;
+    const days = Math.ceil((until - day) / MS_DAY);
+    const daysInMonth = Math.round((next - monthStart) / MS_DAY);
+    const amount = (monthlyCost * days) / daysInMonth;
+    parts.push({ month: new Date(monthStart).toISOString().slice(0, 7), days, daysInMonth, amount: round2(amount) });
+    total += amount;
+    day = until;
+  }
+  return { amount: round2(total), parts };
+};
+
+// Occupancies active at some point in the period (on-hold ones are not
+// billed), in _id order so a run can be cut into stable chunks and resumed
+// after the last occupancy it billed (`after`).
+const billablesPipeline = ({ start, end }, pgId, after) => [
+  {
+    $match: {
+      ...(after ? { _id: { $gt: after } } : {}),
+      status: { $ne: "on_hold" },
+      start_date: { $lt: end },
+      $or: [{ end_date: null }, { end_date: { $gt: start } }]
+    }
+  },
+  { $sort: { _id: 1 } },
+  {
+    $lookup: {
+      from: Bed.collection.name,
+      localField: "bedId",
+      foreignField: "_id",
+      pipeline: [{ $project: { roomId: 1, bedNo: 1, defaultCost: 1 } }],
+      as: "bed"
+    }
+  },
+  { $unwind: "$bed" },
+  {
+    $lookup: {
+      from: Room.collection.name,
+      localField: "bed.roomId",
+      foreignField: "_id",
+      pipeline: [{ $project: { pgId: 1, no: 1 } }],
+      as: "room"
+    }
+  },
+  { $unwind: "$room" },
+  ...(pgId ? [{ $match: { "room.pgId": new mongoose.Types.ObjectId(pgId) } }] : []),
+  {
+    $project: {
+      tenantId: 1,
+      bedId: 1,
+      start_date: 1,
+      end_date: 1,
+      bedNo: "$bed.bedNo",
+      defaultCost: "$bed.defaultCost",
+      roomId: "$room._id",
+      roomNo: "$room.no",
+      pgId: "$room.pgId"
+    }
+  }
+];
+
+// The bills a run for `period` would create, one per occupancy: the
+// occupancy clipped to the period, priced from the bed's defaultCost.
+export const planBills = async (period, { pgId, after } = {}) => {
+  const rows = await Occupancy.aggregate(billablesPipeline(period, pgId, after));
+  return rows.map((row) => {
+    const from = row.start_date > period.start ? row.start_date : period.start;
+    const to = row.end_date && row.end_date < period.end ? row.end_date : period.end;
+    const monthlyCost = row.defaultCost || 0;
+    const { amount, parts } = prorate(monthlyCost, from, to);
+    return {
+      occupancyId: row._id,
+      tenantId: row.tenantId,
+      bedId: row.bedId,
+      roomId: row.roomId,
+      pgId: row.pgId,
+      roomNo: row.roomNo,
+      bedNo: row.bedNo,
+      period_start: from,
+      period_end: to,
+      monthlyCost,
+      amount,
+      proration: parts
+    };
+  });
+};
+
+// Existing bills of these occupancies overlapping their planned periods,
+// keyed by occupancyId (one query, see Bill.findOverlapping). Bills of
+// `excludeRun` (the run asking) are not conflicts.
+export const findConflicts = (items, { excludeRun } = {}) => Bill.findOverlapping(items, { excludeRun });
+
+export const toBillDoc = (item, now = new Date(), runId) => ({
+  bedId: item.bedId,
+  tenantId: item.tenantId,
+  occupancyId: item.occupancyId,
+  period_start: item.period_start,
+  period_end: item.period_end,
+  amount: item.amount,
+  paid: 0,
+  balance: item.amount,
+  status: "pending",
+  ...(runId ? { billingRunId: runId } : {}),
+  createdAt: now,
+  updatedAt: now
+});
+
+// One unordered insertMany. Duplicate keys mean the bill already exists
+// (a repeated or resumed run); any other write error is reported as failed.
+const insertDocs = async (docs) => {
+  if (!docs.length) return { created: 0, duplicates: 0, failed: 0, errors: [] };
+  try {
+    const result = await Bill.collection.insertMany(docs, { ordered: false });
+    return { created: result.insertedCount, duplicates: 0, failed: 0, errors: [] };
+  } catch (err) {
+    if (!err.writeErrors) throw err;
+    const writeErrors = [].concat(err.writeErrors);
+    const errors = writeErrors.filter((e) => e.code !== 11000);
+    return {
+      created: err.insertedCount ?? err.result?.insertedCount ?? 0,
+      duplicates: writeErrors.length - errors.length,
+      failed: errors.length,
+      errors: errors.slice(0, MAX_ERRORS).map((e) => ({ code: e.code, message: e.errmsg }))
+    };
+  }
+};
+
+// The driver assigns each doc its _id before sending, so duplicates and
+// failures are in `docs` too; syncArrears ignores ids with no bill.
+export const insertChunk = async (docs) => {
+  const result = await insertDocs(docs);
+  if (result.created) await syncArrears(docs.map((doc) => doc._id));
+  return result;
+};
+
+// Why an item is not billed: it overlaps an existing bill of the same
+// occupancy, or it is zero-priced. null = bill it.
+const skipReason = (item, conflicts) => {
+  if (conflicts.has(String(item.occupancyId))) return "conflict";
+  if (item.amount <= 0) return "zeroAmount";
+  return null;
+};
+
+// Bill documents for the items that should be written.
+export const billable = (items, conflicts, runId) => {
+  const docs = [];
+  const skipped = { conflict: 0, zeroAmount: 0 };
+  const now = new Date();
+  for (const item of items) {
+    const reason = skipReason(item, conflicts);
+    if (reason) skipped[reason] += 1;
+    else docs.push(toBillDoc(item, now, runId));
+  }
+  return { docs, skipped };
+};
+
+// What a run with `params` would do, without writing anything: the same
+// plan and conflict query as the run, totalled per PG and room.
+export const previewBilling = async (params) => {
+  const period = resolvePeriod(params);
+  const items = await planBills(period, { pgId: params.pgId });
+  const conflicts = await findConflicts(items);
+
+  const summary = { occupancies: items.length, bills: 0, amount: 0, conflicts: 0, zeroAmount: 0 };
+  const pgs = new Map();
+  const wouldCreate = [];
+  const conflicting = [];
+  for (const item of items) {
+    const reason = skipReason(item, conflicts);
+    if (reason === "conflict") {
+      summary.conflicts += 1;
+      conflicting.push({ ...item, existing: conflicts.get(String(item.occupancyId)) });
+      continue;
+    }
+    if (reason) {
+      summary.zeroAmount += 1;
+      continue;
+    }
+    wouldCreate.push(item);
+    summary.bills += 1;
+    summary.amount += item.amount;
+
+    const pgKey = String(item.pgId);
+    if (!pgs.has(pgKey)) pgs.set(pgKey, { pgId: item.pgId, bills: 0, amount: 0, rooms: new Map() });
+    const pg = pgs.get(pgKey);
+    const roomKey = String(item.roomId);
+    if (!pg.rooms.has(roomKey)) pg.rooms.set(roomKey, { roomId: item.roomId, roomNo: item.roomNo, bills: 0, amount: 0 });
+    const room = pg.rooms.get(roomKey);
+    pg.bills += 1;
+    pg.amount += item.amount;
+    room.bills += 1;
+    room.amount += item.amount;
+  }
+
+  summary.amount = round2(summary.amount);
+  const byPg = [...pgs.values()].map((pg) => ({
+    ...pg,
+    amount: round2(pg.amount),
+    rooms: [...pg.rooms.values()].map((room) => ({ ...room, amount: round2(room.amount) }))
+  }));
+  return { period, pgId: params.pgId || null, summary, byPg, wouldCreate, conflicts: conflicting };
+};
+
+// Re-price existing bills from their beds' current defaultCost, e.g. after a
+// rent revision. Scope: bills overlapping a period and/or of one PG or some
+// beds; paid bills are left alone unless includePaid. `defaultCost` first sets
+// that cost on every bed in scope, so a revision is a single call; it needs a
+// PG or beds, so it can never rewrite every bed.
+//
+// Bed costs are read in one query, bills are streamed, and only bills whose
+// amount changes are written, with balance and status re-derived in the same
+// update (chunked bulkWrite).
+export const repriceBills = async (params, { chunkSize = BILL_CHUNK } = {}) => {
+  const { pgId, bedIds, defaultCost, includePaid = false, dryRun = false } = params;
+  if (defaultCost !== undefined && !pgId && !bedIds?.length) {
+    throw Object.assign(new Error("defaultCost needs a pgId or bedIds"), { statusCode: 400 });
+  }
+  let bedFilter = {};
+  if (pgId) {
+    const rooms = await Room.find({ pgId }, { _id: 1 }).lean();
+    bedFilter = { roomId: { $in: rooms.map((room) => room._id) } };
+  }
+  if (bedIds) bedFilter = { ...bedFilter, _id: { $in: bedIds } };
+  const scoped = Boolean(pgId || bedIds);
+  if (defaultCost !== undefined && !dryRun) {
+    await Bed.updateMany(bedFilter, { $set: { defaultCost } });
+  }
+  const beds = await Bed.find(bedFilter, { defaultCost: 1 }).lean();
+  const costs = new Map(
+    beds.map((bed) => [String(bed._id), defaultCost !== undefined ? defaultCost : bed.defaultCost || 0])
+  );
+
+  const filter = {};
+  if (scoped) filter.bedId = { $in: beds.map((bed) => bed._id) };
+  if (params.month || params.period_start) {
+    const period = resolvePeriod(params);
+    filter.period_start = { $lt: period.end };
+    filter.period_end = { $gt: period.start };
+  }
+  if (!includePaid) filter.status = { $ne: "paid" };
+
+  const stats = { scanned: 0, changed: 0, missingBed: 0, amountDelta: 0 };
+  let ops = [];
+  const flush = async () => {
+    if (ops.length && !dryRun) {
+      await Bill.bulkWrite(ops, { ordered: false });
+      await syncArrears(ops.map((op) => op.updateOne.filter._id));
+    }
+    ops = [];
+  };
+  const cursor = Bill.find(filter, { bedId: 1, period_start: 1, period_end: 1, amount: 1 })
+    .lean()
+    .cursor({ batchSize: chunkSize });
+  for await (const bill of cursor) {
+    stats.scanned += 1;
+    const cost = costs.get(String(bill.bedId));
+    if (cost === undefined) {
+      stats.missingBed += 1;
+      continue;
+    }
+    const { amount } = prorate(cost, bill.period_start, bill.period_end);
+    if (amount === bill.amount) continue;
+    stats.changed += 1;
+    stats.amountDelta = round2(stats.amountDelta + amount - bill.amount);
+    ops.push({ updateOne: { filter: { _id: bill._id }, update: [{ $set: { amount } }, settleStage] } });
+    if (ops.length >= chunkSize) await flush();
+  }
+  await flush();
+  return { dryRun, beds: beds.length, ...stats };
+};
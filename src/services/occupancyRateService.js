@@ -0,0 +1,167 @@
+// Occupancy rate: occupied bed-days / available bed-days per day, week or
+// month of a date range.
+//
+//   capacity   beds of the PG whose room is not in maintenance (two small
+//              queries); available bed-days = beds * days in the bucket
+//   occupied   the occupancies of those beds overlapping the range, streamed
+//              in start_date order through one sweep-line pass: each start
+//              opens an interval, a min-heap of end times closes them, and
+//              the number of open intervals is integrated over time into the
+//              current bucket as the sweep moves forward
+//
+// Memory is the buckets plus the intervals open at one instant (at most one
+// per bed); time is O(n log beds + buckets) for n occupancies, with no query
+// per day. On-hold occupancies are not counted as occupied, as they are not
+// billed either. Capacity is today's: beds added or rooms taken into
+// maintenance during the range count for the whole of it.
+import Bed from "../models/Bed.js";
+import Occupancy from "../models/Occupancy.js";
+import Room from "../models/Room.js";
+
+const MS_DAY = 24 * 60 * 60 * 1000;
+export const GROUP_BY = ["day", "week", "month"];
+export const MAX_BUCKETS = 1000;
+
+const round2 = (n) => Math.round(n * 100) / 100;
+
+// Start of the bucket after the one starting at `t` (UTC; weeks start on Monday).
+const nextBucket = (t, groupBy) => {
+  const d = new Date(t);
+  if (groupBy === "day") return t + MS_DAY;
+  if (groupBy === "week") return Date.UTC(d.getUTCFullYear(), d.getUTCMonth(), d.getUTCDate() + 7 - ((d.getUTCDay() + 6) % 7));
+  return Date.UTC(d.getUTCFullYear(), d.getUTCMonth() + 1, 1);
+};
+
+// [start, end) buckets covering [from, to); the first and last are clipped to the range.
+export const makeBuckets = (from, to, groupBy) => {
+  const buckets = [];
+  for (let start = from; start < to; start = buckets[buckets.length - 1].end) {
+    if (buckets.length === MAX_BUCKETS) return null;
+    buckets.push({ start, end: Math.min(nextBucket(start, groupBy), to), occupiedMs: 0 });
+  }
+  return buckets;
+};
+
+// Binary min-heap of end times, in a plain array.
+const heapPush = (heap, value) => {
+  let i = heap.push(value) - 1;
+  while (i > 0) {
+    const parent = (i - 1) >> 1;
+    if (heap[parent] <= value) break;
+    heap[i] = heap[parent];
+    i = parent;
+  }
+  heap[i] = value;
+};
+
+const heapPop = (heap) => {
+  const top = heap[0];
+  const last = heap.pop();
+  if (heap.length) {
+    let i = 0;
+    for (;;) {
+      let child = 2 * i + 1;
+      if (child >= heap.length) break;
+      if (child + 1 < heap.length && heap[child + 1] < heap[child]) child += 1;
+      if (heap[child] >= last) break;
+      heap[i] = heap[child];
+      i = child;
+    }
+    heap[i] = last;
+  }
+  return top;
+};
+
+// Occupied time per bucket from intervals arriving in start order.
+// `intervals` yields { start_date, end_date } (end_date null = still occupied).
+export const sweepOccupancy = async (intervals, buckets) => {
+  const from = buckets[0].start;
+  const to = buckets[buckets.length - 1].end;
+  const ends = [];
+  let open = 0;
+  let at = from;
+  let b = 0;
+
+  // add `open` intervals x [at, until) to the buckets it spans
+  const integrate = (until) => {
+    while (at < until) {
+      const stop = Math.min(until, buckets[b].end);
+      buckets[b].occupiedMs += open * (stop - at);
+      if (stop === buckets[b].end) b += 1;
+      at = stop;
+    }
+  };
+  // move the sweep to `t`, closing every interval that ends on the way
+  const advance = (t) => {
+    while (ends.length && ends[0] <= t) {
+      integrate(heapPop(ends));
+      open -= 1;
+    }
+    integrate(t);
+  };
+
+  for await (const occ of intervals) {
+    const start = Math.max(occ.start_date.getTime(), from);
+    const end = Math.min(occ.end_date ? occ.end_date.getTime() : to, to);
+    if (end <= start) continue;
+    advance(start);
+    heapPush(ends, end);
+    open += 1;
+  }
+  advance(to);
+  return buckets;
+};
+
+// { pgId?, from, to (ms, to exclusive), groupBy } -> capacity and one row per bucket
+export const occupancyRate = async ({ pgId, from, to, groupBy }) => {
+  const buckets = makeBuckets(from, to, groupBy);
+  if (!buckets) {
+    throw Object.assign(new Error(`At most ${MAX_BUCKETS} ${groupBy} buckets per report`), { statusCode: 400 });
+  }
+
+  const roomFilter = { status: { $ne: "maintenance" } };
+  if (pgId) roomFilter.pgId = pgId;
+  const rooms = await Room.find(roomFilter, { _id: 1 }).lean();
+  const beds = await Bed.find({ roomId: { $in: rooms.map((room) => room._id) } }, { _id: 1 }).lean();
+
+  if (beds.length && buckets.length) {
+    const cursor = Occupancy.find(
+      {
+        bedId: { $in: beds.map((bed) => bed._id) },
+        status: { $ne: "on_hold" },
+        start_date: { $lt: new Date(to) },
+        $or: [{ end_date: null }, { end_date: { $gt: new Date(from) } }]
+      },
+      { start_date: 1, end_date: 1 }
+    )
+      .sort({ start_date: 1 })
+      .lean()
+      .cursor({ batchSize: 1000 });
+    await sweepOccupancy(cursor, buckets);
+  }
+
+  const rows = buckets.map(({ start, end, occupiedMs }) => {
+    const availableBedDays = (beds.length * (end - start)) / MS_DAY;
+    const occupiedBedDays = occupiedMs / MS_DAY;
+    return {
+      start: new Date(start),
+      end: new Date(end),
+      occupiedBedDays: round2(occupiedBedDays),
+      availableBedDays: round2(availableBedDays),
+      rate: availableBedDays ? round2((occupiedBedDays / availableBedDays) * 100) : null
+    };
+  });
+  const occupied = buckets.reduce((sum, bucket) => sum + bucket.occupiedMs, 0) / MS_DAY;
+  const available = (beds.length * (to - from)) / MS_DAY;
+  return {
+    pgId: pgId || null,
+    groupBy,
+    beds: beds.length,
+    from: new Date(from),
+    to: new Date(to),
+    occupiedBedDays: round2(occupied),
+    availableBedDays: round2(available),
+    rate: available ? round2((occupied / available) * 100) : null,
+    buckets: rows
+  };
+};
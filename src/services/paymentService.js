@@ -0,0 +1,161 @@
+// Bill payment totals.
+//
+// Bill.paid / balance / status are kept current by the transaction
+// controller (applyPayment, one atomic update per write, then the bill's
+// arrears row). A write that fails half-way, or data changed outside the
+// API, can leave them behind; reconcileBills rebuilds them from the
+// transactions in bulk:
+//
+//   bills in scope (a period, a PG, some bills, or all)
+//   one $group over Transaction by billId -> paid per bill, in memory
+//   compare -> one unordered bulkWrite of only the bills that differ,
+//              each guarded by the values it was computed from
+//
+// startReconcileSchedule runs it for the previous and current month on a
+// timer, so statuses stay right without per-bill calls. The job is
+// idempotent: running it in several processes only repeats the reads.
+import Bill, { deriveStatus } from "../models/Bill.js";
+import Bed from "../models/Bed.js";
+import Room from "../models/Room.js";
+import Transaction from "../models/Transaction.js";
+import logger from "../config/logger.js";
+import { syncArrears } from "./arrearsService.js";
+import { resolvePeriod } from "./billingService.js";
+
+const MAX_PENDING_OPS = 50000;   // a full rebuild flushes in slices this size
+
+const round2 = (n) => Math.round(n * 100) / 100;
+
+// Add `delta` to a bill's paid total and refresh its arrears row.
+export const applyPayment = async (billId, delta) => {
+  await Bill.applyPayment(billId, delta);
+  await syncArrears([billId]);
+};
+
+// paid per billId (string) for the transactions matching `filter`
+export const paidByBill = async (filter = {}) => {
+  const rows = await Transaction.aggregate([
+    { $match: filter },
+    { $group: { _id: "$billId", paid: { $sum: "$amount" } } }
+  ]);
+  return new Map(rows.map((row) => [String(row._id), round2(row.paid)]));
+};
+
+// What paid / balance / status should be for `bill`, or null if they already are.
+export const settlement = (bill, paid) => {
+  const expected = { paid, balance: round2(bill.amount - paid), status: deriveStatus(bill.amount, paid) };
+  const same = bill.paid === expected.paid && bill.balance === expected.balance && bill.status === expected.status;
+  return same ? null : expected;
+};
+
+// Bill filter for a reconciliation scope; {} = every bill.
+const billScope = async ({ month, period_start, period_end, pgId, billIds }) => {
+  const filter = {};
+  if (billIds) filter._id = { $in: billIds };
+  if (month || period_start) {
+    const period = resolvePeriod({ month, period_start, period_end });
+    filter.period_start = { $lt: period.end };
+    filter.period_end = { $gt: period.start };
+  }
+  if (pgId) {
+    const rooms = await Room.find({ pgId }, { _id: 1 }).lean();
+    const beds = await Bed.find({ roomId: { $in: rooms.map((room) => room._id) } }, { _id: 1 }).lean();
+    filter.bedId = { $in: beds.map((bed) => bed._id) };
+  }
+  return filter;
+};
+
+// Rebuild paid / balance / status of the bills in scope from their transactions.
+// Scoped runs load the bills first and $group only their transactions; a full
+// rebuild streams the bills against one $group over every transaction, and
+// re-totals the bills that differ before writing them, as a payment applied
+// after that $group shows on the bill but not in the total.
+//
+// Each write is conditioned on the paid / balance it was computed from, so a
+// payment or re-pricing that lands between the read and the write makes it
+// miss instead of being overwritten; that bill is left to the next run.
+export const reconcileBills = async ({ dryRun = false, ...scope } = {}) => {
+  const filter = await billScope(scope);
+  const projection = { amount: 1, paid: 1, balance: 1, status: 1 };
+  const full = !Object.keys(filter).length;
+  let bills;
+  let paid;
+  if (!full) {
+    bills = await Bill.find(filter, projection).lean();
+    paid = await paidByBill({ billId: { $in: bills.map((bill) => bill._id) } });
+  } else {
+    paid = await paidByBill();
+    bills = Bill.find(filter, projection).lean().cursor({ batchSize: 1000 });
+  }
+
+  const stats = { scanned: 0, changed: 0, drift: { paid: 0, status: 0, amount: 0, transitions: {} } };
+  let pending = [];
+  const flush = async () => {
+    if (!pending.length) return;
+    let totals = paid;
+    if (full) totals = await paidByBill({ billId: { $in: pending.map((bill) => bill._id) } });
+    const ops = [];
+    for (const bill of pending) {
+      const expected = settlement(bill, totals.get(String(bill._id)) || 0);
+      if (!expected) continue;
+      if (expected.paid !== bill.paid) {
+        stats.drift.paid += 1;
+        stats.drift.amount = round2(stats.drift.amount + Math.abs(expected.paid - (bill.paid || 0)));
+      }
+      if (expected.status !== bill.status) {
+        const transition = `${bill.status || "none"}→${expected.status}`;
+        stats.drift.status += 1;
+        stats.drift.transitions[transition] = (stats.drift.transitions[transition] || 0) + 1;
+      }
+      const guard = { _id: bill._id, paid: bill.paid ?? null, balance: bill.balance ?? null };
+      ops.push({ updateOne: { filter: guard, update: { $set: expected } } });
+    }
+    pending = [];
+    stats.changed += ops.length;
+    if (ops.length && !dryRun) {
+      const { matchedCount } = await Bill.bulkWrite(ops, { ordered: false });
+      stats.changed -= ops.length - matchedCount;
+      await syncArrears(ops.map((op) => op.updateOne.filter._id));
+    }
+  };
+  for await (const bill of bills) {
+    stats.scanned += 1;
+    if (!settlement(bill, paid.get(String(bill._id)) || 0)) continue;
+    pending.push(bill);
+    if (pending.length >= MAX_PENDING_OPS) await flush();
+  }
+  await flush();
+  return { dryRun, ...stats };
+};
+
+// ---------- schedule
+
+let timer = null;
+
+// The previous and the current calendar month (UTC): late payments for last
+// month's bills still land after it ends.
+const recentMonths = (now = new Date()) => ({
+  period_start: new Date(Date.UTC(now.getUTCFullYear(), now.getUTCMonth() - 1, 1)),
+  period_end: new Date(Date.UTC(now.getUTCFullYear(), now.getUTCMonth() + 1, 1))
+});
+
+export const startReconcileSchedule = ({ everyMinutes = Number(process.env.RECONCILE_INTERVAL_MINUTES ?? 60) } = {}) => {
+  if (!everyMinutes) return;
+  const tick = async () => {
+    try {
+      const { scanned, changed, drift } = await reconcileBills(recentMonths());
+      const level = changed ? "warn" : "info";
+      logger[level](`bill reconciliation: ${scanned} scanned, ${changed} fixed, ${drift.status} status drift`, { drift });
+    } catch (err) {
+      logger.error(`bill reconciliation failed: ${err.message}`);
+    }
+  };
+  timer = setInterval(tick, everyMinutes * 60 * 1000);
+  timer.unref();
+  tick();
+};
+
+export const stopReconcileSchedule = () => {
+  clearInterval(timer);
+  timer = null;
+};
@@ -0,0 +1,342 @@
+// Bank / UPI statement import.
+//
+//   parseCsv         streaming CSV parser: rows are yielded while the file is
+//                    still being read, so memory does not grow with its size
+//   statementRows    header aliases -> { date, amount, mobile, reference, narration }
+//   openBillIndex    every unpaid bill with its tenant's mobile, from one
+//                    aggregation, keyed by mobile + balance in memory
+//   importStatement  match each credit to one bill, insert the matched
+//                    transactions in unordered batches, then reconcile the
+//                    paid bills in one pass (paymentService.js)
+//
+// A row matches a bill when the payer's mobile is the tenant's, the amount is
+// the bill's open balance, and the payment date lies in the bill's period
+// (widened by MATCH_GRACE_DAYS on both sides for early and late payers). Rows
+// with several such bills are reported as ambiguous rather than guessed.
+//
+// The bank reference (UTR / transaction id) is stored on the transaction and
+// unique, so importing the same statement twice writes nothing new.
+import Bill from "../models/Bill.js";
+import Tenant from "../models/Tenant.js";
+import Transaction from "../models/Transaction.js";
+import { resolvePeriod } from "./billingService.js";
+import { reconcileBills } from "./paymentService.js";
+
+const MS_DAY = 24 * 60 * 60 * 1000;
+export const IMPORT_BATCH = 500;
+const MATCH_GRACE_DAYS = 10;
+const MAX_REPORTED = 1000;       // unmatched / ambiguous rows listed in the report
+
+// ---------- CSV
+
+// Rows of a CSV stream as arrays of strings (RFC 4180 quoting; quoted fields
+// may contain commas, quotes and newlines, and may span chunks).
+export async function* parseCsv(stream) {
+  const decoder = new TextDecoder("utf-8");
+  let state = "field";           // field | quoted | quote (a quote inside a quoted field)
+  let field = "";
+  let row = [];
+  const rows = [];
+  const endRow = () => {
+    row.push(field);
+    if (row.length > 1 || row[0] !== "") rows.push(row);
+    row = [];
+    field = "";
+  };
+  const feed = (text) => {
+    for (let i = 0; i < text.length; i++) {
+      const c = text[i];
+      if (state === "quoted") {
+        if (c === '"') state = "quote";
+        else field += c;
+        continue;
+      }
+      if (state === "quote") {
+        state = "field";
+        if (c === '"') {
+          field += c;
+          state = "quoted";
+          continue;
+        }
+      }
+      if (c === '"' && field === "") state = "quoted";
+      else if (c === ",") {
+        row.push(field);
+        field = "";
+      } else if (c === "\n") endRow();
+      else if (c !== "\r") field += c;
+    }
+  };
+
+  let first = true;
+  for await (const chunk of stream) {
+    let text = typeof chunk === "string" ? chunk : decoder.decode(chunk, { stream: true });
+    if (first && text) {
+      // a chunk shorter than the BOM decodes to "", so look at the first real text
+      if (text.charCodeAt(0) === 0xfeff) text = text.slice(1);
+      first = false;
+    }
+    feed(text);
+    yield* rows.splice(0);
+  }
+  feed(decoder.decode());
+  if (field !== "" || row.length) endRow();
+  yield* rows.splice(0);
+}
+
+// ---------- statement rows
+
+const HEADERS = {
+  date: ["date", "txndate", "transactiondate", "valuedate", "postingdate", "trandate"],
+  amount: ["amount", "credit", "creditamount", "deposit", "depositamount", "cr", "cramount", "amountinr"],
+  debit: ["debit", "debitamount", "withdrawal", "withdrawalamount", "dr", "dramount"],
+  type: ["type", "crdr", "drcr", "transactiontype"],
+  mobile: ["mobile", "mobileno", "phone", "phoneno", "payermobile", "contact"],
+  reference: ["reference", "referenceno", "ref", "refno", "utr", "utrno", "rrn", "transactionid", "txnid", "chqrefno"],
+  narration: ["narration", "description", "particulars", "remarks", "details", "payer", "vpa"]
+};
+const MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"];
+
+const normalizeHeader = (h) => h.toLowerCase().replace(/[^a-z0-9]/g, "");
+
+// column index per known field, or null if the row is not a header
+const headerColumns = (cells) => {
+  const columns = {};
+  cells.forEach((cell, i) => {
+    const key = normalizeHeader(cell);
+    for (const [name, aliases] of Object.entries(HEADERS)) {
+      if (columns[name] === undefined && aliases.includes(key)) columns[name] = i;
+    }
+  });
+  return columns.date !== undefined && columns.amount !== undefined ? columns : null;
+};
+
+// last ten digits of an Indian mobile number, or null
+export const normalizeMobile = (value) => {
+  const digits = String(value || "").replace(/\D/g, "");
+  return digits.length >= 10 ? digits.slice(-10) : null;
+};
+
+// a mobile number inside free text, e.g. a UPI id "9876543210@ybl"
+const mobileIn = (text) => {
+  const m = /(?:^|\D)(?:\+?91[- ]?)?([6-9]\d{9})(?!\d)/.exec(text || "");
+  return m ? m[1] : null;
+};
+
+const parseAmount = (value) => {
+  const n = Number(String(value || "").replace(/[^\d.-]/g, ""));
+  return Number.isFinite(n) ? Math.round(n * 100) / 100 : NaN;
+};
+
+// 2024-05-03, 03/05/2024, 03-05-24, 03-May-2024, 03 May 2024 -> UTC midnight
+export const parseStatementDate = (value) => {
+  const s = String(value || "").trim();
+  let year;
+  let month;
+  let day;
+  let m = /^(\d{4})-(\d{1,2})-(\d{1,2})/.exec(s);
+  if (m) [, year, month, day] = m.map(Number);
+  else if ((m = /^(\d{1,2})[/\-. ](\d{1,2}|[A-Za-z]{3})[A-Za-z]*[/\-. ](\d{2,4})\b/.exec(s))) {
+    day = Number(m[1]);
+    month = /^\d/.test(m[2]) ? Number(m[2]) : MONTHS.indexOf(m[2].toLowerCase()) + 1;
+    year = Number(m[3]) < 100 ? 2000 + Number(m[3]) : Number(m[3]);
+  } else return null;
+  const date = new Date(Date.UTC(year, month - 1, day));
+  return date.getUTCMonth() === month - 1 && date.getUTCDate() === day ? date : null;
+};
+
+// { line, date, amount, mobile, reference, narration } per credit row, or
+// { line, skip } for rows that are not payments in. Lines before the header
+// (account details many banks put on top) are ignored.
+export async function* statementRows(rows) {
+  let columns = null;
+  let line = 0;
+  for await (const cells of rows) {
+    line += 1;
+    if (!columns) {
+      columns = headerColumns(cells);
+      continue;
+    }
+    const cell = (name) => (columns[name] === undefined ? "" : (cells[columns[name]] || "").trim());
+    const narration = cell("narration");
+    const credit = parseAmount(cell("amount"));
+    if (/^(dr|debit|d)$/i.test(cell("type")) || (!(credit > 0) && parseAmount(cell("debit")) > 0)) {
+      yield { line, skip: "debit" };
+      continue;
+    }
+    yield {
+      line,
+      date: parseStatementDate(cell("date")),
+      amount: credit,
+      mobile: normalizeMobile(cell("mobile")) || mobileIn(narration),
+      reference: cell("reference") || null,
+      narration
+    };
+  }
+  if (!columns) throw Object.assign(new Error("No header row with a date and an amount column"), { statusCode: 400 });
+}
+
+// ---------- matching
+
+const key = (mobile, amount) => `${mobile}:${Math.round(amount * 100)}`;
+
+// Unpaid bills (optionally only those overlapping `period`), by tenant mobile
+// and open balance. One aggregation; everything else is in memory.
+export const openBillIndex = async (period) => {
+  const match = { status: { $ne: "paid" }, balance: { $gt: 0 } };
+  if (period) {
+    match.period_start = { $lt: period.end };
+    match.period_end = { $gt: period.start };
+  }
+  const bills = await Bill.aggregate([
+    { $match: match },
+    { $lookup: { from: Tenant.collection.name, localField: "tenantId", foreignField: "_id", as: "tenant" } },
+    {
+      $project: {
+        balance: 1,
+        period_start: 1,
+        period_end: 1,
+        mobile: { $arrayElemAt: ["$tenant.mobile", 0] }
+      }
+    }
+  ]);
+  const index = new Map();
+  for (const bill of bills) {
+    const mobile = normalizeMobile(bill.mobile);
+    if (!mobile) continue;
+    const k = key(mobile, bill.balance);
+    if (!index.has(k)) index.set(k, []);
+    index.get(k).push(bill);
+  }
+  return { index, size: bills.length };
+};
+
+// { bill } for a single match, else { reason, candidates? }. A matched bill
+// leaves the index so no two rows settle the same balance.
+export const matchRow = (index, row) => {
+  if (!row.date) return { reason: "unreadable date" };
+  if (!(row.amount > 0)) return { reason: "unreadable amount" };
+  if (!row.mobile) return { reason: "no mobile number" };
+  const candidates = index.get(key(row.mobile, row.amount)) || [];
+  if (!candidates.length) return { reason: "no open bill for this mobile and amount" };
+  const at = row.date.getTime();
+  const grace = MATCH_GRACE_DAYS * MS_DAY;
+  let hits = candidates.filter((b) => at >= b.period_start.getTime() - grace && at < b.period_end.getTime() + grace);
+  if (!hits.length) return { reason: "no open bill for this mobile and amount in this period" };
+  if (hits.length > 1) {
+    // prefer the bill whose period actually contains the payment date
+    const inside = hits.filter((b) => at >= b.period_start.getTime() && at < b.period_end.getTime());
+    if (inside.length === 1) hits = inside;
+  }
+  if (hits.length > 1) return { reason: "several open bills match", candidates: hits.map((b) => b._id) };
+  candidates.splice(candidates.indexOf(hits[0]), 1);
+  return { bill: hits[0] };
+};
+
+// ---------- import
+
+const insertBatch = async (docs) => {
+  if (!docs.length) return { inserted: [], duplicates: 0, failed: 0 };
+  try {
+    await Transaction.collection.insertMany(docs, { ordered: false });
+    return { inserted: docs, duplicates: 0, failed: 0 };
+  } catch (err) {
+    if (!err.writeErrors) throw err;
+    const writeErrors = [].concat(err.writeErrors);
+    const rejected = new Set(writeErrors.map((e) => e.index));
+    const duplicates = writeErrors.filter((e) => e.code === 11000).length;
+    return { inserted: docs.filter((_, i) => !rejected.has(i)), duplicates, failed: writeErrors.length - duplicates };
+  }
+};
+
+// Import a statement CSV stream. Options: method (upi | bank | ...), a month
+// or period_start/period_end to limit the bills considered, dryRun.
+export const importStatement = async (stream, { method = "bank", dryRun = false, ...scope } = {}) => {
+  const period = scope.month || scope.period_start ? resolvePeriod(scope) : null;
+  const { index, size } = await openBillIndex(period);
+  const report = {
+    dryRun,
+    openBills: size,
+    rows: 0,
+    matched: 0,
+    inserted: 0,
+    duplicates: 0,
+    failed: 0,
+    skipped: 0,
+    unmatchedCount: 0,
+    ambiguousCount: 0,
+    unmatched: [],
+    ambiguous: []
+  };
+  const seen = new Set();        // references earlier in this file
+  const paidBills = [];
+  let batch = [];
+
+  const flush = async () => {
+    const rows = batch;
+    batch = [];
+    const refs = rows.map((row) => row.reference).filter(Boolean);
+    const existing = refs.length
+      ? new Set((await Transaction.find({ reference: { $in: refs } }, { reference: 1 }).lean()).map((t) => t.reference))
+      : new Set();
+    const docs = [];
+    for (const row of rows) {
+      if (row.reference && existing.has(row.reference)) {
+        report.duplicates += 1;
+        continue;
+      }
+      const { bill, reason, candidates } = matchRow(index, row);
+      if (!bill) {
+        const entry = { line: row.line, date: row.date, amount: row.amount, mobile: row.mobile, reference: row.reference, reason };
+        if (candidates) {
+          report.ambiguousCount += 1;
+          if (report.ambiguous.length < MAX_REPORTED) report.ambiguous.push({ ...entry, candidates });
+        } else {
+          report.unmatchedCount += 1;
+          if (report.unmatched.length < MAX_REPORTED) report.unmatched.push(entry);
+        }
+        continue;
+      }
+      report.matched += 1;
+      const now = new Date();
+      docs.push({
+        billId: bill._id,
+        method,
+        notes: row.narration || undefined,
+        reference: row.reference || undefined,
+        dateTime: row.date,
+        amount: row.amount,
+        createdAt: now,
+        updatedAt: now
+      });
+    }
+    if (dryRun) return;
+    const result = await insertBatch(docs);
+    report.inserted += result.inserted.length;
+    report.duplicates += result.duplicates;
+    report.failed += result.failed;
+    for (const doc of result.inserted) paidBills.push(doc.billId);
+  };
+
+  for await (const row of statementRows(parseCsv(stream))) {
+    report.rows += 1;
+    if (row.skip) {
+      report.skipped += 1;
+      continue;
+    }
+    if (row.reference) {
+      if (seen.has(row.reference)) {
+        report.duplicates += 1;
+        continue;
+      }
+      seen.add(row.reference);
+    }
+    batch.push(row);
+    if (batch.length >= IMPORT_BATCH) await flush();
+  }
+  await flush();
+
+  // Transactions went in through the collection; settle their bills in one pass.
+  if (paidBills.length) await reconcileBills({ billIds: paidBills });
+  return report;
+};
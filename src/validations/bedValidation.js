@@ -0,0 +1,13 @@
+import Joi from "joi";
+
+// Also used by POST /rooms/:id/beds, where roomId comes from the path.
+export const createBedSchema = Joi.object({
+  roomId: Joi.string().hex().length(24),
+  bedNo: Joi.string().trim().required().messages({
+    "any.required": "Bed number is required",
+  }),
+  notes: Joi.string().trim().allow(""),
+  defaultCost: Joi.number().min(0).messages({
+    "number.min": "Default cost cannot be negative",
+  }),
+});
@@ -20,3 +20,69 @@ export const createBillSchema = Joi.object({
   shared_between: Joi.array().items(Joi.string()),
   remarks: Joi.string().trim().allow(""),
 });
+
+const objectId = Joi.string().hex().length(24);
+
+const bulkBillItem = Joi.object({
+  bedId: objectId.required(),
+  tenantId: objectId.required(),
+  occupancyId: objectId,
+  period_start: Joi.date().required(),
+  period_end: Joi.date().greater(Joi.ref("period_start")).required(),
+  amount: Joi.number().min(0).required(),
+  remarks: Joi.string().trim().allow(""),
+});
+
+export const bulkBillsSchema = Joi.object({
+  bills: Joi.array().items(bulkBillItem).min(1).max(5000).required().messages({
+    "any.required": "bills is required",
+    "array.max": "At most 5000 bills per request",
+  }),
+});
+
+const periodScope = {
+  month: Joi.string()
+    .pattern(/^\d{4}-(0[1-9]|1[0-2])$/)
+    .messages({
+      "string.pattern.base": "Month format should be YYYY-MM",
+    }),
+  period_start: Joi.date(),
+  period_end: Joi.date().greater(Joi.ref("period_start")),
+  pgId: objectId,
+};
+
+// Scope of a batch recalculation; at least one of period, PG or beds.
+export const recalculateBillsSchema = Joi.object({
+  ...periodScope,
+  bedIds: Joi.array().items(objectId).min(1),
+  // written to every bed in scope, so it needs a PG or beds, never "all beds"
+  defaultCost: Joi.number()
+    .min(0)
+    .when("pgId", {
+      is: Joi.exist(),
+      otherwise: Joi.when("bedIds", { is: Joi.exist(), otherwise: Joi.forbidden() }),
+    })
+    .messages({
+      "any.unknown": "defaultCost needs a pgId or bedIds",
+    }),
+  includePaid: Joi.boolean(),
+  dryRun: Joi.boolean(),
+})
+  .oxor("month", "period_start")
+  .and("period_start", "period_end")
+  .or("month", "period_start", "pgId", "bedIds")
+  .messages({
+    "object.missing": "Give a period (month or period_start/period_end), a pgId or bedIds",
+  });
+
+// Scope of a payment reconciliation; at least a period or a PG.
+export const reconcileBillsSchema = Joi.object({
+  ...periodScope,
+  dryRun: Joi.boolean(),
+})
+  .oxor("month", "period_start")
+  .and("period_start", "period_end")
+  .or("month", "period_start", "pgId")
+  .messages({
+    "object.missing": "Give a period (month or period_start/period_end) or a pgId",
+  });
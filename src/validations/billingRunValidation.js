@@ -0,0 +1,24 @@
+import Joi from "joi";
+
+// Either a calendar month or an explicit [period_start, period_end) window,
+// optionally limited to one PG.
+export const billingRunSchema = Joi.object({
+  month: Joi.string()
+    .pattern(/^\d{4}-(0[1-9]|1[0-2])$/)
+    .messages({
+      "string.pattern.base": "Month format should be YYYY-MM",
+    }),
+  period_start: Joi.date(),
+  period_end: Joi.date().greater(Joi.ref("period_start")).messages({
+    "date.greater": "period_end must be after period_start",
+  }),
+  pgId: Joi.string().hex().length(24).messages({
+    "string.length": "pgId must be an ObjectId",
+  }),
+})
+  .xor("month", "period_start")
+  .and("period_start", "period_end")
+  .messages({
+    "object.missing": "Either month or period_start/period_end is required",
+    "object.xor": "Send either month or period_start/period_end, not both",
+  });
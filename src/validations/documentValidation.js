@@ -0,0 +1,12 @@
+import Joi from "joi";
+
+export const createDocumentSchema = Joi.object({
+  file_name: Joi.string().trim().required().messages({
+    "any.required": "File name is required",
+  }),
+  file_path: Joi.string().trim().required().messages({
+    "any.required": "File path is required",
+  }),
+  type: Joi.string().trim(),
+  uploadedAt: Joi.date(),
+});
@@ -0,0 +1,20 @@
+import Joi from "joi";
+
+const objectId = Joi.string().hex().length(24);
+
+export const createOccupancySchema = Joi.object({
+  bedId: objectId.required().messages({
+    "any.required": "bedId is required",
+  }),
+  tenantId: objectId.required().messages({
+    "any.required": "tenantId is required",
+  }),
+  start_date: Joi.date().required().messages({
+    "any.required": "Start date is required",
+  }),
+  end_date: Joi.date().greater(Joi.ref("start_date")).allow(null).messages({
+    "date.greater": "End date must be after the start date",
+  }),
+  advance: Joi.number().min(0),
+  status: Joi.string().valid("active", "moved_out", "on_hold"),
+});
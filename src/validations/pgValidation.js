@@ -0,0 +1,11 @@
+import Joi from "joi";
+
+export const createPgSchema = Joi.object({
+  pgName: Joi.string().trim().required().messages({
+    "any.required": "PG name is required",
+  }),
+  user_id: Joi.string().hex().length(24),
+  address: Joi.string().trim().allow(""),
+  location: Joi.any(),
+  contact: Joi.string().trim().allow(""),
+});
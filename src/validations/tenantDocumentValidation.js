@@ -0,0 +1,14 @@
+import Joi from "joi";
+
+const objectId = Joi.string().hex().length(24);
+
+export const linkTenantDocumentSchema = Joi.object({
+  tenantId: objectId.required().messages({
+    "any.required": "tenantId is required",
+  }),
+  docId: objectId.required().messages({
+    "any.required": "docId is required",
+  }),
+  type: Joi.string().trim(),
+  uploadedAt: Joi.date(),
+});
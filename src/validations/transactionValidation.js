@@ -0,0 +1,33 @@
+import Joi from "joi";
+
+const objectId = Joi.string().hex().length(24);
+const methods = ["cash", "upi", "bank", "card", "other"];
+
+export const createTransactionSchema = Joi.object({
+  billId: objectId.required().messages({
+    "any.required": "billId is required",
+  }),
+  method: Joi.string().valid(...methods),
+  screenshot: Joi.string().trim().allow(""),
+  notes: Joi.string().trim().allow(""),
+  reference: Joi.string().trim(),
+  dateTime: Joi.date(),
+  amount: Joi.number().min(0).required().messages({
+    "any.required": "Amount is required",
+  }),
+});
+
+// Query of POST /transactions/import (the body is the statement CSV itself).
+export const importStatementSchema = Joi.object({
+  method: Joi.string().valid(...methods).default("bank"),
+  month: Joi.string()
+    .pattern(/^\d{4}-(0[1-9]|1[0-2])$/)
+    .messages({
+      "string.pattern.base": "Month format should be YYYY-MM",
+    }),
+  period_start: Joi.date(),
+  period_end: Joi.date().greater(Joi.ref("period_start")),
+  dryRun: Joi.boolean().default(false),
+})
+  .oxor("month", "period_start")
+  .and("period_start", "period_end");
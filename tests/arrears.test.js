@@ -0,0 +1,73 @@
+import { jest } from "@jest/globals";
+import mongoose from "mongoose";
+import Arrear from "../src/models/Arrear.js";
+import Bill from "../src/models/Bill.js";
+import { rebuildArrears, syncArrears } from "../src/services/arrearsService.js";
+
+const billId = new mongoose.Types.ObjectId();
+
+// The $merge stage of the last Bill.aggregate call.
+const mergeStage = (aggregate) => aggregate.mock.calls.at(-1)[0].at(-1).$merge;
+
+// Evaluates a one-stage whenMatched pipeline for a stored and an incoming row
+// (only the expressions the service uses: $replaceWith, $cond, $gte).
+const whenMatched = (pipeline, stored, incoming) => {
+  const value = (expr) => {
+    if (expr === "$$new") return incoming;
+    if (expr === "$$ROOT") return stored;
+    if (typeof expr === "string" && expr.startsWith("$$new.")) return incoming[expr.slice(6)];
+    if (typeof expr === "string" && expr.startsWith("$")) return stored[expr.slice(1)];
+    if (expr.$gte) return value(expr.$gte[0]) >= value(expr.$gte[1]);
+    if (expr.$cond) return value(expr.$cond[0]) ? value(expr.$cond[1]) : value(expr.$cond[2]);
+    throw new Error(`unsupported expression ${JSON.stringify(expr)}`);
+  };
+  expect(pipeline).toHaveLength(1);
+  return value(pipeline[0].$replaceWith);
+};
+
+let aggregate;
+let deleteMany;
+beforeEach(() => {
+  aggregate = jest.spyOn(Bill, "aggregate").mockResolvedValue([]);
+  deleteMany = jest.spyOn(Arrear, "deleteMany").mockResolvedValue({ deletedCount: 0 });
+});
+
+afterEach(() => jest.restoreAllMocks());
+
+describe("syncArrears", () => {
+  test("merges every listed bill, settled ones included, then drops rows of deleted bills", async () => {
+    await syncArrears([billId, null]);
+
+    const [pipeline] = aggregate.mock.calls[0];
+    expect(pipeline[0]).toEqual({ $match: { _id: { $in: [billId] } } });
+    const { syncedAt } = pipeline.find((stage) => stage.$project).$project;
+    expect(deleteMany).toHaveBeenCalledWith({ _id: { $in: [billId] }, syncedAt: { $lt: syncedAt.$literal } });
+  });
+
+  test("nothing to sync, no query", async () => {
+    await syncArrears([null, undefined]);
+    expect(aggregate).not.toHaveBeenCalled();
+  });
+
+  test("a sync that read the bill earlier cannot overwrite a newer row", async () => {
+    await syncArrears([billId]);
+    const { whenMatched: pipeline, whenNotMatched } = mergeStage(aggregate);
+    expect(whenNotMatched).toBe("insert");
+
+    const newer = { _id: billId, balance: 0, syncedAt: new Date("2024-05-01T10:00:01Z") };
+    const older = { _id: billId, balance: 500, syncedAt: new Date("2024-05-01T10:00:00Z") };
+    expect(whenMatched(pipeline, newer, older)).toBe(newer);
+    expect(whenMatched(pipeline, older, newer)).toBe(newer);
+  });
+});
+
+describe("rebuildArrears", () => {
+  test("merges the open bills and drops every row it did not write", async () => {
+    jest.spyOn(Arrear, "estimatedDocumentCount").mockResolvedValue(3);
+    deleteMany.mockResolvedValue({ deletedCount: 2 });
+
+    expect(await rebuildArrears()).toEqual({ rows: 3, removed: 2 });
+    expect(aggregate.mock.calls[0][0][0]).toEqual({ $match: { balance: { $gt: 0 } } });
+    expect(deleteMany).toHaveBeenCalledWith({ syncedAt: { $lt: expect.any(Date) } });
+  });
+});
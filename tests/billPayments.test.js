@@ -0,0 +1,109 @@
+import { jest } from "@jest/globals";
+import mongoose from "mongoose";
+import { updateBill } from "../src/controllers/billController.js";
+import { createTransaction, deleteTransaction, updateTransaction } from "../src/controllers/transactionController.js";
+import Arrear from "../src/models/Arrear.js";
+import Bill, { deriveStatus, settleStage } from "../src/models/Bill.js";
+import Transaction from "../src/models/Transaction.js";
+
+const billA = new mongoose.Types.ObjectId();
+const billB = new mongoose.Types.ObjectId();
+
+// Evaluates the aggregation expressions settleStage uses against one bill.
+const evaluate = (expr, doc) => {
+  if (typeof expr === "string" && expr.startsWith("$")) return doc[expr.slice(1)];
+  if (expr === null || typeof expr !== "object") return expr;
+  const [[op, args]] = Object.entries(expr);
+  const v = (e) => evaluate(e, doc);
+  switch (op) {
+    case "$ifNull": return v(args[0]) ?? v(args[1]);
+    case "$subtract": return v(args[0]) - v(args[1]);
+    case "$round": return Math.round(v(args[0]) * 10 ** args[1]) / 10 ** args[1];
+    case "$lte": return v(args[0]) <= v(args[1]);
+    case "$lt": return v(args[0]) < v(args[1]);
+    case "$switch": return v((args.branches.find((b) => v(b.case)) || { then: args.default }).then);
+    default: throw new Error(`unsupported operator ${op}`);
+  }
+};
+const settle = (doc) => Object.fromEntries(Object.entries(settleStage.$set).map(([key, expr]) => [key, evaluate(expr, doc)]));
+
+const run = async (handler, req) => {
+  const res = { status: jest.fn(() => res), json: jest.fn(() => res) };
+  const next = jest.fn();
+  await handler(req, res, next);
+  if (next.mock.calls.length) throw next.mock.calls[0][0];
+  return res;
+};
+
+// paid deltas applied through Bill.applyPayment, as [billId, delta]
+const applied = (updateOne) => updateOne.mock.calls.map(([filter, [stage]]) => [filter._id, stage.$set.paid.$round[0].$add[1]]);
+
+let updateOne;
+beforeEach(() => {
+  updateOne = jest.spyOn(Bill, "updateOne").mockResolvedValue({ matchedCount: 1 });
+  jest.spyOn(Bill, "aggregate").mockResolvedValue([]);
+  jest.spyOn(Arrear, "deleteMany").mockResolvedValue({ deletedCount: 0 });
+});
+
+afterEach(() => jest.restoreAllMocks());
+
+describe("settleStage", () => {
+  test.each([
+    [1000, undefined, 1000, "pending"],
+    [1000, 0, 1000, "pending"],
+    [1000, 333.333, 666.67, "partial"],
+    [1000, 1000, 0, "paid"],
+    [1000, 1200, -200, "paid"],
+  ])("amount %d, paid %s", (amount, paid, balance, status) => {
+    expect(settle({ amount, paid })).toEqual({ balance, status });
+    expect(deriveStatus(amount, paid ?? 0)).toBe(status);
+  });
+});
+
+describe("transaction writes move Bill.paid", () => {
+  test("create adds the amount in one pipeline update that also settles", async () => {
+    jest.spyOn(Transaction, "create").mockResolvedValue({ billId: billA, amount: 400 });
+    await run(createTransaction, { body: {} });
+    expect(updateOne).toHaveBeenCalledTimes(1);
+    const [filter, pipeline] = updateOne.mock.calls[0];
+    expect(filter).toEqual({ _id: billA });
+    expect(pipeline).toEqual([
+      { $set: { paid: { $round: [{ $add: [{ $ifNull: ["$paid", 0] }, 400] }, 2] } } },
+      settleStage,
+    ]);
+  });
+
+  test("update applies the difference, or moves the amount between bills", async () => {
+    jest.spyOn(Transaction, "castObject").mockImplementation((body) => body);
+    const findByIdAndUpdate = jest.spyOn(Transaction, "findByIdAndUpdate");
+    findByIdAndUpdate.mockReturnValue({ lean: async () => ({ billId: billA, amount: 400 }) });
+
+    await run(updateTransaction, { params: { id: "t1" }, body: { amount: 450 } });
+    expect(applied(updateOne)).toEqual([[billA, 50]]);
+
+    updateOne.mockClear();
+    await run(updateTransaction, { params: { id: "t1" }, body: { billId: billB } });
+    expect(applied(updateOne)).toEqual([[billA, -400], [billB, 400]]);
+  });
+
+  test("delete takes the amount back", async () => {
+    jest.spyOn(Transaction, "findByIdAndDelete").mockReturnValue({ lean: async () => ({ billId: billA, amount: 400 }) });
+    await run(deleteTransaction, { params: { id: "t1" } });
+    expect(applied(updateOne)).toEqual([[billA, -400]]);
+  });
+});
+
+describe("updateBill", () => {
+  test("a new amount is written with settleStage, client values as literals", async () => {
+    jest.spyOn(Bill, "castObject").mockImplementation((body) => body);
+    const findByIdAndUpdate = jest.spyOn(Bill, "findByIdAndUpdate").mockReturnValue({ lean: async () => ({ _id: billA }) });
+
+    await run(updateBill, { params: { id: String(billA) }, body: { amount: 900, remarks: "$paid", paid: 5 } });
+
+    expect(findByIdAndUpdate).toHaveBeenCalledWith(
+      String(billA),
+      [{ $set: { amount: { $literal: 900 }, remarks: { $literal: "$paid" } } }, settleStage],
+      { new: true }
+    );
+  });
+});
@@ -0,0 +1,72 @@
+import { jest } from "@jest/globals";
+import mongoose from "mongoose";
+import Bill from "../src/models/Bill.js";
+import Occupancy from "../src/models/Occupancy.js";
+
+const id = () => new mongoose.Types.ObjectId();
+const occA = id();
+const occB = id();
+const bill = (occupancyId, period_start, period_end) => ({ occupancyId, period_start, period_end });
+
+// validateBatch reads the occupancies and the existing bills; both are stubbed
+// so only the in-memory checks run.
+beforeEach(() => {
+  jest.spyOn(Occupancy, "find").mockReturnValue({
+    lean: async () => [
+      { _id: occA, start_date: new Date("2024-01-01"), end_date: null },
+      { _id: occB, start_date: new Date("2024-01-01"), end_date: new Date("2024-07-01") },
+    ],
+  });
+  jest.spyOn(Bill, "findOverlapping").mockResolvedValue(new Map());
+});
+
+afterEach(() => jest.restoreAllMocks());
+
+describe("Bill.validateBatch", () => {
+  test("back-to-back periods of one occupancy are accepted", async () => {
+    const errors = await Bill.validateBatch([
+      bill(occA, "2024-02-01", "2024-03-01"),
+      bill(occA, "2024-03-01", "2024-04-01"),
+    ]);
+    expect(errors).toEqual([null, null]);
+  });
+
+  test("overlapping periods in the same batch are rejected, whatever their order", async () => {
+    const errors = await Bill.validateBatch([
+      bill(occA, "2024-03-01", "2024-04-01"),
+      bill(occA, "2024-02-01", "2024-05-01"),
+      bill(occB, "2024-03-01", "2024-04-01"),
+    ]);
+    expect(errors).toEqual(["Overlaps another bill in this batch", null, null]);
+  });
+
+  test("a bill inside an earlier, longer one is rejected", async () => {
+    const errors = await Bill.validateBatch([
+      bill(occA, "2024-02-01", "2024-06-01"),
+      bill(occA, "2024-03-01", "2024-04-01"),
+      bill(occA, "2024-06-01", "2024-07-01"),
+    ]);
+    expect(errors).toEqual([null, "Overlaps another bill in this batch", null]);
+  });
+
+  test("periods outside the occupancy or reversed are reported per bill", async () => {
+    const errors = await Bill.validateBatch([
+      bill(occB, "2024-06-01", "2024-08-01"),
+      bill(occA, "2024-04-01", "2024-03-01"),
+      bill(id(), "2024-03-01", "2024-04-01"),
+    ]);
+    expect(errors).toEqual([
+      "Bill period must be within occupancy window",
+      "period_start must be before period_end",
+      "Invalid occupancyId",
+    ]);
+  });
+
+  test("overlaps with stored bills come from findOverlapping", async () => {
+    Bill.findOverlapping.mockResolvedValue(
+      new Map([[String(occA), [{ period_start: new Date("2024-02-15"), period_end: new Date("2024-03-15") }]]])
+    );
+    const errors = await Bill.validateBatch([bill(occA, "2024-03-01", "2024-04-01")]);
+    expect(errors).toEqual(["Overlapping bill exists for this occupancy and period"]);
+  });
+});
@@ -0,0 +1,45 @@
+import { prorate, resolvePeriod } from "../src/services/billingService.js";
+
+const d = (s) => new Date(`${s}T00:00:00.000Z`);
+
+describe("resolvePeriod", () => {
+  test("a month is [1st, 1st of next month) in UTC", () => {
+    expect(resolvePeriod({ month: "2024-12" })).toEqual({ start: d("2024-12-01"), end: d("2025-01-01") });
+  });
+
+  test("an explicit window is kept as is", () => {
+    expect(resolvePeriod({ period_start: "2024-05-10", period_end: "2024-06-10" })).toEqual({
+      start: d("2024-05-10"),
+      end: d("2024-06-10"),
+    });
+  });
+});
+
+describe("prorate", () => {
+  test("a whole month costs the monthly cost", () => {
+    expect(prorate(3100, d("2024-03-01"), d("2024-04-01")).amount).toBe(3100);
+    expect(prorate(2900, d("2024-02-01"), d("2024-03-01")).amount).toBe(2900);
+  });
+
+  test("a window crossing a month end is priced by each month's length", () => {
+    const { amount, parts } = prorate(3000, d("2024-01-20"), d("2024-02-10"));
+    expect(parts).toEqual([
+      { month: "2024-01", days: 12, daysInMonth: 31, amount: 1161.29 },
+      { month: "2024-02", days: 9, daysInMonth: 29, amount: 931.03 },
+    ]);
+    expect(amount).toBe(2092.32);
+  });
+
+  test("a window crossing a year end", () => {
+    const { amount, parts } = prorate(3000, d("2024-12-16"), d("2025-01-16"));
+    expect(parts.map((p) => [p.month, p.days])).toEqual([
+      ["2024-12", 16],
+      ["2025-01", 15],
+    ]);
+    expect(amount).toBe(3000);
+  });
+
+  test("an empty window costs nothing", () => {
+    expect(prorate(3000, d("2024-05-10"), d("2024-05-10"))).toEqual({ amount: 0, parts: [] });
+  });
+});
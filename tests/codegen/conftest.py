@@ -0,0 +1,5 @@
+# Makes scripts/codegen importable as `codegen`, as the generators do.
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
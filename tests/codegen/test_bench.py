@@ -0,0 +1,28 @@
+import json
+
+from codegen.registry import load_generator
+from codegen.spec import ROOT
+
+
+def test_benchmark_smoke(tmp_path, capsys):
+    bench = load_generator(ROOT / "scripts" / "bench_generators.py")
+    out = tmp_path / "bench.json"
+    assert bench.main(["--sizes", "2", "--repeat", "1", "--out", str(out)]) == 0
+
+    rows = json.loads(out.read_text())["results"]
+    assert [(r["generator"], r["resources"]) for r in rows] == [
+        ("controllerGen", 2), ("genRoutes", 2), ("generate.py", "fixed"),
+    ]
+    assert all(r["files"] and r["bytes"] and r["noop_ms"] >= 0 for r in rows)
+
+    assert bench.main(["--sizes", "2", "--repeat", "1", "--out", str(tmp_path / "again.json"),
+                       "--compare", str(out)]) == 0
+    assert "render_ms=" in capsys.readouterr().out
+
+
+def test_synthetic_spec_covers_every_filter_kind():
+    bench = load_generator(ROOT / "scripts" / "bench_generators.py")
+    spec = bench.synthetic_spec(3)
+    assert [res.name for res in spec.resources] == ["items0", "items1", "items2"]
+    kinds = {f.kind for f in spec.resources[0].filters}
+    assert {"search", "open", "overlap", "range"} <= kinds
@@ -0,0 +1,79 @@
+import pytest
+
+from codegen.emit import Plan, diff_plan, emit, unified_diff
+from codegen.registry import load_generator
+from codegen.spec import ROOT
+
+
+def make_plan():
+    plan = Plan()
+    plan.directory("src")
+    plan.directory("src")
+    plan.file("src/new.js", "new\n")
+    plan.file("src/same.js", "same\n")
+    plan.file("src/deep/edited.js", "template\n")
+    return plan
+
+
+def seed(root):
+    (root / "src" / "deep").mkdir(parents=True)
+    (root / "src" / "same.js").write_text("same\n")
+    (root / "src" / "deep" / "edited.js").write_text("mine\n")
+
+
+def test_plan_rejects_a_file_planned_twice():
+    plan = make_plan()
+    assert plan.dirs == ["src"]
+    with pytest.raises(ValueError, match="src/new.js is planned twice"):
+        plan.file("src/new.js", "again")
+
+
+def test_diff_plan_classifies_in_plan_order(tmp_path):
+    seed(tmp_path)
+    changes = diff_plan(make_plan(), tmp_path, workers=2)
+    assert [(c.path, c.state) for c in changes] == [
+        ("src/new.js", "new"), ("src/same.js", "unchanged"), ("src/deep/edited.js", "changed"),
+    ]
+    assert changes[2].old == b"mine\n"
+
+
+def test_unified_diff_of_new_and_changed_files(tmp_path):
+    seed(tmp_path)
+    new, _, changed = diff_plan(make_plan(), tmp_path)
+    assert unified_diff(new).startswith("--- /dev/null\n+++ b/src/new.js\n")
+    assert "-mine\n+template\n" in unified_diff(changed)
+
+
+def test_emit_writes_only_the_given_changes(tmp_path):
+    plan = make_plan()
+    changes = diff_plan(plan, tmp_path)
+    emit(plan, [c for c in changes if c.path != "src/same.js"], tmp_path, workers=2)
+    assert (tmp_path / "src" / "deep" / "edited.js").read_text() == "template\n"
+    assert not (tmp_path / "src" / "same.js").exists()
+
+
+@pytest.fixture
+def generate():
+    return load_generator(ROOT / "generate.py")
+
+
+def test_generate_dry_run_writes_nothing(generate, tmp_path, capsys):
+    generate.generate_structure(tmp_path, dry_run=True)
+    assert list(tmp_path.iterdir()) == []
+    assert "+ Would create file: src/server.js" in capsys.readouterr().out
+
+
+def test_generate_keeps_edited_files_unless_forced(generate, tmp_path, capsys):
+    plan = generate.generate_structure(tmp_path)
+    assert all((tmp_path / path).is_file() for path in plan.files)
+
+    (tmp_path / ".gitignore").write_text("mine\n")
+    capsys.readouterr()
+    generate.generate_structure(tmp_path)
+    out = capsys.readouterr().out
+    assert "⚠ File differs from template (skipping, use --force): .gitignore" in out
+    assert f"0 written, 1 differ (kept), {len(plan.files) - 1} up to date, 0 new directories" in out
+    assert (tmp_path / ".gitignore").read_text() == "mine\n"
+
+    generate.generate_structure(tmp_path, force=True)
+    assert (tmp_path / ".gitignore").read_text() == plan.files[".gitignore"]
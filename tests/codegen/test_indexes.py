@@ -0,0 +1,89 @@
+from codegen.indexes import (
+    BLOCK_BEGIN, Index, Shape, apply_block, load_models, parse_model, plan_indexes, render_block, risk, supports,
+    usable,
+)
+from codegen.spec import load_spec, parse_spec
+
+MODEL = """import mongoose from 'mongoose';
+
+const ThingSchema = new mongoose.Schema(
+  {
+    tenantId: { type: mongoose.Schema.Types.ObjectId, ref: 'Tenant' },
+    status: { type: String, index: true }, // '{' in a comment
+    note: { type: String, match: /[{}]/ },
+  },
+  { timestamps: true }
+);
+
+ThingSchema.virtual('label').get(function () { return this.note; });
+ThingSchema.index({ tenantId: 1, createdAt: -1 }, { partialFilterExpression: { status: 'open' } });
+
+export default mongoose.model('Thing', ThingSchema);
+"""
+
+
+def shape(equality=(), sort=(("createdAt", -1), ("_id", -1)), ranges=()):
+    return Shape("?", tuple(equality), tuple(sort), tuple(ranges))
+
+
+def test_parse_model_reads_fields_indexes_and_virtuals(tmp_path):
+    path = tmp_path / "Thing.js"
+    path.write_text(MODEL, encoding="utf-8")
+    model = parse_model(path)
+    assert model.name == "Thing"
+    assert model.fields == ("_id", "tenantId", "status", "note", "createdAt", "updatedAt")
+    assert model.virtuals == {"label"}
+    assert Index((("status", 1),)) in model.indexes
+    assert Index((("tenantId", 1), ("createdAt", -1)), partial=("status",)) in model.indexes
+
+
+def test_esr_orders_equality_then_sort_then_range():
+    s = shape(equality=("tenantId",), ranges=("period_start", "period_end"))
+    assert s.esr() == (("tenantId", 1), ("createdAt", -1), ("_id", -1), ("period_start", 1), ("period_end", 1))
+
+
+def test_supports_needs_the_sort_after_the_equality_prefix():
+    s = shape(equality=("status",))
+    assert supports(Index((("status", 1), ("createdAt", -1), ("_id", -1))), s)
+    assert supports(Index((("status", 1), ("createdAt", 1), ("_id", 1))), s)       # walked backwards
+    assert not supports(Index((("status", 1), ("createdAt", -1), ("_id", 1))), s)  # mixed directions
+    assert risk([Index((("status", 1),))], s) == "partial"                         # sorts in memory
+    assert risk([Index((("note", 1),))], s) == "collscan"
+
+
+def test_partial_indexes_only_serve_queries_that_pin_their_filter():
+    ix = Index((("tenantId", 1), ("createdAt", -1), ("_id", -1)), partial=("status",))
+    assert not usable(ix, shape(equality=("tenantId",)))
+    assert usable(ix, shape(equality=("tenantId", "status")))
+
+
+def test_planned_indexes_replace_shorter_hand_written_ones(tmp_path):
+    path = tmp_path / "Thing.js"
+    path.write_text(MODEL, encoding="utf-8")
+    spec = parse_spec({"resources": [{
+        "name": "things", "model": "Thing", "controller": "thingController", "crud": True,
+        "list": {"filters": [{"param": "status"}], "sort": "-createdAt"},
+    }]})
+    plan = plan_indexes(spec, {"Thing": parse_model(path)})["Thing"]
+    assert Index((("status", 1), ("createdAt", -1), ("_id", -1))) in plan.planned
+    assert [ix.keys for ix, _ in plan.redundant] == [(("status", 1),)]
+
+
+def test_apply_block_is_idempotent(tmp_path):
+    path = tmp_path / "Thing.js"
+    path.write_text(MODEL, encoding="utf-8")
+    spec = parse_spec({"resources": [{
+        "name": "things", "model": "Thing", "controller": "thingController", "crud": True,
+        "list": {"filters": [{"param": "status"}]},
+    }]})
+    block = render_block(plan_indexes(spec, {"Thing": parse_model(path)})["Thing"])
+    once = apply_block(MODEL, block)
+    assert once.count(BLOCK_BEGIN) == 1
+    assert once.index(BLOCK_BEGIN) < once.index("export default mongoose.model")
+    assert apply_block(once, block) == once
+    assert apply_block(once, "") == MODEL
+
+
+def test_repo_models_declare_no_redundant_indexes():
+    plans = plan_indexes(load_spec(), load_models())
+    assert {name: plan.redundant for name, plan in plans.items() if plan.redundant} == {}
@@ -0,0 +1,79 @@
+import json
+import os
+
+from codegen.manifest import MANIFEST_NAME, Manifest, sync
+
+
+def run(base, files, capsys, **kw):
+    code = sync(base, files, "testGen", "1", **kw)
+    return code, capsys.readouterr().out
+
+
+def test_first_run_writes_and_records(tmp_path, capsys):
+    code, out = run(tmp_path, {"a.js": "A", "b.js": "B  \n\n"}, capsys)
+    assert code == 0
+    assert "2 written, 0 unchanged" in out
+    assert (tmp_path / "b.js").read_text() == "B\n"
+    saved = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert saved["generator"] == "testGen" and set(saved["files"]) == {"a.js", "b.js"}
+
+
+def test_unchanged_files_keep_their_mtime(tmp_path, capsys):
+    run(tmp_path, {"a.js": "A", "b.js": "B"}, capsys)
+    os.utime(tmp_path / "a.js", ns=(1, 1))   # stale manifest entry: falls back to hashing
+
+    _, out = run(tmp_path, {"a.js": "A", "b.js": "B2"}, capsys)
+    assert "1 written, 1 unchanged" in out
+    assert (tmp_path / "a.js").stat().st_mtime_ns == 1
+    assert (tmp_path / "b.js").read_text() == "B2\n"
+
+
+def test_hand_edits_are_detected_and_overwritten(tmp_path, capsys):
+    run(tmp_path, {"a.js": "A"}, capsys)
+    (tmp_path / "a.js").write_text("edited\n")
+
+    code, out = run(tmp_path, {"a.js": "A"}, capsys, check=True)
+    assert code == 1 and "✘ changed: a.js" in out
+    assert (tmp_path / "a.js").read_text() == "edited\n"
+
+    run(tmp_path, {"a.js": "A"}, capsys)
+    assert (tmp_path / "a.js").read_text() == "A\n"
+
+
+def test_check_lists_new_files_without_writing(tmp_path, capsys):
+    code, out = run(tmp_path, {"a.js": "A"}, capsys, check=True)
+    assert code == 1 and "✘ new: a.js" in out
+    assert not (tmp_path / "a.js").exists()
+    assert not (tmp_path / MANIFEST_NAME).exists()
+
+
+def test_a_matching_file_without_a_manifest_is_unchanged(tmp_path, capsys):
+    (tmp_path / "a.js").write_text("A\n")
+    code, out = run(tmp_path, {"a.js": "A"}, capsys, check=True)
+    assert code == 0 and "0 out of date, 1 up to date" in out
+
+
+def test_another_version_drops_the_cache_but_not_the_files(tmp_path, capsys):
+    run(tmp_path, {"a.js": "A"}, capsys)
+    manifest = Manifest(tmp_path, "testGen", "2")
+    assert manifest.files == {} and manifest.dirty
+    assert sync(tmp_path, {"a.js": "A"}, "testGen", "2") == 0
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text())["version"] == "2"
+
+
+def test_files_no_longer_generated_are_forgotten_not_deleted(tmp_path, capsys):
+    run(tmp_path, {"a.js": "A", "old.js": "O"}, capsys)
+
+    run(tmp_path, {"a.js": "A"}, capsys, prune=False)
+    assert "old.js" in json.loads((tmp_path / MANIFEST_NAME).read_text())["files"]
+
+    _, out = run(tmp_path, {"a.js": "A"}, capsys)
+    assert "⚠ old.js is no longer generated" in out
+    assert (tmp_path / "old.js").exists()
+    assert "old.js" not in json.loads((tmp_path / MANIFEST_NAME).read_text())["files"]
+
+
+def test_force_rewrites_everything(tmp_path, capsys):
+    run(tmp_path, {"a.js": "A"}, capsys)
+    _, out = run(tmp_path, {"a.js": "A"}, capsys, force=True)
+    assert "1 written, 0 unchanged" in out
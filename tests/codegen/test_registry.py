@@ -0,0 +1,67 @@
+import pytest
+
+from codegen import cli
+from codegen.registry import Registry, load_generator
+from codegen.spec import ROOT
+
+
+def counting_registry(base):
+    reg = Registry("testGen", base, "1")
+    rendered = []
+    for fname in ("billController.js", "bills.js", "index.js"):
+        reg.add(fname, lambda fname=fname: rendered.append(fname) or f"// {fname}")
+    return reg, rendered
+
+
+def test_select_matches_names_and_stems_in_order(tmp_path):
+    reg, _ = counting_registry(tmp_path)
+    assert reg.select(None) == ["billController.js", "bills.js", "index.js"]
+    assert reg.select(["bills", "billController", "bills.js"]) == ["bills.js", "billController.js"]
+    assert reg.select(["nope"]) == []
+
+
+def test_registering_a_file_twice_fails(tmp_path):
+    reg, _ = counting_registry(tmp_path)
+    with pytest.raises(ValueError, match="index.js registered twice"):
+        reg.add("index.js", lambda: "")
+
+
+def test_only_renders_just_the_selected_files(tmp_path):
+    reg, rendered = counting_registry(tmp_path)
+    assert rendered == []   # registering renders nothing
+    assert cli.main([reg], "test", ["--only", "bills"]) == 0
+    assert rendered == ["bills.js"]
+    assert [p.name for p in tmp_path.glob("*.js")] == ["bills.js"]
+
+
+def test_unknown_targets_exit_2_before_rendering(tmp_path, capsys):
+    reg, rendered = counting_registry(tmp_path)
+    assert cli.main([reg], "test", ["--only", "bills,ghost"]) == 2
+    assert "unknown target(s): ghost" in capsys.readouterr().err
+    assert rendered == []
+
+
+def test_list_renders_nothing(tmp_path, capsys):
+    reg, rendered = counting_registry(tmp_path)
+    assert cli.main([reg], "test", ["--list"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "testGen: billController.js", "testGen: bills.js", "testGen: index.js",
+    ]
+    assert rendered == []
+
+
+def test_load_generator_caches_the_module():
+    path = ROOT / "src" / "routes" / "genRoutes.py"
+    gen = load_generator(path)
+    assert load_generator(path) is gen
+    assert "bills.js" in gen.REGISTRY.names()
+
+
+def test_a_broken_reload_keeps_the_last_good_module(tmp_path):
+    path = tmp_path / "fakeGen.py"
+    path.write_text("VALUE = 1\n")
+    assert load_generator(path).VALUE == 1
+    path.write_text("VALUE = (\n")
+    with pytest.raises(SyntaxError):
+        load_generator(path, reload=True)
+    assert load_generator(path).VALUE == 1
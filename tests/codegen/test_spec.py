@@ -0,0 +1,84 @@
+import pytest
+
+from codegen.registry import load_generator
+from codegen.spec import ROOT, SPEC_PATH, SpecError, load_spec, parse_spec
+
+
+def resource(**overrides):
+    return {"name": "bills", "model": "Bill", "controller": "billController", "crud": True, **overrides}
+
+
+def test_resources_json_parses():
+    spec = load_spec()
+    bills = spec.resource("bills")
+    assert bills.ops["list"] == "getBills"
+    assert bills.validation["create"].module == "billValidation"
+    assert "billValidation" in spec.validation_modules()
+
+
+def test_load_spec_is_cached_per_content():
+    assert load_spec() is load_spec(SPEC_PATH)
+
+
+def test_filters_and_sort_are_parsed():
+    raw = resource(list={
+        "filters": [{"param": "status"}, {"kind": "overlap", "start": "period_start", "end": "period_end"}],
+        "sort": "-period_start name",
+        "combos": [["status", "from"]],
+    })
+    res = parse_spec({"resources": [raw]}).resources[0]
+    assert [f.param for f in res.filters] == ["status", "from"]
+    assert res.filters[1].index_fields == ("period_start", "period_end")
+    assert res.sort == (("period_start", -1), ("name", 1))
+    assert res.combos == (("status", "from"),)
+
+
+@pytest.mark.parametrize("raw, message", [
+    (resource(model=None), "crud resources need a 'model'"),
+    (resource(validation={"create": "createBillSchema"}), "validation must look like 'module.schemaName'"),
+    (resource(validation={"upsert": "billValidation.x"}), "validation for unknown op 'upsert'"),
+    (resource(list={"filters": [{"kind": "fuzzy", "param": "q"}]}), "unknown filter kind 'fuzzy'"),
+    (resource(list={"filters": [{"kind": "search", "param": "q"}]}), "search filter needs 'fields'"),
+    (resource(list={"filters": [{"param": "status"}], "combos": [["status", "pgId"]]}), "unknown filter param(s) pgId"),
+    (resource(features={"bulk": True}), "unknown feature 'bulk'"),
+    (resource(crud=False, features={"export": True}), "the export feature needs a crud resource"),
+    (resource(routes=[{"method": "fetch", "path": "/", "handler": "x"}]), "unknown method 'fetch'"),
+    (resource(routes=[{"path": "/x", "handler": "x", "controller": "otherController"}]), "which no resource generates"),
+])
+def test_invalid_resources_are_rejected(raw, message):
+    with pytest.raises(SpecError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        parse_spec({"resources": [raw]})
+
+
+def test_duplicate_names_are_rejected():
+    with pytest.raises(SpecError, match="duplicate resource 'bills'"):
+        parse_spec({"resources": [resource(), resource(controller="otherController")]})
+
+
+def test_invalid_json_names_the_file(tmp_path):
+    path = tmp_path / "resources.json"
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(SpecError, match="resources.json"):
+        load_spec(path)
+
+
+def test_routes_need_an_existing_validation_schema(tmp_path, monkeypatch):
+    gen = load_generator(ROOT / "src" / "routes" / "genRoutes.py")
+    res = parse_spec({"resources": [resource(validation={"create": "billValidation.createBillSchema"})]}).resources[0]
+    monkeypatch.setattr(gen, "VALIDATIONS", tmp_path)
+
+    with pytest.raises(SpecError, match="validations/billValidation.js does not exist"):
+        gen.make_router(res)
+
+    (tmp_path / "billValidation.js").write_text("export const otherSchema = 1;\n", encoding="utf-8")
+    with pytest.raises(SpecError, match="does not export createBillSchema"):
+        gen.make_router(res)
+
+    (tmp_path / "billValidation.js").write_text("export const createBillSchema = 1;\n", encoding="utf-8")
+    assert 'import { createBillSchema } from "../validations/billValidation.js";' in gen.make_router(res)
+
+
+def test_every_route_in_resources_json_renders():
+    gen = load_generator(ROOT / "src" / "routes" / "genRoutes.py")
+    for res in load_spec().resources:
+        assert gen.make_router(res).startswith("// Auto-generated by genRoutes.py")
@@ -0,0 +1,36 @@
+import pytest
+
+from codegen.templates import TemplateError, render, template
+
+
+def test_slots_are_filled_and_js_braces_left_alone():
+    tpl = template("""
+        export const {{name}} = asyncHandler(async (req, res) => {
+          return ok(res, { {{ field }}: 1 });
+        });
+    """)
+    assert tpl.names == {"name", "field"}
+    assert tpl.render(name="getBills", field="status", unused=1) == (
+        "\nexport const getBills = asyncHandler(async (req, res) => {\n"
+        "  return ok(res, { status: 1 });\n"
+        "});\n"
+    )
+
+
+def test_a_slot_may_repeat_and_values_are_stringified():
+    assert render("{{n}} + {{n}} = {{sum}}", n=2, sum=4) == "2 + 2 = 4"
+
+
+def test_missing_params_are_named():
+    with pytest.raises(TemplateError, match="needs name, sort"):
+        template("{{name}} {{sort}} {{name}}").render()
+
+
+def test_identical_sources_compile_once():
+    source = "const {{a}} = 1;"
+    assert template(source) is template(source)
+    assert template(source) is not template(source + "\n")
+
+
+def test_values_are_not_rescanned_for_slots():
+    assert render("x = {{v}}", v="{{v}}") == "x = {{v}}"
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import pytest
+
+from codegen.registry import load_generator
+from codegen.watch import Inotify, Poller, Watched, wait_for_changes
+
+FAKE_GENERATOR = """
+from codegen.registry import Registry
+
+KEYS = {"a.js": "1", "b.js": "1", "c.js": None}
+
+def build_registry(spec):
+    reg = Registry("fakeGen", None, "1", source=__file__)
+    for fname, key in KEYS.items():
+        reg.add(fname, lambda fname=fname: fname, key=key)
+    return reg
+"""
+
+
+def touch(path, text="x"):
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))   # coarse mtimes on some filesystems
+
+
+def test_poller_reports_watched_files_and_models(tmp_path):
+    spec = tmp_path / "resources.json"
+    spec.write_text("{}")
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "Bill.js").write_text("")
+    poller = Poller([spec], [models], interval=0.01)
+    assert poller.poll(0) == set()
+
+    touch(spec)
+    (models / "Tenant.js").write_text("")       # new model
+    (models / "notes.txt").write_text("")       # not a model
+    assert poller.poll(0) == {spec.resolve(), (models / "Tenant.js").resolve()}
+
+    (models / "Bill.js").unlink()
+    assert poller.poll(0) == {(models / "Bill.js").resolve()}
+    assert poller.poll(0) == set()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="inotify is Linux only")
+def test_inotify_reports_saves_by_rename(tmp_path):
+    spec = tmp_path / "resources.json"
+    spec.write_text("{}")
+    try:
+        watcher = Inotify([spec], [])
+    except OSError:
+        pytest.skip("inotify unavailable")
+    try:
+        (tmp_path / "other.json").write_text("")
+        assert watcher.poll(0.1) == set()
+        tmp = tmp_path / ".resources.json.tmp"
+        tmp.write_text("{}")
+        os.replace(tmp, spec)
+        assert spec.resolve() in watcher.poll(1)
+    finally:
+        watcher.close()
+
+
+class FakeWatcher:
+    def __init__(self, events):
+        self.events = list(events)
+        self.timeouts = []
+
+    def poll(self, timeout):
+        self.timeouts.append(timeout)
+        return self.events.pop(0) if self.events else set()
+
+
+def test_a_burst_of_events_is_one_rebuild():
+    watcher = FakeWatcher([set(), {"a"}, {"a", "b"}, set(), {"c"}])
+    assert wait_for_changes(watcher, 0.2) == {"a", "b"}
+    assert watcher.timeouts == [None, None, 0.2, 0.2]
+
+
+def test_rebuild_renders_only_files_whose_key_changed(tmp_path):
+    source = tmp_path / "watchedGen.py"
+    source.write_text(FAKE_GENERATOR)
+    module = load_generator(source, reload=True)
+    watched = Watched(module.build_registry(None))
+
+    module.KEYS["b.js"] = "2"
+    module.KEYS["d.js"] = "1"
+    del module.KEYS["a.js"]
+    affected, removed = watched.rebuild(reload=False)
+    assert sorted(affected) == ["b.js", "c.js", "d.js"]   # c.js has no key: always re-rendered
+    assert removed == ["a.js"]
+
+    affected, _ = watched.rebuild(reload=True)
+    assert sorted(affected) == ["a.js", "b.js", "c.js"]   # reloaded script: everything
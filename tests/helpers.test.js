@@ -0,0 +1,247 @@
+import { Readable, Writable } from "stream";
+import { jest } from "@jest/globals";
+import { findPage, parseFields, streamExport } from "../src/controllers/helpers.js";
+
+// A model over an in-memory array that understands the queries findPage
+// builds: equality, $gt / $lt, $and and $or.
+const matches = (doc, query) =>
+  Object.entries(query).every(([key, cond]) => {
+    if (key === "$and") return cond.every((q) => matches(doc, q));
+    if (key === "$or") return cond.some((q) => matches(doc, q));
+    if (cond && typeof cond === "object") {
+      if ("$gt" in cond) return doc[key] > cond.$gt;
+      if ("$lt" in cond) return doc[key] < cond.$lt;
+    }
+    return doc[key] === cond;
+  });
+
+const fakeModel = (rows) => {
+  const Model = {
+    modelName: "Row",
+    queries: [],
+    find(query) {
+      Model.queries.push(query);
+      let order = {};
+      let skip = 0;
+      let limit = Infinity;
+      const chain = {
+        sort: (o) => ((order = o), chain),
+        skip: (n) => ((skip = n), chain),
+        limit: (n) => ((limit = n), chain),
+        lean: async () =>
+          rows
+            .filter((doc) => matches(doc, query))
+            .sort((a, b) => {
+              for (const [key, dir] of Object.entries(order)) {
+                if (a[key] !== b[key]) return (a[key] < b[key] ? -1 : 1) * dir;
+              }
+              return 0;
+            })
+            .slice(skip, skip + limit),
+      };
+      return chain;
+    },
+    countDocuments: async (query) => rows.filter((doc) => matches(doc, query)).length,
+    estimatedDocumentCount: async () => rows.length,
+  };
+  return Model;
+};
+
+// 10 rows, rent values with ties so the _id tiebreak matters
+const ROWS = Array.from({ length: 10 }, (_, i) => ({ _id: `r${i}`, rent: [300, 100, 200][i % 3] }));
+
+const everyPage = async (Model, sort, limit) => {
+  const seen = [];
+  let after = "";
+  for (let pages = 0; pages < 20; pages++) {
+    const { items, meta } = await findPage(Model, {}, { query: { after, limit: String(limit) } }, { sort });
+    seen.push(...items.map((row) => row._id));
+    if (!meta.nextCursor) return seen;
+    after = meta.nextCursor;
+  }
+  throw new Error("cursor did not terminate");
+};
+
+const sortedIds = (dir) =>
+  [...ROWS]
+    .sort((a, b) => (a.rent - b.rent || (a._id < b._id ? -1 : 1)) * dir)
+    .map((row) => row._id);
+
+describe("findPage keyset cursors", () => {
+  test("walking nextCursor returns every row once, ties broken by _id", async () => {
+    expect(await everyPage(fakeModel(ROWS), { rent: 1 }, 3)).toEqual(sortedIds(1));
+  });
+
+  test("descending sorts page backwards, _id descending too", async () => {
+    expect(await everyPage(fakeModel(ROWS), { rent: -1 }, 4)).toEqual(sortedIds(-1));
+  });
+
+  test("an offset page's nextCursor continues where the page ended", async () => {
+    const Model = fakeModel(ROWS);
+    const first = await findPage(Model, {}, { query: { page: "1", limit: "4" } }, { sort: { rent: 1 } });
+    const next = await findPage(Model, {}, { query: { after: first.meta.nextCursor, limit: "4" } }, { sort: { rent: 1 } });
+    expect([...first.items, ...next.items].map((row) => row._id)).toEqual(sortedIds(1).slice(0, 8));
+  });
+
+  test.each([
+    ["not base64 JSON", "%%%"],
+    ["the wrong number of keys", Buffer.from(JSON.stringify([100])).toString("base64url")],
+    ["an operator object", Buffer.from(JSON.stringify([{ $ne: null }, { $ne: null }])).toString("base64url")],
+    ["a nested array", Buffer.from(JSON.stringify([[1], "r1"])).toString("base64url")],
+  ])("a cursor with %s is a 400", async (_, after) => {
+    const Model = fakeModel(ROWS);
+    await expect(findPage(Model, {}, { query: { after } }, { sort: { rent: 1 } })).rejects.toMatchObject({
+      statusCode: 400,
+      message: "Invalid cursor",
+    });
+    expect(Model.queries).toHaveLength(0);
+  });
+});
+
+describe("findPage counts", () => {
+  afterEach(() => jest.restoreAllMocks());
+
+  const page = (Model, filter, query) => findPage(Model, filter, { query }, { sort: { rent: 1 } });
+
+  test("offset pages count exactly by default, cursor pages not at all", async () => {
+    const Model = fakeModel(ROWS);
+    const counted = jest.spyOn(Model, "countDocuments");
+
+    expect((await page(Model, { rent: 100 }, { page: "1" })).meta).toMatchObject({ total: 3, hasNext: false });
+    const { meta } = await page(Model, {}, { after: "", limit: "4" });
+    expect(meta).not.toHaveProperty("total");
+    expect(meta.hasNext).toBe(true);
+    expect(counted).toHaveBeenCalledTimes(1);
+  });
+
+  test("count=none skips the count and still reports hasNext", async () => {
+    const Model = fakeModel(ROWS);
+    const counted = jest.spyOn(Model, "countDocuments");
+    const { meta } = await page(Model, {}, { page: "3", limit: "4", count: "none" });
+    expect(meta).toEqual({ page: 3, limit: 4, hasNext: false, nextCursor: null });
+    expect(counted).not.toHaveBeenCalled();
+  });
+
+  test("count=estimate reads collection metadata when unfiltered", async () => {
+    const Model = fakeModel(ROWS);
+    const counted = jest.spyOn(Model, "countDocuments");
+    const { meta } = await page(Model, {}, { count: "estimate" });
+    expect(meta).toMatchObject({ total: 10, estimated: true });
+    expect(counted).not.toHaveBeenCalled();
+  });
+
+  test("count=estimate caches filtered counts until they expire", async () => {
+    const Model = { ...fakeModel(ROWS), modelName: "CachedRow" };
+    const counted = jest.spyOn(Model, "countDocuments");
+    const now = Date.now();
+    const clock = jest.spyOn(Date, "now").mockReturnValue(now);
+
+    await page(Model, { rent: 200 }, { count: "estimate" });
+    await page(Model, { rent: 200 }, { count: "estimate" });
+    expect(counted).toHaveBeenCalledTimes(1);
+    await page(Model, { rent: 300 }, { count: "estimate" });
+    expect(counted).toHaveBeenCalledTimes(2);
+
+    clock.mockReturnValue(now + 31 * 1000);
+    const { meta } = await page(Model, { rent: 200 }, { count: "estimate" });
+    expect(meta.total).toBe(3);
+    expect(counted).toHaveBeenCalledTimes(3);
+  });
+
+  test("an unknown count mode is a 400", async () => {
+    await expect(page(fakeModel(ROWS), {}, { count: "all" })).rejects.toMatchObject({ statusCode: 400 });
+  });
+});
+
+describe("parseFields", () => {
+  afterEach(() => jest.restoreAllMocks());
+
+  const allowed = ["name", "mobile", "_id"];
+  const fieldsOf = (fields) => parseFields({ query: { fields } }, allowed);
+
+  test("no ?fields means the default projection", () => {
+    expect(parseFields({ query: {} }, allowed)).toBeUndefined();
+  });
+
+  test("listed names are projected, _id only when asked for", () => {
+    expect(fieldsOf(" name, mobile,,name")).toEqual({ name: 1, mobile: 1, _id: 0 });
+    expect(fieldsOf("name,_id")).toEqual({ name: 1, _id: 1 });
+  });
+
+  test("names outside the allowlist are a 400", () => {
+    expect(() => fieldsOf("name,password")).toThrow("Unknown field(s) password");
+  });
+
+  test("findPage always projects the sort keys", async () => {
+    const Model = fakeModel(ROWS);
+    const find = jest.spyOn(Model, "find");
+    await findPage(Model, {}, { query: { fields: "_id" } }, { sort: { rent: 1 }, fields: ["_id", "rent"] });
+    expect(find.mock.calls[0][1]).toEqual({ _id: 1, rent: 1 });
+  });
+});
+
+describe("streamExport", () => {
+  const exportModel = (docs) => ({
+    collection: { name: "tenants" },
+    find: () => ({ sort: () => ({ lean: () => ({ cursor: () => Readable.from(docs) }) }) }),
+  });
+
+  // A response that collects what was written to it.
+  const mockRes = () => {
+    const res = new Writable({
+      write(chunk, _encoding, done) {
+        res.body += chunk;
+        done();
+      },
+    });
+    Object.assign(res, { body: "", headers: {} });
+    res.status = (code) => ((res.statusCode = code), res);
+    res.set = (name, value) => ((res.headers[name] = value), res);
+    return res;
+  };
+
+  const csv = async (docs, fields = "name,note") => {
+    const res = mockRes();
+    await streamExport(exportModel(docs), {}, { query: { format: "csv", fields } }, res, { fields: ["name", "note"] });
+    return res.body.split("\r\n");
+  };
+
+  test("CSV cells are quoted only when they hold a comma, quote or newline", async () => {
+    const rows = await csv([
+      { name: "Asha", note: "a, b" },
+      { name: 'say "hi"', note: "two\nlines" },
+      { name: "Ravi", note: null },
+    ]);
+    expect(rows).toEqual(["name,note", 'Asha,"a, b"', '"say ""hi""","two\nlines"', "Ravi,", ""]);
+  });
+
+  test("text that a spreadsheet would run as a formula is prefixed with a quote", async () => {
+    const rows = await csv([{ name: "=HYPERLINK(1)", note: "-5" }, { name: "@x", note: "+1,2" }]);
+    expect(rows.slice(1, 3)).toEqual(["'=HYPERLINK(1),'-5", `'@x,"'+1,2"`]);
+  });
+
+  test("numbers and dates are written as values", async () => {
+    const rows = await csv([{ name: -5, note: new Date("2024-05-01T00:00:00Z") }]);
+    expect(rows[1]).toBe("-5,2024-05-01T00:00:00.000Z");
+  });
+
+  test("an empty export is just the header", async () => {
+    expect(await csv([])).toEqual(["name,note", ""]);
+  });
+
+  test("NDJSON writes one document per line", async () => {
+    const res = mockRes();
+    await streamExport(exportModel([{ a: 1 }, { a: 2 }]), {}, { query: {} }, res, { name: "rows" });
+    expect(res.body).toBe('{"a":1}\n{"a":2}\n');
+    expect(res.headers["Content-Type"]).toBe("application/x-ndjson; charset=utf-8");
+    expect(res.headers["Content-Disposition"]).toMatch(/^attachment; filename="rows-\d{4}-\d{2}-\d{2}\.ndjson"$/);
+  });
+
+  test("an unknown format is a 400 before anything is written", async () => {
+    const res = mockRes();
+    await expect(streamExport(exportModel([]), {}, { query: { format: "xlsx" } }, res)).rejects.toMatchObject({
+      statusCode: 400,
+    });
+    expect(res.statusCode).toBeUndefined();
+  });
+});
@@ -0,0 +1,120 @@
+import crypto from "crypto";
+import { jest } from "@jest/globals";
+import { idempotent } from "../src/middlewares/idempotency.js";
+import IdempotencyKey from "../src/models/IdempotencyKey.js";
+
+const DAY = 24 * 60 * 60 * 1000;
+const fingerprint = (body) => crypto.createHash("sha256").update(JSON.stringify(body)).digest("hex");
+const flush = () => new Promise((resolve) => setImmediate(resolve));
+
+const mockRes = () => {
+  const res = { statusCode: 200, headers: {}, sent: [] };
+  res.status = (code) => ((res.statusCode = code), res);
+  res.set = (name, value) => ((res.headers[name] = value), res);
+  res.json = (body) => (res.sent.push(body), res);
+  return res;
+};
+
+// Runs the middleware, then (if it called next) the handler; resolves with
+// the response once a settle has been written.
+const send = async (key, body, handler = (res) => res.status(201).json({ success: true, data: body })) => {
+  const req = { body, user: { _id: "u1" }, get: (name) => (name === "Idempotency-Key" ? key : undefined) };
+  const res = mockRes();
+  const next = jest.fn();
+  await idempotent("bills")(req, res, next);
+  if (next.mock.calls.length) handler(res);
+  await flush();
+  return res;
+};
+
+let keyNo = 0;
+let key;
+let create;
+let updateOne;
+beforeEach(() => {
+  key = `key-${++keyNo}`;   // the LRU is per process, so every test uses a fresh key
+  create = jest.spyOn(IdempotencyKey, "create").mockImplementation(async (doc) => ({ ...doc, createdAt: new Date() }));
+  updateOne = jest.spyOn(IdempotencyKey, "updateOne").mockResolvedValue({ matchedCount: 1 });
+});
+
+afterEach(() => jest.restoreAllMocks());
+
+// A second insert of the same key fails; the stored record is `stored`.
+const keyTaken = (stored) => {
+  create.mockRejectedValue(Object.assign(new Error("duplicate key"), { code: 11000 }));
+  jest.spyOn(IdempotencyKey, "findOneAndUpdate").mockReturnValue({ lean: async () => null });
+  jest.spyOn(IdempotencyKey, "findById").mockReturnValue({ lean: async () => stored });
+};
+
+describe("idempotent", () => {
+  test("requests without a key pass straight through", async () => {
+    const res = await send(undefined, { amount: 100 });
+    expect(res.statusCode).toBe(201);
+    expect(create).not.toHaveBeenCalled();
+  });
+
+  test("a retry replays the stored response without running the handler", async () => {
+    const first = await send(key, { amount: 100 });
+    const { owner } = create.mock.calls[0][0];
+    expect(updateOne).toHaveBeenCalledWith(
+      { _id: `u1:bills:${key}`, state: "pending", owner },
+      expect.objectContaining({ $set: expect.objectContaining({ state: "done", statusCode: 201 }) })
+    );
+
+    const handler = jest.fn();
+    const retry = await send(key, { amount: 100 }, handler);
+    expect(handler).not.toHaveBeenCalled();
+    expect(retry.statusCode).toBe(201);
+    expect(retry.headers["Idempotent-Replayed"]).toBe("true");
+    expect(retry.sent).toEqual(first.sent);
+    expect(create).toHaveBeenCalledTimes(1);   // served from the LRU
+  });
+
+  test("the same key with a different body is a 422", async () => {
+    await send(key, { amount: 100 });
+    const res = await send(key, { amount: 200 });
+    expect(res.statusCode).toBe(422);
+  });
+
+  test("a key still being processed is a 409 with Retry-After", async () => {
+    keyTaken({ _id: key, fingerprint: fingerprint({}), state: "pending", createdAt: new Date() });
+    const res = await send(key, {});
+    expect(res.statusCode).toBe(409);
+    expect(res.headers["Retry-After"]).toBe("1");
+  });
+
+  test("a 5xx releases the key so the retry runs again", async () => {
+    const deleteOne = jest.spyOn(IdempotencyKey, "deleteOne").mockResolvedValue({ deletedCount: 1 });
+    await send(key, { amount: 100 }, (res) => res.status(503).json({ success: false }));
+    const { owner } = create.mock.calls[0][0];
+    expect(deleteOne).toHaveBeenCalledWith({ _id: `u1:bills:${key}`, state: "pending", owner });
+    expect(updateOne).not.toHaveBeenCalled();
+
+    const retry = await send(key, { amount: 100 });
+    expect(retry.statusCode).toBe(201);
+    expect(create).toHaveBeenCalledTimes(2);
+  });
+
+  test("a request that lost its key to a takeover does not cache its response", async () => {
+    updateOne.mockResolvedValue({ matchedCount: 0 });
+    await send(key, { amount: 100 });
+
+    // the stored result is the one of the request that took the key over
+    const stored = { success: true, data: { _id: "b2" } };
+    const body = { amount: 100 };
+    keyTaken({ _id: key, fingerprint: fingerprint(body), state: "done", statusCode: 201, body: stored, createdAt: new Date() });
+    const retry = await send(key, body);
+    expect(retry.sent).toEqual([stored]);
+  });
+
+  test("cached responses expire with the key's document", async () => {
+    const now = Date.now();
+    await send(key, { amount: 100 });
+    jest.spyOn(Date, "now").mockReturnValue(now + DAY + 1000);
+
+    const handler = jest.fn((res) => res.status(201).json({ success: true }));
+    await send(key, { amount: 100 }, handler);
+    expect(handler).toHaveBeenCalledTimes(1);
+    expect(create).toHaveBeenCalledTimes(2);
+  });
+});
@@ -0,0 +1,65 @@
+import { MAX_BUCKETS, makeBuckets, sweepOccupancy } from "../src/services/occupancyRateService.js";
+
+const MS_DAY = 24 * 60 * 60 * 1000;
+const t = (s) => Date.parse(`${s}T00:00:00.000Z`);
+const iso = (ms) => new Date(ms).toISOString().slice(0, 10);
+const occ = (start, end) => ({ start_date: new Date(start), end_date: end === null ? null : new Date(end) });
+
+describe("makeBuckets", () => {
+  test("weeks start on Monday; the first and last are clipped to the range", () => {
+    const buckets = makeBuckets(t("2024-05-01"), t("2024-06-01"), "week");
+    expect(buckets.map((b) => `${iso(b.start)}..${iso(b.end)}`)).toEqual([
+      "2024-05-01..2024-05-06",
+      "2024-05-06..2024-05-13",
+      "2024-05-13..2024-05-20",
+      "2024-05-20..2024-05-27",
+      "2024-05-27..2024-06-01",
+    ]);
+  });
+
+  test("months are calendar months", () => {
+    const buckets = makeBuckets(t("2024-01-15"), t("2024-04-10"), "month");
+    expect(buckets.map((b) => iso(b.end))).toEqual(["2024-02-01", "2024-03-01", "2024-04-01", "2024-04-10"]);
+  });
+
+  test("too many buckets is refused", () => {
+    expect(makeBuckets(t("2000-01-01"), t("2000-01-01") + (MAX_BUCKETS + 1) * MS_DAY, "day")).toBeNull();
+  });
+});
+
+describe("sweepOccupancy", () => {
+  test("clips intervals to the range and counts open-ended ones to its end", async () => {
+    const buckets = makeBuckets(t("2024-05-01"), t("2024-05-04"), "day");
+    await sweepOccupancy(
+      [occ("2024-04-20", "2024-05-02"), occ("2024-05-02", null), occ("2024-05-02", "2024-05-03")],
+      buckets
+    );
+    expect(buckets.map((b) => b.occupiedMs / MS_DAY)).toEqual([1, 2, 1]);
+  });
+
+  test("matches a day-by-day count on random intervals", async () => {
+    let seed = 7;
+    const random = () => (seed = (seed * 1103515245 + 12345) % 2147483648) / 2147483648;
+    const intervals = [];
+    for (let i = 0; i < 300; i++) {
+      const start = t("2024-04-01") + Math.floor(random() * 90) * MS_DAY;
+      const end = random() < 0.2 ? null : start + Math.floor(random() * 40 + 1) * MS_DAY;
+      intervals.push(occ(start, end));
+    }
+    intervals.sort((a, b) => a.start_date - b.start_date);
+
+    const days = makeBuckets(t("2024-05-01"), t("2024-06-01"), "day");
+    await sweepOccupancy(intervals, days);
+    for (const day of days) {
+      const open = intervals.filter(
+        (o) => o.start_date.getTime() <= day.start && (o.end_date === null || o.end_date.getTime() >= day.end)
+      ).length;
+      expect(day.occupiedMs).toBe(open * MS_DAY);
+    }
+
+    const weeks = makeBuckets(t("2024-05-01"), t("2024-06-01"), "week");
+    await sweepOccupancy(intervals, weeks);
+    const total = (buckets) => buckets.reduce((sum, b) => sum + b.occupiedMs, 0);
+    expect(total(weeks)).toBe(total(days));
+  });
+});
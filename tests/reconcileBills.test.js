@@ -0,0 +1,90 @@
+import { jest } from "@jest/globals";
+import mongoose from "mongoose";
+import Arrear from "../src/models/Arrear.js";
+import Bill from "../src/models/Bill.js";
+import Transaction from "../src/models/Transaction.js";
+import { reconcileBills, settlement } from "../src/services/paymentService.js";
+
+const billId = new mongoose.Types.ObjectId();
+const bill = (paid) => ({ _id: billId, amount: 1000, paid, balance: 1000 - paid, status: paid ? "partial" : "pending" });
+const totals = (paid) => [{ _id: billId, paid }];
+
+// Bill.find(...).lean() for scoped runs, .lean().cursor() for a full rebuild
+const billsFound = (bills) => {
+  const lean = () => Object.assign(Promise.resolve(bills), { cursor: () => bills });
+  jest.spyOn(Bill, "find").mockReturnValue({ lean });
+};
+
+let bulkWrite;
+beforeEach(() => {
+  bulkWrite = jest.spyOn(Bill, "bulkWrite").mockImplementation(async (ops) => ({ matchedCount: ops.length }));
+  // syncArrears after the write
+  jest.spyOn(Bill, "aggregate").mockResolvedValue([]);
+  jest.spyOn(Arrear, "deleteMany").mockResolvedValue({ deletedCount: 0 });
+});
+
+afterEach(() => jest.restoreAllMocks());
+
+describe("settlement", () => {
+  test("is null when paid, balance and status already match", () => {
+    expect(settlement(bill(400), 400)).toBeNull();
+  });
+
+  test("derives balance and status from the paid total", () => {
+    expect(settlement(bill(0), 1000)).toEqual({ paid: 1000, balance: 0, status: "paid" });
+  });
+});
+
+describe("reconcileBills", () => {
+  test("writes only bills that drifted, guarded by the values read", async () => {
+    billsFound([bill(0)]);
+    jest.spyOn(Transaction, "aggregate").mockResolvedValue(totals(400));
+
+    const stats = await reconcileBills({ billIds: [billId] });
+
+    expect(stats).toMatchObject({ scanned: 1, changed: 1, drift: { paid: 1, status: 1, amount: 400 } });
+    expect(bulkWrite).toHaveBeenCalledWith(
+      [
+        {
+          updateOne: {
+            filter: { _id: billId, paid: 0, balance: 1000 },
+            update: { $set: { paid: 400, balance: 600, status: "partial" } },
+          },
+        },
+      ],
+      { ordered: false }
+    );
+  });
+
+  test("a payment applied between the read and the write is not overwritten", async () => {
+    billsFound([bill(0)]);
+    jest.spyOn(Transaction, "aggregate").mockResolvedValue(totals(400));
+    // the bill's paid moved on after it was read, so the guarded update matches nothing
+    bulkWrite.mockResolvedValue({ matchedCount: 0 });
+
+    const stats = await reconcileBills({ billIds: [billId] });
+
+    expect(stats.changed).toBe(0);
+  });
+
+  test("a full rebuild re-totals drifted bills before writing them", async () => {
+    // the payment landed after the $group over every transaction, before the bill was read
+    billsFound([bill(500)]);
+    jest.spyOn(Transaction, "aggregate").mockResolvedValueOnce([]).mockResolvedValueOnce(totals(500));
+
+    const stats = await reconcileBills();
+
+    expect(stats).toMatchObject({ scanned: 1, changed: 0 });
+    expect(bulkWrite).not.toHaveBeenCalled();
+  });
+
+  test("a dry run reports drift without writing", async () => {
+    billsFound([bill(0)]);
+    jest.spyOn(Transaction, "aggregate").mockResolvedValue(totals(1000));
+
+    const stats = await reconcileBills({ billIds: [billId], dryRun: true });
+
+    expect(stats).toMatchObject({ dryRun: true, changed: 1, drift: { transitions: { "pending→paid": 1 } } });
+    expect(bulkWrite).not.toHaveBeenCalled();
+  });
+});
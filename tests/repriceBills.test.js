@@ -0,0 +1,91 @@
+import { jest } from "@jest/globals";
+import mongoose from "mongoose";
+import Arrear from "../src/models/Arrear.js";
+import Bed from "../src/models/Bed.js";
+import Bill, { settleStage } from "../src/models/Bill.js";
+import Room from "../src/models/Room.js";
+import { repriceBills } from "../src/services/billingService.js";
+
+const id = () => new mongoose.Types.ObjectId();
+const room = id();
+const bed1 = id();
+const bed2 = id();
+const may = (bedId, amount) => ({
+  _id: id(),
+  bedId,
+  period_start: new Date("2024-05-01T00:00:00Z"),
+  period_end: new Date("2024-06-01T00:00:00Z"),
+  amount,
+});
+const lean = (rows) => ({ lean: async () => rows });
+
+let bulkWrite;
+let updateMany;
+let billFind;
+const billsAre = (bills) => billFind.mockReturnValue({ lean: () => ({ cursor: () => bills }) });
+
+beforeEach(() => {
+  jest.spyOn(Room, "find").mockReturnValue(lean([{ _id: room }]));
+  jest.spyOn(Bed, "find").mockReturnValue(lean([{ _id: bed1, defaultCost: 6000 }, { _id: bed2, defaultCost: 0 }]));
+  updateMany = jest.spyOn(Bed, "updateMany").mockResolvedValue({});
+  billFind = jest.spyOn(Bill, "find");
+  bulkWrite = jest.spyOn(Bill, "bulkWrite").mockResolvedValue({});
+  jest.spyOn(Bill, "aggregate").mockResolvedValue([]);
+  jest.spyOn(Arrear, "deleteMany").mockResolvedValue({ deletedCount: 0 });
+});
+
+afterEach(() => jest.restoreAllMocks());
+
+describe("repriceBills", () => {
+  test("re-prices only bills whose amount changes, with balance and status in the same update", async () => {
+    const stale = may(bed1, 5000);
+    billsAre([stale, may(bed1, 6000), may(id(), 100)]);
+
+    const stats = await repriceBills({ pgId: "pg1", month: "2024-05" });
+
+    expect(stats).toEqual({ dryRun: false, beds: 2, scanned: 3, changed: 1, missingBed: 1, amountDelta: 1000 });
+    expect(billFind.mock.calls[0][0]).toEqual({
+      bedId: { $in: [bed1, bed2] },
+      period_start: { $lt: new Date("2024-06-01T00:00:00Z") },
+      period_end: { $gt: new Date("2024-05-01T00:00:00Z") },
+      status: { $ne: "paid" },
+    });
+    expect(bulkWrite).toHaveBeenCalledWith(
+      [{ updateOne: { filter: { _id: stale._id }, update: [{ $set: { amount: 6000 } }, settleStage] } }],
+      { ordered: false }
+    );
+    expect(updateMany).not.toHaveBeenCalled();
+  });
+
+  test("a new defaultCost is set on the scoped beds and used for their bills", async () => {
+    billsAre([may(bed2, 0)]);
+
+    const stats = await repriceBills({ bedIds: [bed2], defaultCost: 3100, includePaid: true });
+
+    expect(updateMany).toHaveBeenCalledWith({ _id: { $in: [bed2] } }, { $set: { defaultCost: 3100 } });
+    expect(billFind.mock.calls[0][0]).toEqual({ bedId: { $in: [bed1, bed2] } });
+    expect(stats).toMatchObject({ changed: 1, amountDelta: 3100 });
+  });
+
+  test("defaultCost without a PG or beds is refused before any write", async () => {
+    await expect(repriceBills({ defaultCost: 5000 })).rejects.toMatchObject({ statusCode: 400 });
+    expect(updateMany).not.toHaveBeenCalled();
+    expect(billFind).not.toHaveBeenCalled();
+  });
+
+  test("a dry run reports the changes without writing", async () => {
+    billsAre([may(bed1, 5000)]);
+
+    const stats = await repriceBills({ pgId: "pg1", defaultCost: 7000, dryRun: true });
+
+    expect(stats).toMatchObject({ dryRun: true, changed: 1, amountDelta: 2000 });
+    expect(updateMany).not.toHaveBeenCalled();
+    expect(bulkWrite).not.toHaveBeenCalled();
+  });
+
+  test("writes are flushed in chunks", async () => {
+    billsAre([may(bed1, 1), may(bed1, 2), may(bed1, 3)]);
+    await repriceBills({ pgId: "pg1" }, { chunkSize: 2 });
+    expect(bulkWrite.mock.calls.map(([ops]) => ops.length)).toEqual([2, 1]);
+  });
+});
@@ -0,0 +1,126 @@
+import { Readable } from "stream";
+import { matchRow, parseCsv, parseStatementDate, statementRows } from "../src/services/statementImportService.js";
+
+// The file as a stream of `size`-byte chunks, so fields and multi-byte
+// characters are cut across chunk boundaries.
+const chunked = (text, size = 7) => {
+  const buf = Buffer.from(text);
+  const chunks = [];
+  for (let i = 0; i < buf.length; i += size) chunks.push(buf.subarray(i, i + size));
+  return Readable.from(chunks);
+};
+
+const collect = async (rows) => {
+  const out = [];
+  for await (const row of rows) out.push(row);
+  return out;
+};
+
+const STATEMENT =
+  "\uFEFFAccount: 1234 ₹\r\n" +
+  "Txn Date,Narration,Ref No,Debit,Credit\r\n" +
+  '03-May-2024,"UPI/9876543210@ybl/rent, may",UTR1,,"8,000.00"\r\n' +
+  '04/05/24,"ATM ""cash""\nsecond line",UTR2,500,\r\n' +
+  "2024-05-40,x,UTR3,,10\n";
+
+describe("parseCsv", () => {
+  test("handles a BOM, CRLF, quoted commas, escaped quotes and newlines across chunks", async () => {
+    for (const size of [1, 3, 7, 1024]) {
+      expect(await collect(parseCsv(chunked(STATEMENT, size)))).toEqual([
+        ["Account: 1234 ₹"],
+        ["Txn Date", "Narration", "Ref No", "Debit", "Credit"],
+        ["03-May-2024", "UPI/9876543210@ybl/rent, may", "UTR1", "", "8,000.00"],
+        ["04/05/24", 'ATM "cash"\nsecond line', "UTR2", "500", ""],
+        ["2024-05-40", "x", "UTR3", "", "10"],
+      ]);
+    }
+  });
+
+  test("keeps a last row without a trailing newline and skips blank lines", async () => {
+    expect(await collect(parseCsv(chunked("a,b\n\n1,2")))).toEqual([
+      ["a", "b"],
+      ["1", "2"],
+    ]);
+  });
+});
+
+describe("parseStatementDate", () => {
+  test.each([
+    ["2024-05-03", "2024-05-03"],
+    ["03/05/2024", "2024-05-03"],
+    ["03-05-24", "2024-05-03"],
+    ["03-May-2024", "2024-05-03"],
+    ["03 May 2024", "2024-05-03"],
+  ])("%s", (value, iso) => {
+    expect(parseStatementDate(value)).toEqual(new Date(`${iso}T00:00:00.000Z`));
+  });
+
+  test("rejects impossible dates", () => {
+    expect(parseStatementDate("31/02/2024")).toBeNull();
+    expect(parseStatementDate("yesterday")).toBeNull();
+  });
+});
+
+describe("statementRows", () => {
+  test("finds the header after preamble lines and maps credits", async () => {
+    const rows = await collect(statementRows(parseCsv(chunked(STATEMENT))));
+    expect(rows).toEqual([
+      {
+        line: 3,
+        date: new Date("2024-05-03T00:00:00.000Z"),
+        amount: 8000,
+        mobile: "9876543210",
+        reference: "UTR1",
+        narration: "UPI/9876543210@ybl/rent, may",
+      },
+      { line: 4, skip: "debit" },
+      { line: 5, date: null, amount: 10, mobile: null, reference: "UTR3", narration: "x" },
+    ]);
+  });
+
+  test("only whole debit tokens in a type column mark debits", async () => {
+    const csv = "Date,Amount,Type\n2024-05-03,100,Deposit\n2024-05-03,200,DR\n2024-05-03,300,debit\n2024-05-03,400,Cr\n";
+    const rows = await collect(statementRows(parseCsv(chunked(csv))));
+    expect(rows.map((row) => row.skip || row.amount)).toEqual([100, "debit", "debit", 400]);
+  });
+
+  test("a file without a date and amount header is a 400", async () => {
+    await expect(collect(statementRows(parseCsv(chunked("foo,bar\n1,2\n"))))).rejects.toMatchObject({ statusCode: 400 });
+  });
+});
+
+describe("matchRow", () => {
+  const bill = (_id, start, end) => ({
+    _id,
+    balance: 8000,
+    period_start: new Date(start),
+    period_end: new Date(end),
+  });
+  const index = () =>
+    new Map([["9876543210:800000", [bill("may", "2024-05-01", "2024-06-01"), bill("june", "2024-06-01", "2024-07-01")]]]);
+  const row = (date, extra = {}) => ({ date: new Date(date), amount: 8000, mobile: "9876543210", ...extra });
+
+  test("prefers the bill whose period contains the payment date", () => {
+    expect(matchRow(index(), row("2024-05-29")).bill._id).toBe("may");
+    expect(matchRow(index(), row("2024-06-03")).bill._id).toBe("june");
+  });
+
+  test("a matched bill leaves the index", () => {
+    const idx = index();
+    expect(matchRow(idx, row("2024-06-03")).bill._id).toBe("june");
+    expect(matchRow(idx, row("2024-06-03")).bill._id).toBe("may");
+    expect(matchRow(idx, row("2024-06-03")).reason).toBe("no open bill for this mobile and amount");
+  });
+
+  test("several bills containing the date are ambiguous", () => {
+    const idx = new Map([["9876543210:800000", [bill("a", "2024-05-01", "2024-06-01"), bill("b", "2024-05-01", "2024-06-01")]]]);
+    expect(matchRow(idx, row("2024-05-10"))).toEqual({ reason: "several open bills match", candidates: ["a", "b"] });
+  });
+
+  test("rows that cannot match say why", () => {
+    expect(matchRow(index(), row("2024-09-01")).reason).toBe("no open bill for this mobile and amount in this period");
+    expect(matchRow(index(), row("2024-05-10", { mobile: null })).reason).toBe("no mobile number");
+    expect(matchRow(index(), row("2024-05-10", { amount: 7999 })).reason).toBe("no open bill for this mobile and amount");
+    expect(matchRow(index(), { ...row("2024-05-10"), date: null }).reason).toBe("unreadable date");
+  });
+});